@@ -1,22 +1,1376 @@
 import cv2
-import mediapipe as mp
 import random
 import time
 import numpy as np
 import json
 import os
+import argparse
+import asyncio
+import csv
+import glob
+import multiprocessing
+import signal
+import struct
+import tempfile
+import queue
+import threading
+import tracemalloc
+from collections import deque, namedtuple
 
-class RockPaperScissorsWorld:
-    def __init__(self):
-        # Initialize MediaPipe
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.3
-        )
-        self.mp_draw = mp.solutions.drawing_utils
+from rps_core import (
+    StageStats, LRUCache, GestureClassifier, LearnedGestureClassifier, load_labelled_landmarks,
+    TemporalGestureFilter, GestureTimeline, LANDMARK_RECORD, LandmarkRecorder,
+    SharedLandmarkRing, read_landmark_header, load_landmarks, SharedFrameRing, VideoRecorder,
+    ROUND_RESULTS, GameLog, gesture_sequence)
+
+# MediaPipe takes about a second to import, so it is loaded on first use
+mp = None
+
+
+def load_mediapipe():
+    """Import MediaPipe once, when something first needs it"""
+    global mp
+    if mp is None:
+        import mediapipe
+        mp = mediapipe
+    return mp
+
+
+class StageProfiler:
+    """Named StageStats for the game loop plus the FPS counter
+    
+    Stages are created on first use, so timing another section of the
+    loop is one perf_counter pair and a record() call. Each stage is only
+    written by the thread that runs it.
+    """
+    def __init__(self, stages=(), window=512):
+        self.window = window
+        self.stages = {}
+        for name in stages:
+            self[name]
+        self.fps = 0.0
+        self.fps_count = 0
+        self.fps_start = None
+        self.overlay_rows = []
+        self.overlay_time = 0.0
+    
+    def __getitem__(self, name):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = StageStats(name, self.window)
+        return stage
+    
+    def tick(self):
+        """Count one displayed frame and return the FPS over the last second"""
+        now = time.perf_counter()
+        if self.fps_start is None:
+            self.fps_start = now
+        self.fps_count += 1
+        
+        if now - self.fps_start >= 1.0:
+            self.fps = self.fps_count / (now - self.fps_start)
+            self.fps_count = 0
+            self.fps_start = now
+        return self.fps
+    
+    def rows(self):
+        return [stage.as_dict() for stage in self.stages.values()]
+    
+    def export(self, path):
+        """Write the stage table to path, as CSV for .csv files and JSON otherwise"""
+        rows = self.rows()
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', newline='') as f:
+            if path.lower().endswith(".csv"):
+                writer = csv.DictWriter(f, fieldnames=list(StageStats("").as_dict()))
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                json.dump({"time": time.time(), "fps": round(self.fps, 2), "stages": rows},
+                          f, indent=2)
+        os.replace(temp_path, path)
+    
+    def draw_overlay(self, frame, text, refresh=0.5):
+        """Draw per-stage p50/p95/p99 in the bottom right corner through a
+        TextCache
+        
+        Percentiles are recomputed every `refresh` seconds, not per frame.
+        """
+        now = time.perf_counter()
+        if now - self.overlay_time >= refresh:
+            self.overlay_time = now
+            self.overlay_rows = [(stage.name, stage.percentiles_ms())
+                                 for stage in self.stages.values() if stage.frames]
+        
+        h, w = frame.shape[:2]
+        line_height = 20
+        x0 = max(0, w - 320)
+        y0 = max(0, h - 20 - line_height * (len(self.overlay_rows) + 1))
+        panel = frame[y0:h - 10, x0:w - 10]
+        np.right_shift(panel, 2, out=panel)
+        
+        columns = (("p50", 120), ("p95", 185), ("p99", 250))
+        y = y0 + line_height
+        font = cv2.FONT_HERSHEY_PLAIN
+        text.put(frame, "ms", (x0 + 8, y), 1.0, (255, 255, 255), font=font)
+        for label, x in columns:
+            text.put(frame, label, (x0 + x, y), 1.0, (255, 255, 255), font=font)
+        for name, values in self.overlay_rows:
+            y += line_height
+            text.put(frame, name, (x0 + 8, y), 1.0, (0, 255, 255), font=font)
+            for value, (_, x) in zip(values, columns):
+                text.put(frame, f"{value:.1f}", (x0 + x, y), 1.0, (0, 255, 0), font=font)
+
+
+def put_latest(q, item, stats=None):
+    """Put item on a bounded queue, dropping the oldest entry when it is full"""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+                if stats is not None:
+                    stats.dropped += 1
+            except queue.Empty:
+                pass
+
+
+class Player:
+    """One side of a two-player game with its own gesture filter and score"""
+    def __init__(self, name, side):
+        self.name = name
+        self.side = side  # home x position on the mirrored screen, 0-1
+        self.x = side
+        self.handedness = None
+        self.gesture_filter = TemporalGestureFilter()
+        self.timeline = None  # sized by the game's throw window
+        self.raw_gesture = "none"
+        self.confidence = 0.0
+        self.gesture = "none"
+        self.choice = ""
+        self.wins = 0
+    
+    def update(self, timestamp, captured=None):
+        """Filter this frame's raw gesture, captured at `captured` (default timestamp)"""
+        self.timeline.add(timestamp if captured is None else captured,
+                          self.raw_gesture, self.confidence)
+        self.gesture = self.gesture_filter.update(self.raw_gesture, self.confidence, timestamp)
+        return self.gesture
+
+
+class PlayerTracker:
+    """Assigns each detected hand to a player by screen side and handedness
+    
+    Players remember where their hand was last seen and which hand it
+    was. Two hands take whichever pairing has the smaller total distance,
+    plus a penalty for each handedness mismatch, so identities survive
+    hands moving around their half or one hand dropping out for a few
+    frames. A missing hand's position drifts back to its player's side.
+    """
+    def __init__(self, players, handedness_penalty=0.3, drift=0.05):
+        self.players = players
+        self.handedness_penalty = handedness_penalty
+        self.drift = drift
+    
+    def cost(self, player, x, label):
+        cost = abs(player.x - x)
+        if label is not None and player.handedness is not None and label != player.handedness:
+            cost += self.handedness_penalty
+        return cost
+    
+    def assign(self, xs, labels):
+        """Player index for each hand, given hand x positions and handedness labels"""
+        first, second = self.players
+        if len(xs) == 1:
+            order = [0 if self.cost(first, xs[0], labels[0]) <= self.cost(second, xs[0], labels[0])
+                     else 1]
+        else:
+            straight = self.cost(first, xs[0], labels[0]) + self.cost(second, xs[1], labels[1])
+            crossed = self.cost(first, xs[1], labels[1]) + self.cost(second, xs[0], labels[0])
+            order = [0, 1] if straight <= crossed else [1, 0]
+        
+        for player in self.players:
+            player.x += self.drift * (player.side - player.x)
+        for hand, index in enumerate(order):
+            player = self.players[index]
+            player.x = xs[hand]
+            if labels[hand] is not None:
+                player.handedness = labels[hand]
+        return order
+
+
+Button = namedtuple("Button", "label box")
+
+
+class UILayout:
+    """Screen layout in normalized coordinates, shared by drawing and pointing
+    
+    Boxes are (x1, y1, x2, y2) fractions of the frame, so the screens and
+    the pointer hit-testing follow whatever resolution is captured. Text
+    sizes are designed for a 1280x720 frame and scaled to fit others.
+    Hit boxes are the drawn buttons grown by `hit_margin`, which makes
+    them easier to point at.
+    """
+    design_size = (1280, 720)
+    buttons = {
+        "menu": (Button("START THE WAR", (0.273, 0.312, 0.727, 0.382)),
+                 Button("OPTIONS", (0.273, 0.424, 0.727, 0.493)),
+                 Button("EXIT", (0.273, 0.535, 0.727, 0.604))),
+        "options": (Button("← BACK", (0.078, 0.833, 0.234, 0.903)),),
+    }
+    
+    def __init__(self, hit_margin=(0.04, 0.014)):
+        mx, my = hit_margin
+        self.hit_boxes = {screen: [(x1 - mx, y1 - my, x2 + mx, y2 + my)
+                                   for _, (x1, y1, x2, y2) in buttons]
+                          for screen, buttons in self.buttons.items()}
+    
+    def scale(self, w, h):
+        """Text and line size factor, fitting the design into a w x h frame"""
+        return min(w / self.design_size[0], h / self.design_size[1])
+    
+    def thickness(self, t, w, h):
+        return max(1, round(t * self.scale(w, h)))
+    
+    def point(self, x, y, w, h):
+        return (round(x * w), round(y * h))
+    
+    def rect(self, box, w, h):
+        """Pixel corners of a normalized box"""
+        x1, y1, x2, y2 = box
+        return (round(x1 * w), round(y1 * h)), (round(x2 * w), round(y2 * h))
+    
+    def hit(self, screen, x, y):
+        """Index of the button on `screen` under normalized (x, y), or -1"""
+        for i, (x1, y1, x2, y2) in enumerate(self.hit_boxes.get(screen, ())):
+            if x1 <= x <= x2 and y1 <= y <= y2:
+                return i
+        return -1
+
+
+class UILayer:
+    """A pre-rendered static overlay: premultiplied image plus alpha
+    
+    The overlay is drawn once over a black and once over a white frame.
+    The difference between the two is the per-pixel transparency,
+    including background dimming and anti-aliased edges, so compositing
+    is a single frame * transparency + image blend.
+    """
+    def __init__(self, shape, draw):
+        black = np.zeros(shape, dtype=np.uint8)
+        white = np.full(shape, 255, dtype=np.uint8)
+        draw(black)
+        draw(white)
+        self.image = black
+        self.transparency = cv2.subtract(white, black)
+    
+    def composite(self, frame):
+        cv2.multiply(frame, self.transparency, dst=frame, scale=1 / 255)
+        cv2.add(frame, self.image, dst=frame)
+    
+    def composite_at(self, frame, x, y):
+        """Composite with the layer's top-left corner at (x, y), clipped to the frame"""
+        h, w = self.image.shape[:2]
+        frame_h, frame_w = frame.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, frame_w), min(y + h, frame_h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        roi = frame[y0:y1, x0:x1]
+        layer = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+        cv2.multiply(roi, self.transparency[layer], dst=roi, scale=1 / 255)
+        cv2.add(roi, self.image[layer], dst=roi)
+
+
+class UILayerCache(LRUCache):
+    """Keep recently used UILayers keyed by everything they depend on"""
+    def __init__(self, max_layers=6):
+        super().__init__(max_layers)
+        self.enabled = True
+    
+    def get(self, key, shape, draw):
+        return self.lookup(key, lambda: UILayer(shape, draw))
+
+
+class SpriteCache:
+    """Rasterize fixed drawings once per (name, scale) and blit them
+    
+    draw(canvas, cx, cy, name, scale) must stay within radius * scale
+    pixels of (cx, cy).
+    """
+    def __init__(self, draw, radius):
+        self.draw = draw
+        self.radius = radius
+        self.sprites = {}
+        self.enabled = True
+    
+    def get(self, name, scale):
+        # Quantize so slightly different frame sizes share a sprite
+        scale = round(scale, 2)
+        sprite = self.sprites.get((name, scale))
+        if sprite is None:
+            r = int(np.ceil(self.radius * scale))
+            sprite = UILayer((2 * r + 1, 2 * r + 1, 3),
+                             lambda canvas: self.draw(canvas, r, r, name, scale))
+            self.sprites[(name, scale)] = sprite
+        return sprite
+    
+    def blit(self, frame, name, cx, cy, scale=1.0):
+        """Composite the sprite centred on (cx, cy)"""
+        sprite = self.get(name, scale)
+        r = sprite.image.shape[0] // 2
+        sprite.composite_at(frame, cx - r, cy - r)
+
+
+class TextCache(LRUCache):
+    """Rasterized text shared by all screens, with LRU eviction under a byte cap
+    
+    put() stands in for cv2.putText. Each distinct (text, font, scale,
+    thickness, color, under-passes) is rasterized once into a UILayer
+    covering just the text and then composited, so shadows and glows cost
+    no more than plain text. Scales are quantized to `scale_step`, which
+    keeps an animated size down to a handful of rasters. With `enabled`
+    off text is drawn straight onto the frame.
+    """
+    def __init__(self, max_bytes=16 << 20, scale_step=0.05):
+        super().__init__(max_bytes)
+        self.scale_step = scale_step
+        self.sizes = {}
+        self.enabled = True
+    
+    def weigh(self, entry):
+        layer = entry[0]
+        return layer.image.nbytes + layer.transparency.nbytes
+    
+    def quantize(self, scale):
+        return round(round(scale / self.scale_step) * self.scale_step, 4)
+    
+    def size(self, text, scale, thickness=1, font=cv2.FONT_HERSHEY_SIMPLEX):
+        """cv2.getTextSize(...)[0], memoized"""
+        if not self.enabled:
+            return cv2.getTextSize(text, font, scale, thickness)[0]
+        key = (text, font, self.quantize(scale), thickness)
+        size = self.sizes.get(key)
+        if size is None:
+            if len(self.sizes) >= 4096:
+                self.sizes.clear()
+            size = self.sizes[key] = cv2.getTextSize(text, font, key[2], thickness)[0]
+        return size
+    
+    def put(self, frame, text, org, scale, color, thickness=1,
+            font=cv2.FONT_HERSHEY_SIMPLEX, under=()):
+        """cv2.putText with the baseline-left corner at org
+        
+        `under` lists (dx, dy, color, thickness) passes drawn first, offset
+        from org, for shadows and glows.
+        """
+        passes = tuple(under) + ((0, 0, color, thickness),)
+        if not self.enabled:
+            for dx, dy, pass_color, pass_thickness in passes:
+                cv2.putText(frame, text, (org[0] + dx, org[1] + dy), font, scale,
+                            pass_color, pass_thickness)
+            return
+        
+        key = (text, font, self.quantize(scale), passes)
+        layer, ox, oy = self.lookup(key, lambda: self.rasterize(text, font, key[2], passes))
+        layer.composite_at(frame, org[0] - ox, org[1] - oy)
+    
+    def rasterize(self, text, font, scale, passes):
+        """UILayer of all passes and the position of org inside it"""
+        left = top = right = bottom = 0
+        for dx, dy, _, thickness in passes:
+            (w, h), baseline = cv2.getTextSize(text, font, scale, thickness)
+            left, right = min(left, dx - thickness), max(right, dx + w + thickness)
+            top, bottom = min(top, dy - h - thickness), max(bottom, dy + baseline + thickness)
+        ox, oy = 1 - left, 1 - top
+        
+        def draw(canvas):
+            for dx, dy, color, thickness in passes:
+                cv2.putText(canvas, text, (ox + dx, oy + dy), font, scale, color, thickness)
+        
+        return UILayer((bottom - top + 2, right - left + 2, 3), draw), ox, oy
+    
+    def hit_rate(self):
+        return self.hits / max(1, self.hits + self.misses)
+    
+    def summary(self):
+        return (f"{len(self.entries)} texts, {self.total / (1 << 20):.1f} of {self.capacity / (1 << 20):.0f} MB, "
+                f"{self.hits} hits, {self.misses} misses ({100 * self.hit_rate():.1f}% hit rate), "
+                f"{self.evictions} evictions")
+
+
+# Bones of the MediaPipe hand model, the pairs of mp.solutions.hands.HAND_CONNECTIONS
+HAND_CONNECTIONS = np.array([
+    (0, 1), (1, 2), (2, 3), (3, 4),  # thumb
+    (0, 5), (5, 6), (6, 7), (7, 8),  # index
+    (5, 9), (9, 10), (10, 11), (11, 12),  # middle
+    (9, 13), (13, 14), (14, 15), (15, 16),  # ring
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),  # pinky
+], dtype=np.intp)
+
+
+class SkeletonRenderer:
+    """Hand skeletons drawn straight from (21, 3) landmark arrays
+    
+    Landmarks are scaled to pixels once per frame. The bones of every
+    hand go to one cv2.polylines call as two-point segments gathered with
+    HAND_CONNECTIONS; joints are zero-length segments, which OpenCV draws
+    as round dots, so a rim pass and a center pass replace a cv2.circle
+    pair per joint. Colors and sizes follow MediaPipe's default style.
+    
+    detail is "full" (bones and joints), "bones" or "off", and
+    state_detail overrides it per game state, e.g. {"countdown": "off"}.
+    """
+    levels = ("full", "bones", "off")
+    
+    def __init__(self, detail="full", state_detail=None, bone_color=(224, 224, 224),
+                 joint_color=(0, 0, 255), rim_color=(255, 255, 255), thickness=2, radius=3):
+        self.detail = detail
+        self.state_detail = dict(state_detail or {})
+        self.bone_color = bone_color
+        self.joint_color = joint_color
+        self.rim_color = rim_color
+        self.thickness = thickness
+        self.radius = radius
+    
+    def level(self, state=None):
+        return self.state_detail.get(state, self.detail)
+    
+    def draw(self, frame, points, state=None):
+        """Draw one (21, 3) or several (n, 21, 3) hands of normalized landmarks"""
+        detail = self.level(state)
+        if detail == "off":
+            return
+        h, w = frame.shape[:2]
+        pixels = (np.asarray(points)[..., :2] * (w, h)).astype(np.int32).reshape(-1, 21, 2)
+        cv2.polylines(frame, pixels[:, HAND_CONNECTIONS].reshape(-1, 2, 2), False,
+                      self.bone_color, self.thickness)
+        if detail == "full":
+            joints = np.repeat(pixels.reshape(-1, 1, 2), 2, axis=1)
+            cv2.polylines(frame, joints, False, self.rim_color, 2 * self.radius + 2)
+            cv2.polylines(frame, joints, False, self.joint_color, 2 * self.radius)
+
+
+class LandmarkReplayer:
+    """Drive detect_gesture and update_game from a landmark recording
+    
+    No camera or MediaPipe is involved and the game clock follows the
+    recorded timestamps. With the seed and game settings stored in the
+    recording, a replay reproduces the recorded session and runs as fast
+    as the game logic allows.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.records, self.seed = load_landmarks(path)
+        self.settings = read_landmark_header(path)[1]
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def new_game(self, seed=None):
+        """A game without hand tracking, set up like the recorded one"""
+        game = RockPaperScissorsWorld(enable_hands=False, persist=False,
+                                      seed=self.seed if seed is None else seed)
+        game.apply_settings(self.settings)
+        return game
+    
+    def frames(self, game):
+        """Step through the recording, yielding (index, time, gesture, confidence)
+        after each frame's game update, with the gesture as detected
+        
+        Stops early if the game asks to exit, just as the live loop did.
+        """
+        landmarks = self.records['landmarks']
+        hands = self.records['hand']
+        times = self.records['time']
+        ages = self.records['age']
+        clock = game.clock = VirtualClock()
+        
+        for i in range(len(self.records)):
+            clock.set(float(times[i]))
+            game.frame_age = float(ages[i])
+            game.set_hand(landmarks[i] if hands[i] >= 0 else None)
+            gesture, confidence = game.current_gesture, game.confidence
+            running = game.update_game()
+            yield i, clock.time, gesture, confidence
+            if not running:
+                break
+    
+    def replay(self, game):
+        """Replay the whole recording, returning the rounds that were played"""
+        rounds = []
+        played = game.total_games
+        for i, timestamp, gesture, confidence in self.frames(game):
+            if game.total_games != played:
+                played = game.total_games
+                rounds.append((timestamp, game.player_choice, game.ai_choice, game.result))
+        return rounds
+
+
+class ResolutionController:
+    """Pick the inference scale that keeps hand tracking within budget
+    
+    The budget is budget_share of the frame time at target_fps. The scale
+    drops a step when the smoothed inference time goes over budget and
+    only rises again when the larger scale is predicted to fit, assuming
+    cost grows with pixel count.
+    """
+    scales = (1.0, 0.75, 0.5, 0.375, 0.25)
+    
+    def __init__(self, target_fps=30, budget_share=0.6, smoothing=0.1, settle_frames=15):
+        self.budget = budget_share / target_fps
+        self.smoothing = smoothing
+        self.settle_frames = settle_frames
+        self.level = 0
+        self.average = None
+        self.settling = settle_frames
+    
+    @property
+    def scale(self):
+        return self.scales[self.level]
+    
+    def update(self, elapsed):
+        if self.average is None:
+            self.average = elapsed
+        else:
+            self.average += (elapsed - self.average) * self.smoothing
+        
+        # Give the running average time to reflect a new scale
+        if self.settling > 0:
+            self.settling -= 1
+            return
+        
+        if self.average > self.budget and self.level < len(self.scales) - 1:
+            self.change_level(self.level + 1)
+        elif self.level > 0:
+            growth = (self.scales[self.level - 1] / self.scale) ** 2
+            if self.average * growth < self.budget * 0.8:
+                self.change_level(self.level - 1)
+    
+    def change_level(self, level):
+        growth = (self.scales[level] / self.scale) ** 2
+        self.level = level
+        self.average *= growth
+        self.settling = self.settle_frames
+
+
+class AdaptiveHandInference:
+    """Hand tracking on a cropped and/or downscaled frame
+    
+    While a hand is tracked only an expanded box around its last
+    landmarks is processed; when the hand is lost the whole frame is
+    searched again straight away. The controller's scale is applied to
+    whichever image is processed. Landmarks are mapped back to
+    normalized full-frame coordinates, so everything downstream works
+    unchanged.
+    
+    The crop moves with the hand, so hands should run in static image
+    mode. In tracking mode MediaPipe would look for the hand where it was
+    in the previous crop, which is somewhere else in this one.
+    """
+    def __init__(self, hands, controller=None, margin=0.6, min_box=0.3):
+        if getattr(hands, 'options', {}).get('static_image_mode') is False:
+            print("⚠️ Cropped hand tracking needs a static image mode model; "
+                  "landmarks will lag when the crop moves")
+        self.hands = hands
+        self.controller = controller if controller is not None else ResolutionController()
+        self.margin = margin
+        self.min_box = min_box
+        self.box = None
+        self.crop_searches = 0
+        self.full_searches = 0
+    
+    def process(self, rgb_frame):
+        start = time.perf_counter()
+        h, w = rgb_frame.shape[:2]
+        results = None
+        
+        if self.box is not None:
+            x0, y0, x1, y1 = self.box
+            self.crop_searches += 1
+            results = self.run(rgb_frame[y0:y1, x0:x1], x0, y0, w, h)
+            if not results.multi_hand_landmarks:
+                results = None
+        
+        if results is None:
+            # Tracking lost, search the whole frame
+            self.full_searches += 1
+            results = self.run(rgb_frame, 0, 0, w, h)
+        
+        self.box = self.tracking_box(results, w, h)
+        self.controller.update(time.perf_counter() - start)
+        return results
+    
+    def run(self, image, x0, y0, frame_w, frame_h):
+        """Process image, a region of the frame at (x0, y0)"""
+        crop_h, crop_w = image.shape[:2]
+        scale = self.controller.scale
+        if scale < 1.0:
+            size = (max(1, round(crop_w * scale)), max(1, round(crop_h * scale)))
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        elif x0 or y0 or crop_w != frame_w or crop_h != frame_h:
+            image = np.ascontiguousarray(image)
+        
+        results = self.hands.process(image)
+        
+        # Normalized coordinates are unaffected by scaling, only by cropping
+        if results.multi_hand_landmarks and (x0 or y0 or crop_w != frame_w or crop_h != frame_h):
+            for hand_landmarks in results.multi_hand_landmarks:
+                for lm in hand_landmarks.landmark:
+                    lm.x = (x0 + lm.x * crop_w) / frame_w
+                    lm.y = (y0 + lm.y * crop_h) / frame_h
+                    lm.z = lm.z * crop_w / frame_w
+        return results
+    
+    def tracking_box(self, results, w, h):
+        """Expanded pixel box around the first detected hand, or None"""
+        if not results.multi_hand_landmarks:
+            return None
+        points = results.multi_hand_landmarks[0].landmark
+        xs = [lm.x * w for lm in points]
+        ys = [lm.y * h for lm in points]
+        cx, cy = (min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2
+        side = max(max(xs) - min(xs), max(ys) - min(ys)) * (1 + 2 * self.margin)
+        side = max(side, self.min_box * min(w, h))
+        x0, y0 = int(max(0, cx - side / 2)), int(max(0, cy - side / 2))
+        x1, y1 = int(min(w, cx + side / 2)), int(min(h, cy + side / 2))
+        if x1 - x0 < 16 or y1 - y0 < 16:
+            return None
+        return x0, y0, x1, y1
+    
+    def summary(self):
+        return (f"roi        crops={self.crop_searches} full={self.full_searches} "
+                f"scale={self.controller.scale:.3g} "
+                f"inference avg={(self.controller.average or 0) * 1000:.2f}ms "
+                f"budget={self.controller.budget * 1000:.2f}ms")
+
+
+# Same shape as the results of Hands.process, for frames without inference
+HandResults = namedtuple('HandResults', ['multi_hand_landmarks', 'multi_handedness'])
+
+
+NO_HANDS = HandResults(None, None)
+
+
+def landmark_list(points):
+    """Build a MediaPipe NormalizedLandmarkList from a (21, 3) array"""
+    load_mediapipe()
+    from mediapipe.framework.formats import landmark_pb2
+    return landmark_pb2.NormalizedLandmarkList(landmark=[
+        landmark_pb2.NormalizedLandmark(x=x, y=y, z=z) for x, y, z in points.tolist()])
+
+
+class BackgroundHands:
+    """MediaPipe Hands imported, built and warmed up on a background thread
+    
+    process() returns NO_HANDS until the model is ready, so the game can
+    open the camera and show the menu in the meantime. A loading error is
+    raised from the next process() call.
+    """
+    def __init__(self, **options):
+        self.options = options
+        self.hands = None
+        self.error = None
+        self.started = time.perf_counter()
+        self.ready_time = None
+        self.first_inference = None
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self.load, daemon=True)
+        self.thread.start()
+    
+    def load(self):
+        try:
+            hands = load_mediapipe().solutions.hands.Hands(**self.options)
+            # The first call initializes the inference graph
+            hands.process(np.zeros((240, 320, 3), dtype=np.uint8))
+            self.hands = hands
+        except Exception as e:
+            self.error = e
+        self.ready_time = time.perf_counter()
+        self.ready.set()
+    
+    def wait(self):
+        self.ready.wait()
+        return self
+    
+    def process(self, image):
+        if not self.ready.is_set():
+            return NO_HANDS
+        if self.error is not None:
+            raise self.error
+        results = self.hands.process(image)
+        if self.first_inference is None:
+            self.first_inference = time.perf_counter()
+        return results
+
+
+class LandmarkPredictor:
+    """Alpha-beta filter (steady-state Kalman) over all landmark coordinates
+    
+    Each coordinate follows a constant-velocity model. alpha = beta = 1 is
+    plain extrapolation from the last two observations, beta = 0 holds
+    the last observation, and smaller gains smooth detection jitter at
+    the cost of some lag.
+    """
+    presets = {
+        "velocity": (1.0, 1.0),
+        "kalman": (0.85, 0.35),
+        "hold": (1.0, 0.0),
+    }
+    
+    def __init__(self, alpha=1.0, beta=1.0):
+        self.alpha = alpha
+        self.beta = beta
+        self.reset()
+    
+    @classmethod
+    def preset(cls, name):
+        return cls(*cls.presets[name])
+    
+    def reset(self):
+        self.position = None
+        self.velocity = None
+        self.time = None
+    
+    def update(self, points, t):
+        """Fold in landmarks observed at time t"""
+        points = np.asarray(points, dtype=np.float64)
+        if self.position is None:
+            self.position = points.copy()
+            self.velocity = np.zeros_like(points)
+            self.time = t
+            return
+        dt = t - self.time
+        if dt <= 0:
+            return
+        predicted = self.position + self.velocity * dt
+        residual = points - predicted
+        self.position = predicted + self.alpha * residual
+        self.velocity = self.velocity + self.beta * residual / dt
+        self.time = t
+    
+    def predict(self, t):
+        """Landmarks extrapolated to time t, as a (21, 3) float32 array"""
+        return (self.position + self.velocity * (t - self.time)).astype(np.float32)
+
+
+class SkippingHandInference:
+    """Run hand inference every few frames and predict in between
+    
+    inference is anything with a Hands-like process(rgb_frame). Frames
+    are counted as the time base, so predictions assume a steady frame
+    rate. Predicted frames return HandResults built from the predictor,
+    so drawing, detect_gesture and the menu pointer work unchanged.
+    """
+    def __init__(self, inference, every=2, predictor=None):
+        self.inference = inference
+        self.every = every
+        self.predictor = predictor if predictor is not None else LandmarkPredictor()
+        self.frame_index = 0
+        self.handedness = None
+        self.inferred = 0
+        self.predicted = 0
+    
+    def process(self, rgb_frame):
+        index = self.frame_index
+        self.frame_index += 1
+        
+        if index % self.every == 0:
+            self.inferred += 1
+            results = self.inference.process(rgb_frame)
+            if results.multi_hand_landmarks:
+                points = GestureClassifier.to_array(results.multi_hand_landmarks[0].landmark)
+                self.predictor.update(points, index)
+                self.handedness = results.multi_handedness
+            else:
+                self.predictor.reset()
+            return results
+        
+        self.predicted += 1
+        if self.predictor.position is None:
+            return NO_HANDS
+        return HandResults([landmark_list(self.predictor.predict(index))], self.handedness)
+    
+    def summary(self):
+        line = (f"skip       every={self.every} inferred={self.inferred} "
+                f"predicted={self.predicted} alpha={self.predictor.alpha} beta={self.predictor.beta}")
+        if hasattr(self.inference, 'summary'):
+            line += "\n   " + self.inference.summary()
+        return line
+
+
+class IdleHandInference:
+    """Power save for an unattended game: motion-gated hand inference
+    
+    inference is anything with a Hands-like process(rgb_frame). After
+    idle_after seconds without a hand the gate goes idle: at most
+    idle_fps frames a second are shrunk to a small grayscale image and
+    compared with the previous one, and no hand model runs. The first
+    frame with enough changed pixels wakes the gate and goes straight to
+    the model. The game caps its own frame rate at idle_fps while idle and
+    only grabs the live camera frames the gate would not check.
+    Process CPU time is split between idle and awake, and wake latency is
+    measured from the waking frame to its hand results.
+    """
+    def __init__(self, inference, idle_after=10.0, idle_fps=5, size=(80, 45),
+                 threshold=16, min_changed=0.005):
+        self.inference = inference
+        self.idle_after = idle_after
+        self.idle_fps = idle_fps
+        self.size = size  # (width, height) of the motion check
+        self.threshold = threshold  # gray level change that counts as motion
+        self.min_changed = min_changed  # share of changed pixels that wakes the gate
+        self.idle = False
+        self.last_hand = None
+        self.checked_at = 0.0
+        self.previous = None
+        self.diff = np.empty(size[::-1], dtype=np.uint8)
+        self.idle_frames = 0
+        self.checks = 0
+        self.wakes = 0
+        self.woke_at = None  # perf_counter time of the last wake-up's hand results
+        self.wake_latency = StageStats("wake")
+        self.started = None  # (wall, cpu) of the first frame
+        self.idle_since = None  # (wall, cpu) of the last sleep
+        self.idle_wall = 0.0
+        self.idle_cpu = 0.0
+    
+    def motion(self, rgb_frame):
+        """Whether this frame differs from the last checked one"""
+        small = cv2.resize(rgb_frame, self.size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+        previous, self.previous = self.previous, gray
+        if previous is None:
+            return False
+        cv2.absdiff(gray, previous, dst=self.diff)
+        cv2.threshold(self.diff, self.threshold, 255, cv2.THRESH_BINARY, dst=self.diff)
+        return cv2.countNonZero(self.diff) >= self.min_changed * self.diff.size
+    
+    def due(self):
+        """Whether the next frame would be looked at, rather than skipped while idle"""
+        return not self.idle or time.perf_counter() - self.checked_at >= 1 / self.idle_fps
+    
+    def sleep(self, now):
+        self.idle = True
+        self.previous = None
+        self.checked_at = 0.0
+        self.idle_since = (now, time.process_time())
+    
+    def wake(self, now):
+        self.idle = False
+        self.wakes += 1
+        self.idle_wall += now - self.idle_since[0]
+        self.idle_cpu += time.process_time() - self.idle_since[1]
+        self.idle_since = None
+        self.last_hand = now
+    
+    def process(self, rgb_frame):
+        now = time.perf_counter()
+        if self.started is None:
+            self.started = (now, time.process_time())
+        if self.idle:
+            self.idle_frames += 1
+            if now - self.checked_at < 1 / self.idle_fps:
+                return NO_HANDS
+            self.checked_at = now
+            self.checks += 1
+            if not self.motion(rgb_frame):
+                return NO_HANDS
+            self.wake(now)
+            results = self.inference.process(rgb_frame)
+            self.woke_at = time.perf_counter()
+            self.wake_latency.record(self.woke_at - now)
+            return results
+        
+        results = self.inference.process(rgb_frame)
+        if results.multi_hand_landmarks or self.last_hand is None:
+            self.last_hand = now
+        elif now - self.last_hand >= self.idle_after:
+            self.sleep(now)
+        return results
+    
+    def cpu_use(self):
+        """(idle seconds, idle CPU share, awake seconds, awake CPU share)"""
+        if self.started is None:
+            return 0.0, 0.0, 0.0, 0.0
+        now, cpu = time.perf_counter(), time.process_time()
+        idle_wall, idle_cpu = self.idle_wall, self.idle_cpu
+        if self.idle_since is not None:
+            idle_wall += now - self.idle_since[0]
+            idle_cpu += cpu - self.idle_since[1]
+        awake_wall = now - self.started[0] - idle_wall
+        awake_cpu = cpu - self.started[1] - idle_cpu
+        return (idle_wall, idle_cpu / idle_wall if idle_wall else 0.0,
+                awake_wall, awake_cpu / awake_wall if awake_wall else 0.0)
+    
+    def summary(self):
+        idle_wall, idle_share, awake_wall, awake_share = self.cpu_use()
+        line = (f"idle       after={self.idle_after:g}s fps={self.idle_fps:g} "
+                f"idle {idle_wall:.1f}s at {idle_share:.0%} CPU, "
+                f"awake {awake_wall:.1f}s at {awake_share:.0%} CPU, "
+                f"checks={self.checks}/{self.idle_frames} wakes={self.wakes}")
+        if self.wakes:
+            p50 = self.wake_latency.percentiles_ms()[0]
+            line += (f" wake p50={p50:.1f}ms max={self.wake_latency.max_time * 1000:.1f}ms"
+                     f" (+ up to {1000 / self.idle_fps:.0f}ms until the next check)")
+        if hasattr(self.inference, 'summary'):
+            line += "\n   " + self.inference.summary()
+        return line
+
+
+class FrameSource:
+    """Anything that hands out BGR frames like cv2.VideoCapture"""
+    # Live sources keep producing frames whether or not we keep up, so the
+    # pipelined loop drops stale ones; recorded sources apply backpressure
+    live = False
+    
+    def read(self, out=None):
+        """Return (ok, frame); ok is False once the source is exhausted
+        
+        Sources that can decode in place write into out when it has the
+        right shape instead of allocating a new frame.
+        """
+        return False, None
+    
+    def grab(self):
+        """Skip a frame without decoding it; False once the source is exhausted"""
+        return self.read()[0]
+    
+    def release(self):
+        pass
+
+
+class WebcamSource(FrameSource):
+    """Live camera capture"""
+    live = True
+    
+    def __init__(self, index=0, width=1280, height=720):
+        self.cap = cv2.VideoCapture(index)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    
+    def read(self, out=None):
+        return self.cap.read(out)
+    
+    def grab(self):
+        return self.cap.grab()
+    
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """Recorded clip, decoded as fast as the loop asks for frames"""
+    def __init__(self, path, loop=False):
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Cannot open video file: {path}")
+    
+    def read(self, out=None):
+        ret, frame = self.cap.read(out)
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(out)
+        return ret, frame
+    
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirectorySource(FrameSource):
+    """Still images from a directory, in file name order"""
+    extensions = ('.png', '.jpg', '.jpeg', '.bmp')
+    
+    def __init__(self, path, loop=False):
+        self.paths = sorted(p for p in glob.glob(os.path.join(path, '*'))
+                            if p.lower().endswith(self.extensions))
+        if not self.paths:
+            raise IOError(f"No images found in: {path}")
+        self.loop = loop
+        self.index = 0
+    
+    def read(self, out=None):
+        if self.index >= len(self.paths):
+            if not self.loop:
+                return False, None
+            self.index = 0
+        frame = cv2.imread(self.paths[self.index])
+        self.index += 1
+        return frame is not None, frame
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames for benchmarking without a camera"""
+    def __init__(self, frames=300, width=1280, height=720):
+        self.frames = frames
+        self.width = width
+        self.height = height
+        self.index = 0
+        ramp = np.linspace(40, 200, width, dtype=np.uint8)
+        self.background = np.dstack([np.tile(ramp, (height, 1))] * 3)
+    
+    def read(self, out=None):
+        if self.frames is not None and self.index >= self.frames:
+            return False, None
+        if out is not None and out.shape == self.background.shape:
+            frame = out
+            np.copyto(frame, self.background)
+        else:
+            frame = self.background.copy()
+        x = int((np.sin(self.index * 0.05) * 0.4 + 0.5) * self.width)
+        cv2.circle(frame, (x, self.height // 2), self.height // 6, (60, 120, 200), -1)
+        self.index += 1
+        return True, frame
+
+
+def open_source(spec, width=1280, height=720, loop=False):
+    """Build a frame source from a command line spec
+    
+    Accepts a camera index ("0"), "synthetic" or "synthetic:<frames>",
+    a directory of images, or a video file path.
+    """
+    if spec.isdigit():
+        return WebcamSource(int(spec), width, height)
+    if spec == "synthetic" or spec.startswith("synthetic:"):
+        count = spec.partition(":")[2]
+        return SyntheticSource(int(count) if count else 300, width, height)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, loop)
+    return VideoFileSource(spec, loop)
+
+
+class FrameLimit(FrameSource):
+    """Stop another source after a fixed number of frames"""
+    def __init__(self, source, max_frames):
+        self.source = source
+        self.remaining = max_frames
+        self.live = source.live
+    
+    def read(self, out=None):
+        if self.remaining <= 0:
+            return False, None
+        self.remaining -= 1
+        return self.source.read(out)
+    
+    def grab(self):
+        # Skipped frames count towards the limit too
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return self.source.grab()
+    
+    def release(self):
+        self.source.release()
+
+
+class SharedMemorySource(FrameSource):
+    """Frames from a SharedFrameRing filled by another process
+    
+    read returns the ring slot itself, which stays valid until the next
+    read; the game loop only mirrors it into its own buffer before then.
+    """
+    def __init__(self, ring):
+        self.ring = ring
+        self.holding = False
+    
+    def read(self, out=None):
+        if self.holding:
+            self.ring.release_slot()
+            self.holding = False
+        frame = False
+        while frame is False:
+            frame = self.ring.acquire(timeout=1.0)
+        if frame is None:
+            return False, None
+        self.holding = True
+        return True, frame
+    
+    def release(self):
+        if self.holding:
+            self.ring.release_slot()
+            self.holding = False
+        self.ring.release()
+
+
+class FrameBufferPool:
+    """Preallocated frame-sized buffers, handed out round robin per role
+    
+    Each role (camera frame, mirrored frame, RGB copy...) owns a ring of
+    slots buffers. A buffer is only handed out again after slots - 1 other
+    buffers of that role, so with enough slots frames still queued between
+    pipeline stages are never overwritten.
+    """
+    def __init__(self, slots=1):
+        self.slots = slots
+        self.rings = {}
+        self.positions = {}
+        self.allocations = 0
+    
+    def get(self, role, shape, dtype=np.uint8):
+        ring = self.rings.get(role)
+        if ring is None or ring[0].shape != shape or ring[0].dtype != dtype:
+            ring = [np.empty(shape, dtype=dtype) for _ in range(self.slots)]
+            self.rings[role] = ring
+            self.positions[role] = 0
+            self.allocations += self.slots
+        position = self.positions[role]
+        self.positions[role] = (position + 1) % self.slots
+        return ring[position]
+
+
+class AllocationMonitor:
+    """Count frame-sized allocations per loop iteration using tracemalloc
+    
+    The traced memory peak is reset at the start of every frame, so a peak
+    at least one frame above the starting level at the end of the frame
+    means a frame-sized array was allocated, even if it was freed again.
+    The first warmup frames are ignored while buffers and caches fill up.
+    """
+    def __init__(self, warmup=30):
+        self.warmup = warmup
+        self.frames = 0
+        self.frames_allocating = 0
+        self.max_transient = 0
+        self.frame_bytes = 0
+        self.start_memory = 0
+        self.end_memory = 0
+        self.baseline = 0
+    
+    def start(self):
+        tracemalloc.start()
+    
+    def stop(self):
+        tracemalloc.stop()
+    
+    def begin_frame(self):
+        tracemalloc.reset_peak()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+    
+    def end_frame(self, frame):
+        current, peak = tracemalloc.get_traced_memory()
+        self.frames += 1
+        if self.frames == self.warmup:
+            self.start_memory = current
+        if self.frames <= self.warmup:
+            return
+        self.frame_bytes = frame.nbytes
+        transient = peak - self.baseline
+        self.max_transient = max(self.max_transient, transient)
+        if transient >= frame.nbytes:
+            self.frames_allocating += 1
+        self.end_memory = current
+    
+    def report(self):
+        measured = self.frames - self.warmup
+        if measured <= 0:
+            print("\n🧮 Not enough frames for an allocation report")
+            return
+        print(f"\n🧮 Allocations over {measured} steady-state frames "
+              f"(frame = {self.frame_bytes / 1e6:.2f} MB):")
+        print(f"   frames allocating frame-sized arrays: {self.frames_allocating}")
+        print(f"   largest per-frame transient: {self.max_transient / 1e3:.1f} kB")
+        print(f"   traced memory growth: {(self.end_memory - self.start_memory) / 1e3:.1f} kB")
+
+
+class WindowSink:
+    """Show frames in an OpenCV window"""
+    def __init__(self, title='Rock Paper Scissors World'):
+        self.title = title
+    
+    def show(self, frame):
+        """Display a frame and return the pressed key code, or -1"""
+        cv2.imshow(self.title, frame)
+        return cv2.waitKey(1)
+    
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+class HeadlessSink:
+    """Drop frames instead of displaying them"""
+    def show(self, frame):
+        return -1
+    
+    def close(self):
+        pass
+
+
+class RealClock:
+    """Wall-clock time for the game logic"""
+    def now(self):
+        return time.time()
+
+
+class VirtualClock:
+    """Game clock that only moves when told to
+    
+    Replays, the game server and benchmarks set it to recorded or simulated
+    timestamps, so the state machine runs as fast as it can be stepped.
+    """
+    def __init__(self, start=0.0):
+        self.time = start
+    
+    def now(self):
+        return self.time
+    
+    def set(self, timestamp):
+        self.time = timestamp
+    
+    def advance(self, seconds):
+        self.time += seconds
+
+
+class PatternStrategy:
+    """AI opponent that predicts the player's next throw from past rounds
+    
+    For each order k up to `max_order` a count table maps the last k rounds
+    (player and AI throw) to how often the player followed with each throw.
+    A round adds one count per order and shifts the contexts along, so
+    learning is O(1) per round. Counts in the updated row decay so the model
+    follows a player who changes style. Each order also keeps a decayed
+    score of how its counter-moves would have fared, and a decision plays
+    against the prediction of the best scoring order that has evidence.
+    Throws are indices into `choices`; choices[(i + 1) % 3] beats choices[i].
+    """
+    choices = ("rock", "paper", "scissors")
+    index = {name: i for i, name in enumerate(choices)}
+    
+    def __init__(self, max_order=3, decay=0.9, score_decay=0.95, explore=0.05):
+        self.max_order = max_order
+        self.decay = decay
+        self.score_decay = score_decay
+        self.explore = explore
+        self.sizes = [9 ** order for order in range(max_order + 1)]
+        self.tables = [[[0.0, 0.0, 0.0] for _ in range(size)] for size in self.sizes]
+        self.contexts = [0] * (max_order + 1)
+        self.scores = [0.0] * (max_order + 1)
+        self.rounds = 0
+    
+    def predict(self):
+        """Most likely next player throw as an index, or None without evidence"""
+        best, best_score = None, None
+        for order in range(min(self.rounds, self.max_order) + 1):
+            rock, paper, scissors = self.tables[order][self.contexts[order]]
+            if rock + paper + scissors <= 0:
+                continue
+            score = self.scores[order]
+            if best_score is None or score > best_score:
+                best_score = score
+                best = 0 if rock >= paper and rock >= scissors else 1 if paper >= scissors else 2
+        return best
+    
+    def choose_index(self, rng):
+        predicted = self.predict()
+        if predicted is None or rng.random() < self.explore:
+            return rng.randrange(3)
+        return (predicted + 1) % 3
+    
+    def choose(self, rng):
+        """AI throw for the next round"""
+        return self.choices[self.choose_index(rng)]
+    
+    def observe_index(self, player, ai):
+        decay, score_decay = self.decay, self.score_decay
+        tables, contexts, scores = self.tables, self.contexts, self.scores
+        state = player * 3 + ai
+        for order, size in enumerate(self.sizes):
+            row = tables[order][contexts[order]]
+            rock, paper, scissors = row
+            if rock + paper + scissors > 0:
+                predicted = 0 if rock >= paper and rock >= scissors else 1 if paper >= scissors else 2
+                # +1 if countering this order's prediction would have won, -1 if lost
+                outcome = (predicted + 1 - player) % 3
+                scores[order] = scores[order] * score_decay + (outcome == 1) - (outcome == 2)
+            row[0] = rock * decay
+            row[1] = paper * decay
+            row[2] = scissors * decay
+            row[player] += 1.0
+            contexts[order] = (contexts[order] * 9 + state) % size
+        self.rounds += 1
+    
+    def observe(self, player, ai):
+        """Learn from a finished round's player and AI throws"""
+        self.observe_index(self.index[player], self.index[ai])
+    
+    def to_dict(self):
+        return {
+            'max_order': self.max_order,
+            'rounds': self.rounds,
+            'contexts': self.contexts,
+            'scores': [round(score, 4) for score in self.scores],
+            'tables': [[[round(count, 4) for count in row] for row in table]
+                       for table in self.tables]
+        }
+    
+    def save(self, path):
+        """Atomically write the model state as JSON"""
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    
+    @classmethod
+    def load(cls, path, **options):
+        """Strategy restored from `path`, or a fresh one if there is none"""
+        if not os.path.exists(path):
+            return cls(**options)
+        with open(path) as f:
+            data = json.load(f)
+        strategy = cls(max_order=data['max_order'], **options)
+        if [len(table) for table in data['tables']] != strategy.sizes:
+            raise ValueError(f"{path} does not match max_order {data['max_order']}")
+        strategy.tables = data['tables']
+        strategy.contexts = data['contexts']
+        strategy.scores = data['scores']
+        strategy.rounds = data['rounds']
+        return strategy
+
+
+class RandomStrategy:
+    """AI opponent that throws uniformly at random"""
+    choices = PatternStrategy.choices
+    
+    def choose_index(self, rng):
+        return rng.randrange(3)
+    
+    def choose(self, rng):
+        return self.choices[self.choose_index(rng)]
+    
+    def observe_index(self, player, ai):
+        pass
+    
+    def observe(self, player, ai):
+        pass
+
+
+class GameSession:
+    """Rules, state and scores of one game, without camera, hand model or drawing
+    
+    Feed it a gesture (set_hand or current_gesture and confidence) and
+    call update_game once per frame. RockPaperScissorsWorld adds the
+    camera loop and the screen; GameServer runs bare sessions.
+    """
+    def __init__(self, persist=True, seed=None, players=1, clock=None):
+        """persist=False keeps the saved statistics untouched and seed makes
+        the AI's choices reproducible. players=2 plays two hands against
+        each other instead of against the AI. clock defaults to a
+        RealClock; a VirtualClock runs the game faster than real time."""
+        self.classifier = GestureClassifier()
+        
+        # Game clock, a VirtualClock for replays and simulations
+        self.clock = clock if clock is not None else RealClock()
+        self.rng = random.Random(seed)
+        self.persist = persist
+        self.game_log = GameLog() if persist else None
+        # AI opponent, learned from this player's rounds and saved on exit
+        self.strategy = PatternStrategy()
+        self.strategy_path = 'rps_ai.json' if persist else None
         
         # Game states
         self.state = "menu"  # menu, countdown, battle, result, options
@@ -36,274 +1390,426 @@ class RockPaperScissorsWorld:
         # Countdown variables
         self.countdown_start = 0
         self.countdown_phase = 0  # 0=rock, 1=paper, 2=scissors, 3=shoot
-        self.countdown_texts = ["ROCK", "PAPER", "SCISSORS", "SHOOT!"]
         
         # Gesture detection
         self.current_gesture = "none"
         self.confidence = 0
-        self.stable_start = 0
-        self.last_gesture = "none"
+        self.gesture_filter = TemporalGestureFilter()
+        
+        self.frame_age = 0.0  # capture to game update of the current frame
+        self.shoot_time = None
+        
+        # Two-player mode: left and right side of the mirrored screen
+        self.players = []
+        if players == 2:
+            self.players = [Player("PLAYER 1", 0.25), Player("PLAYER 2", 0.75)]
+        self.player_tracker = PlayerTracker(self.players) if self.players else None
         
-        # Menu interaction
-        self.finger_pos = (0, 0)
+        # Raw gestures by capture time, so the throw is read around SHOOT
+        self.set_throw_window(0.0, 0.6)
+        
+        # Menu interaction; the finger position is normalized like the layout
+        self.layout = UILayout()
+        self.finger_pos = (0.0, 0.0)
         self.pointing = False
         self.menu_hover = -1
         
-        # FPS tracking
-        self.fps_count = 0
-        self.fps_start = time.time()
-        self.fps = 0
-        
-        # Colors
-        self.colors = {
-            'red': (0, 0, 255),
-            'green': (0, 255, 0),
-            'blue': (255, 0, 0),
-            'yellow': (0, 255, 255),
-            'white': (255, 255, 255),
-            'black': (0, 0, 0),
-            'skin': (180, 140, 120),
-            'dark_skin': (120, 90, 70)
-        }
-        
         # Load saved data
         self.load_data()
     
     def load_data(self):
-        """Load game statistics"""
+        """Load game statistics and the AI model"""
+        # The model lives in its own file, so it loads even when the stats don't
+        self.load_strategy()
+        if self.game_log is None:
+            return
         try:
-            if os.path.exists('rps_stats.json'):
-                with open('rps_stats.json', 'r') as f:
-                    data = json.load(f)
-                    self.player_wins = data.get('player_wins', 0)
-                    self.ai_wins = data.get('ai_wins', 0)
-                    self.ties = data.get('ties', 0)
-                    self.total_games = data.get('total_games', 0)
-        except:
-            pass
+            stats = self.game_log.load()
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Could not load game statistics: {e}")
+            return
+        for name, value in stats.items():
+            setattr(self, name, value)
     
-    def save_data(self):
-        """Save game statistics"""
+    def load_strategy(self):
+        """Restore the AI model saved next to the statistics"""
+        if self.strategy_path is None:
+            return
         try:
-            data = {
-                'player_wins': self.player_wins,
-                'ai_wins': self.ai_wins,
-                'ties': self.ties,
-                'total_games': self.total_games
-            }
-            with open('rps_stats.json', 'w') as f:
-                json.dump(data, f)
-        except:
-            pass
+            self.strategy = PatternStrategy.load(self.strategy_path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # Keep the unreadable file for inspection instead of saving over it
+            print(f"⚠️ Could not load AI model, it will not be saved: {e}")
+            self.strategy_path = None
+    
+    def save_strategy(self):
+        """Write the AI model next to the statistics"""
+        if self.strategy_path is None:
+            return
+        try:
+            self.strategy.save(self.strategy_path)
+        except OSError as e:
+            print(f"⚠️ Could not save AI model: {e}")
+    
+    def log_round(self):
+        """Queue the finished round for the background game log"""
+        if self.game_log is None:
+            return
+        self.game_log.append({
+            'time': self.clock.now(),
+            'player': self.player_choice,
+            'ai': self.ai_choice,
+            'result': ROUND_RESULTS[self.result],
+            'confidence': round(float(self.confidence), 3)
+        })
     
     def detect_gesture(self, landmarks):
-        """Enhanced gesture detection with better accuracy"""
-        if not landmarks:
-            return "none", 0
+        """Enhanced gesture detection with better accuracy
         
-        # Get key landmarks
-        thumb_tip = landmarks[4]
-        thumb_ip = landmarks[3]
-        thumb_mcp = landmarks[2]
-        index_tip = landmarks[8]
-        index_pip = landmarks[6]
-        index_mcp = landmarks[5]
-        middle_tip = landmarks[12]
-        middle_pip = landmarks[10]
-        middle_mcp = landmarks[9]
-        ring_tip = landmarks[16]
-        ring_pip = landmarks[14]
-        ring_mcp = landmarks[13]
-        pinky_tip = landmarks[20]
-        pinky_pip = landmarks[18]
-        pinky_mcp = landmarks[17]
-        wrist = landmarks[0]
+        landmarks may be MediaPipe landmarks or a (21, 3) array from
+        GestureClassifier.to_array.
+        """
+        if landmarks is None or len(landmarks) == 0:
+            return "none", 0
         
+        points = self.classifier.to_array(landmarks)
+        gesture, confidence = self.classifier.classify(points)
+        self.track_pointer(points, gesture)
+        return gesture, confidence
+    
+    def track_pointer(self, points, gesture):
+        """Update the menu pointer from a classified hand"""
         # Store finger position for menu interaction
-        self.finger_pos = (int(index_tip.x * 1280), int(index_tip.y * 720))
+        self.finger_pos = (float(points[8, 0]), float(points[8, 1]))
         
-        # More precise finger detection
-        fingers = []
+        # Thumbs up/down leave the pointer state as it was
+        if gesture not in ("thumbs_up", "thumbs_down"):
+            self.pointing = gesture == "pointing"
+    
+    def check_menu_hover(self):
+        """Hover over the menu buttons, or the options screen's back button (0)"""
+        if not self.pointing:
+            self.menu_hover = -1
+            return
+        self.menu_hover = self.layout.hit(self.state, *self.finger_pos)
+    
+    def update_game(self):
+        """Update game logic"""
+        current_time = self.clock.now()
+        # When the frame behind this update was captured, on the game clock
+        captured = current_time - self.frame_age
+        self.timeline.add(captured, self.current_gesture, self.confidence)
+        
+        # Smoothed gesture and how long it has held
+        gesture_filter = self.gesture_filter
+        self.current_gesture = gesture_filter.update(self.current_gesture, self.confidence,
+                                                     current_time)
+        for player in self.players:
+            player.update(current_time, captured)
+        stable_time = gesture_filter.stable_time(current_time)
         
-        # Thumb - improved detection for both hands
-        thumb_is_open = False
-        if thumb_tip.x > wrist.x:  # Right hand
-            thumb_is_open = thumb_tip.x > thumb_ip.x + 0.03
-        else:  # Left hand
-            thumb_is_open = thumb_tip.x < thumb_ip.x - 0.03
-        fingers.append(thumb_is_open)
+        # Different stability requirements for different gestures
+        min_stable_time = gesture_filter.required_time(self.state)
         
-        # Index finger - more sensitive
-        index_is_open = index_tip.y < index_pip.y - 0.03
-        fingers.append(index_is_open)
+        # Menu logic with improved responsiveness
+        if self.state == "menu":
+            self.check_menu_hover()
+            
+            if self.current_gesture == "thumbs_up" and stable_time > min_stable_time:
+                self.start_game()
+                gesture_filter.restart()
+            elif self.current_gesture == "thumbs_down" and stable_time > min_stable_time:
+                return False
+            elif self.current_gesture == "pointing" and self.menu_hover >= 0 and stable_time > min_stable_time:
+                if self.menu_hover == 0:
+                    self.start_game()
+                elif self.menu_hover == 1:
+                    self.state = "options"
+                elif self.menu_hover == 2:
+                    return False
+                gesture_filter.restart()
         
-        # Middle finger - more sensitive
-        middle_is_open = middle_tip.y < middle_pip.y - 0.03
-        fingers.append(middle_is_open)
+        # Options logic with improved back navigation
+        elif self.state == "options":
+            self.check_menu_hover()  # Check for back button hover
+            
+            if self.current_gesture == "thumbs_down" and stable_time > min_stable_time:
+                self.state = "menu"
+                gesture_filter.restart()
+            elif self.current_gesture == "pointing" and self.menu_hover == 0 and stable_time > min_stable_time:
+                # Back button clicked with finger
+                self.state = "menu"
+                gesture_filter.restart()
         
-        # Ring finger - more sensitive
-        ring_is_open = ring_tip.y < ring_pip.y - 0.03
-        fingers.append(ring_is_open)
+        # Countdown logic
+        elif self.state == "countdown":
+            elapsed = current_time - self.countdown_start
+            
+            if elapsed >= 1.0:
+                self.countdown_phase += 1
+                self.countdown_start = current_time
+                
+                if self.countdown_phase == 3:
+                    # SHOOT! is on screen from the frame drawn after this update
+                    self.shoot_time = current_time
+                elif self.countdown_phase >= 4:
+                    self.execute_battle()
         
-        # Pinky finger - more sensitive
-        pinky_is_open = pinky_tip.y < pinky_pip.y - 0.03
-        fingers.append(pinky_is_open)
+        # Result logic
+        elif self.state == "result":
+            if current_time - self.countdown_start >= 3.0:
+                self.state = "menu"
         
-        finger_count = sum(fingers)
+        return True
+    
+    def start_game(self):
+        """Start new game"""
+        self.state = "countdown"
+        self.countdown_phase = 0
+        self.countdown_start = self.clock.now()
+        self.shoot_time = None
+        self.ai_choice = self.strategy.choose(self.rng)
+    
+    def execute_battle(self):
+        """Execute battle and determine winner"""
+        if self.players:
+            self.execute_versus_battle()
+            return
         
-        # PRIORITY 1: Special gestures (thumbs up/down, pointing)
+        self.player_choice = self.resolve_throw(self.timeline, self.current_gesture)
         
-        # Thumbs up - thumb up, others down, proper orientation
-        thumb_vertical_up = (thumb_tip.y < thumb_ip.y - 0.06) and (thumb_tip.y < thumb_mcp.y - 0.08)
-        other_fingers_closed = not any(fingers[1:4])  # Index, middle, ring, pinky closed
+        # Determine winner
+        if self.player_choice == self.ai_choice:
+            self.result = "TIE!"
+            self.ties += 1
+        elif ((self.player_choice == "rock" and self.ai_choice == "scissors") or
+              (self.player_choice == "paper" and self.ai_choice == "rock") or
+              (self.player_choice == "scissors" and self.ai_choice == "paper")):
+            self.result = "YOU WIN!"
+            self.player_wins += 1
+        else:
+            self.result = "YOU LOSE!"
+            self.ai_wins += 1
         
-        if thumb_vertical_up and other_fingers_closed:
-            return "thumbs_up", 0.95
+        self.total_games += 1
+        self.strategy.observe(self.player_choice, self.ai_choice)
+        self.log_round()
         
-        # Thumbs down - improved detection with better positioning
-        thumb_vertical_down = (thumb_tip.y > thumb_ip.y + 0.04) and (thumb_tip.y > thumb_mcp.y + 0.06)
-        thumb_pointing_down = thumb_tip.y > wrist.y + 0.05  # Thumb clearly below wrist
+        self.state = "result"
+        self.countdown_start = self.clock.now()
+    
+    def resolve_throw(self, timeline, fallback):
+        """The throw captured around the SHOOT instant
+        
+        Frames captured within `throw_window` of SHOOT vote by confidence.
+        Without a throw among them the current gesture counts, then rock.
+        """
+        before, after = self.throw_window
+        shoot = self.shoot_time if self.shoot_time is not None else self.clock.now()
+        throw = timeline.resolve(shoot - before, shoot + after, self.choices)
+        if throw is not None:
+            return throw[0]
+        return fallback if fallback in self.choices else "rock"
+    
+    def set_throw_window(self, before, after):
+        """Read throws from frames captured `before` to `after` seconds around SHOOT
+        
+        Timelines keep the frames from the window's start until the battle,
+        one countdown step after SHOOT, plus some capture latency.
+        """
+        self.throw_window = (before, after)
+        seconds = before + max(after, 1.0) + 0.5
+        self.timeline = GestureTimeline(seconds)
+        for player in self.players:
+            player.timeline = GestureTimeline(seconds)
+    
+    def execute_versus_battle(self):
+        """Two-player battle decided by each player's own stable gesture
         
-        if thumb_vertical_down and thumb_pointing_down and other_fingers_closed:
-            return "thumbs_down", 0.95
+        Session scores live on the players; the saved single-player
+        statistics are left alone.
+        """
+        first, second = self.players
+        for player in self.players:
+            player.choice = self.resolve_throw(player.timeline, player.gesture)
         
-        # Pointing - only index finger extended
-        only_index_up = fingers[1] and not fingers[0] and not fingers[2] and not fingers[3] and not fingers[4]
+        if first.choice == second.choice:
+            self.result = "TIE!"
+        else:
+            beats = {"rock": "scissors", "paper": "rock", "scissors": "paper"}
+            winner = first if beats[first.choice] == second.choice else second
+            winner.wins += 1
+            self.result = f"{winner.name} WINS!"
         
-        if only_index_up:
-            self.pointing = True
-            return "pointing", 0.95
+        self.state = "result"
+        self.countdown_start = self.clock.now()
+    
+    def use_classifier(self, classifier, stability_scale=1.0):
+        """Swap the gesture classifier, scaling how long gestures must hold"""
+        self.classifier = classifier
+        self.gesture_filter = TemporalGestureFilter(stability_scale=stability_scale)
+        for player in self.players:
+            player.gesture_filter = TemporalGestureFilter(stability_scale=stability_scale)
+    
+    def apply_settings(self, settings):
+        """Set the AI, classifier, gesture stability and throw window from a
+        settings dict, as stored in landmark recordings for their replay"""
+        if settings.get('ai') == "random":
+            self.strategy, self.strategy_path = RandomStrategy(), None
+        stability_scale = settings.get('stability_scale', 1.0)
+        if settings.get('classifier'):
+            self.use_classifier(LearnedGestureClassifier.load(settings['classifier']),
+                                stability_scale)
+        elif stability_scale != 1.0:
+            self.use_classifier(self.classifier, stability_scale)
+        if 'aspect' in settings:
+            # Live frames set it again; replays have no frames to take it from
+            self.classifier.aspect = settings['aspect']
+        self.set_throw_window(*settings.get('throw_window', (0.0, 0.6)))
+    
+    def set_hand(self, points):
+        """Set the current gesture from a (21, 3) landmark array, None for no hand"""
+        if points is not None:
+            self.current_gesture, self.confidence = self.detect_gesture(points)
         else:
+            self.current_gesture = "none"
+            self.confidence = 0
             self.pointing = False
-        
-        # PRIORITY 2: Rock Paper Scissors gestures
-        
-        # Scissors - IMPROVED: exactly index and middle up, others down
-        scissors_pattern = (fingers[1] and fingers[2] and 
-                           not fingers[0] and not fingers[3] and not fingers[4])
-        
-        # Additional check: ensure index and middle are well separated
-        index_middle_separation = abs(index_tip.x - middle_tip.x) > 0.08
-        both_fingers_high = (index_tip.y < index_mcp.y - 0.05) and (middle_tip.y < middle_mcp.y - 0.05)
-        
-        if scissors_pattern and index_middle_separation and both_fingers_high:
-            return "scissors", 0.92
-        
-        # Rock - no fingers or only thumb slightly up
-        if finger_count == 0 or (finger_count == 1 and fingers[0]):
-            return "rock", 0.9
-        
-        # Paper - 4 or 5 fingers up (excluding thumb sometimes)
-        if finger_count >= 4:
-            return "paper", 0.9
-        
-        # If we have 2-3 fingers but not scissors pattern, check for partial gestures
-        if finger_count == 2:
-            # Could be partial scissors or other gesture
-            if fingers[1] and fingers[2]:  # Index and middle up
-                return "scissors", 0.7  # Lower confidence
-            else:
-                return "rock", 0.6  # Probably transitioning to rock
-        
-        if finger_count == 3:
-            # Probably transitioning to paper
-            return "paper", 0.6
-        
-        return "none", 0.3
+
+
+class RockPaperScissorsWorld(GameSession):
+    # Loop stages in report order; capture and inference may run on worker threads
+    profile_stages = ("capture", "preprocess", "inference", "landmarks", "gesture",
+                      "update", "draw", "display", "render", "decision", "latency")
     
-    def check_menu_hover(self):
-        """Improved menu hover detection with back button support"""
-        if not self.pointing:
-            self.menu_hover = -1
-            return
+    def __init__(self, enable_hands=True, persist=True, seed=None, players=1, clock=None,
+                 background=True, tracking=True):
+        """enable_hands=False skips the MediaPipe model (e.g. for replays),
+        persist=False keeps the saved statistics untouched and seed makes
+        the AI's choices reproducible. players=2 plays two hands against
+        each other instead of against the AI. clock defaults to a
+        RealClock; a VirtualClock runs the game faster than real time.
+        background=False waits for the hand model instead of loading it
+        while the game starts. tracking=False detects hands afresh in
+        every image, as AdaptiveHandInference's moving crops need."""
+        super().__init__(persist, seed, players, clock)
         
-        x, y = self.finger_pos
+        # Initialize MediaPipe
+        self.hands = None
+        if enable_hands:
+            self.hands = BackgroundHands(
+                static_image_mode=not tracking,
+                max_num_hands=2 if players == 2 else 1,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.3
+            )
+            if not background:
+                self.hands.wait()
+        self.ui_layers = UILayerCache()
+        self.sprites = SpriteCache(self.draw_hand_shape, radius=80)
+        self.text = TextCache()
+        
+        # Countdown labels, by countdown_phase
+        self.countdown_texts = ["ROCK", "PAPER", "SCISSORS", "SHOOT!"]
         
-        if self.state == "menu":
-            # Main menu button areas (larger for easier selection)
-            buttons = [
-                (300, 215, 980, 285),  # Start - bigger area
-                (300, 295, 980, 365),  # Options - bigger area  
-                (300, 375, 980, 445)   # Exit - bigger area
-            ]
-            
-            self.menu_hover = -1
-            for i, (x1, y1, x2, y2) in enumerate(buttons):
-                if x1 <= x <= x2 and y1 <= y <= y2:
-                    self.menu_hover = i
-                    break
+        self.recorder = None
+        self.video = None  # VideoRecorder of rendered rounds
+        self.skeleton = SkeletonRenderer()
+        self.inference = None  # e.g. AdaptiveHandInference
+        self.power_save = None  # IdleHandInference somewhere in the inference chain
         
-        elif self.state == "options":
-            # Back button area in options screen
-            if 100 <= x <= 300 and (720 - 120) <= y <= (720 - 70):  # Back button
-                self.menu_hover = 0  # Use 0 for back button
-            else:
-                self.menu_hover = -1
-    
-    def update_fps(self):
-        """Update FPS counter"""
-        self.fps_count += 1
-        current_time = time.time()
+        # Per-stage timings and FPS
+        self.profiler = StageProfiler(self.profile_stages)
+        self.fps = 0
+        self.debug_overlay = False
+        self.profile_out = None
+        self.first_frame = None  # perf_counter time the first camera frame was shown
+        self.shown_at = 0.0
+        self.loading_fps = 30  # frame rate cap while the hand model loads
         
-        if current_time - self.fps_start >= 1.0:
-            self.fps = self.fps_count / (current_time - self.fps_start)
-            self.fps_count = 0
-            self.fps_start = current_time
+        # Colors
+        self.colors = {
+            'red': (0, 0, 255),
+            'green': (0, 255, 0),
+            'blue': (255, 0, 0),
+            'yellow': (0, 255, 255),
+            'white': (255, 255, 255),
+            'black': (0, 0, 0),
+            'skin': (180, 140, 120),
+            'dark_skin': (120, 90, 70)
+        }
+    
+    def execute_battle(self):
+        """Decide the round and record its capture-to-decision latency"""
+        super().execute_battle()
+        self.profiler['decision'].record(self.frame_age)
     
     def draw_menu(self, frame):
         """Draw main menu"""
         h, w = frame.shape[:2]
         
-        # Semi-transparent overlay
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (0, 0), (w, h), self.colors['black'], -1)
-        cv2.addWeighted(overlay, 0.5, frame, 0.5, 0, frame)
+        # Darkening overlay, title, buttons, instructions and stats only
+        # change with the hover state or the score
+        key = ("menu", w, h, self.menu_hover, self.player_wins, self.ai_wins, self.ties)
+        self.draw_static_layer(frame, key, self.draw_menu_static)
+        
+        # Corner panels keep their 1280x720 pixel sizes, scaled to the frame
+        s = self.layout.scale(w, h)
+        
+        def at(x, y):
+            return (round(x * s) if x >= 0 else w + round(x * s), round(y * s))
         
         # FPS counter
-        cv2.rectangle(frame, (10, 10), (120, 50), self.colors['black'], -1)
-        cv2.putText(frame, f"FPS: {self.fps:.1f}", (20, 35), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.colors['green'], 2)
+        cv2.rectangle(frame, at(10, 10), at(120, 50), self.colors['black'], -1)
+        self.text.put(frame, f"FPS: {self.fps:.1f}", at(20, 35), 
+                   0.6 * s, self.colors['green'], self.layout.thickness(2, w, h))
         
         # Gesture info with better visual feedback
-        cv2.rectangle(frame, (w-220, 10), (w-10, 100), self.colors['black'], -1)
+        cv2.rectangle(frame, at(-220, 10), at(-10, 100), self.colors['black'], -1)
         color = self.colors['green'] if self.confidence > 0.8 else self.colors['yellow'] if self.confidence > 0.5 else self.colors['red']
         
-        cv2.putText(frame, f"Gesture: {self.current_gesture}", (w-210, 30), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
-        cv2.putText(frame, f"Conf: {self.confidence:.2f}", (w-210, 50), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+        self.text.put(frame, f"Gesture: {self.current_gesture}", at(-210, 30), 
+                   0.5 * s, color, 1)
+        self.text.put(frame, f"Conf: {self.confidence:.2f}", at(-210, 50), 
+                   0.5 * s, color, 1)
         
         # Show stability indicator
-        if hasattr(self, 'stable_start') and self.stable_start > 0:
-            stability = min(1.0, (time.time() - self.stable_start) / 0.8)
-            cv2.putText(frame, f"Stable: {stability:.1f}", (w-210, 70), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, self.colors['green'] if stability > 0.7 else self.colors['yellow'], 1)
+        if self.gesture_filter.since is not None:
+            stability = min(1.0, self.gesture_filter.stable_time(self.clock.now()) / 0.8)
+            self.text.put(frame, f"Stable: {stability:.1f}", at(-210, 70), 
+                       0.5 * s, self.colors['green'] if stability > 0.7 else self.colors['yellow'], 1)
         
         # Show gesture history for debugging
-        if hasattr(self, 'gesture_history') and len(self.gesture_history) > 0:
-            recent = "->".join(self.gesture_history[-3:])
-            cv2.putText(frame, f"History: {recent}", (w-210, 90), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, self.colors['white'], 1)
+        if self.gesture_filter.count > 0:
+            recent = "->".join(self.gesture_filter.recent(3))
+            self.text.put(frame, f"History: {recent}", at(-210, 90), 
+                       0.4 * s, self.colors['white'], 1)
+    
+    def draw_menu_static(self, frame):
+        """Draw the parts of the main menu that rarely change"""
+        h, w = frame.shape[:2]
+        layout = self.layout
+        s = layout.scale(w, h)
+        
+        # Semi-transparent overlay
+        overlay = frame.copy()
+        cv2.rectangle(overlay, (0, 0), (w, h), self.colors['black'], -1)
+        cv2.addWeighted(overlay, 0.5, frame, 0.5, 0, frame)
         
         # Title
         title = "ROCK PAPER SCISSORS WORLD"
-        title_size = cv2.getTextSize(title, cv2.FONT_HERSHEY_SIMPLEX, 1.5, 3)[0]
+        title_size = self.text.size(title, 1.5 * s, layout.thickness(3, w, h))
         title_x = (w - title_size[0]) // 2
+        title_y = round(0.139 * h)
         
         # Title with glow
-        for i in range(3):
-            glow = (50 + i*30, 50 + i*30, 100 + i*40)
-            cv2.putText(frame, title, (title_x - i, 100 + i), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.5, glow, 3 + i)
-        
-        cv2.putText(frame, title, (title_x, 100), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 1.5, self.colors['yellow'], 3)
+        glow = [(-i, i, (50 + i*30, 50 + i*30, 100 + i*40), layout.thickness(3 + i, w, h))
+                for i in range(3)]
+        self.text.put(frame, title, (title_x, title_y), 
+                   1.5 * s, self.colors['yellow'], layout.thickness(3, w, h), under=glow)
         
         # Menu buttons
-        options = ["START THE WAR", "OPTIONS", "EXIT"]
-        y_positions = [250, 330, 410]
-        
-        for i, (option, y) in enumerate(zip(options, y_positions)):
+        for i, button in enumerate(layout.buttons["menu"]):
             # Button color
             if i == self.menu_hover:
                 btn_color = self.colors['green']
@@ -311,14 +1817,16 @@ class RockPaperScissorsWorld:
                 btn_color = self.colors['blue']
             
             # Draw button
-            cv2.rectangle(frame, (350, y - 25), (930, y + 25), btn_color, -1)
-            cv2.rectangle(frame, (350, y - 25), (930, y + 25), self.colors['white'], 2)
+            top_left, bottom_right = layout.rect(button.box, w, h)
+            cv2.rectangle(frame, top_left, bottom_right, btn_color, -1)
+            cv2.rectangle(frame, top_left, bottom_right, self.colors['white'], layout.thickness(2, w, h))
             
             # Button text
-            text_size = cv2.getTextSize(option, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)[0]
-            text_x = (w - text_size[0]) // 2
-            cv2.putText(frame, option, (text_x, y + 8), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, self.colors['white'], 2)
+            text_size = self.text.size(button.label, 0.8 * s, layout.thickness(2, w, h))
+            text_x = (top_left[0] + bottom_right[0] - text_size[0]) // 2
+            text_y = (top_left[1] + bottom_right[1] + text_size[1]) // 2
+            self.text.put(frame, button.label, (text_x, text_y), 
+                       0.8 * s, self.colors['white'], layout.thickness(2, w, h))
         
         # Instructions
         instructions = [
@@ -328,13 +1836,25 @@ class RockPaperScissorsWorld:
         ]
         
         for i, instruction in enumerate(instructions):
-            cv2.putText(frame, instruction, (50, h - 100 + i * 25), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, self.colors['white'], 2)
+            self.text.put(frame, instruction, layout.point(0.039, 0.861 + i * 0.035, w, h), 
+                       0.6 * s, self.colors['white'], layout.thickness(2, w, h))
         
         # Stats
         stats = f"Wins: {self.player_wins} | Losses: {self.ai_wins} | Ties: {self.ties}"
-        cv2.putText(frame, stats, (50, h - 20), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, self.colors['yellow'], 2)
+        self.text.put(frame, stats, layout.point(0.039, 0.972, w, h), 
+                   0.7 * s, self.colors['yellow'], layout.thickness(2, w, h))
+    
+    def draw_static_layer(self, frame, key, draw):
+        """Draw a screen's static parts, through the layer cache if enabled
+        
+        The cached layer is rasterized once per key; with the cache
+        disabled everything is drawn straight onto the frame, which is
+        also the reference the benchmark compares against.
+        """
+        if self.ui_layers.enabled:
+            self.ui_layers.get(key, frame.shape, draw).composite(frame)
+        else:
+            draw(frame)
     
     def draw_countdown(self, frame):
         """Draw countdown animation"""
@@ -347,128 +1867,178 @@ class RockPaperScissorsWorld:
             color = colors[self.countdown_phase]
             
             # Animated size
-            elapsed = time.time() - self.countdown_start
-            scale = 3 + np.sin(elapsed * 10) * 0.5
+            elapsed = self.clock.now() - self.countdown_start
+            scale = (3 + np.sin(elapsed * 10) * 0.5) * self.layout.scale(w, h)
+            thickness = self.layout.thickness(8, w, h)
             
-            text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, 8)[0]
+            text_size = self.text.size(text, scale, thickness)
             text_x = (w - text_size[0]) // 2
             text_y = (h + text_size[1]) // 2
+            shadow = self.layout.thickness(5, w, h)
             
-            # Shadow
-            cv2.putText(frame, text, (text_x + 5, text_y + 5), 
-                       cv2.FONT_HERSHEY_SIMPLEX, scale, self.colors['black'], 8)
-            
-            # Main text
-            cv2.putText(frame, text, (text_x, text_y), 
-                       cv2.FONT_HERSHEY_SIMPLEX, scale, color, 8)
+            # Main text over its shadow
+            self.text.put(frame, text, (text_x, text_y), scale, color, thickness,
+                          under=[(shadow, shadow, self.colors['black'], thickness)])
     
     def draw_battle(self, frame):
         """Draw battle arena"""
         h, w = frame.shape[:2]
+        layout = self.layout
+        s = layout.scale(w, h)
         
         # Split screen
-        cv2.line(frame, (w//2, 0), (w//2, h), self.colors['white'], 3)
+        cv2.line(frame, (w//2, 0), (w//2, h), self.colors['white'], layout.thickness(3, w, h))
         
         # Labels
-        cv2.putText(frame, "YOU", (w//4 - 50, 50), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 1.5, self.colors['green'], 3)
-        cv2.putText(frame, "AI", (3*w//4 - 30, 50), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 1.5, self.colors['red'], 3)
+        self.text.put(frame, "YOU", layout.point(0.211, 0.069, w, h), 
+                   1.5 * s, self.colors['green'], layout.thickness(3, w, h))
+        self.text.put(frame, "AI", layout.point(0.727, 0.069, w, h), 
+                   1.5 * s, self.colors['red'], layout.thickness(3, w, h))
         
-        # Draw AI hand
-        self.draw_ai_hand(frame, 3*w//4, h//2)
+        # Draw AI hand, sized for the frame
+        self.draw_ai_hand(frame, 3*w//4, h//2, s)
         
         # Show result if battle over
         if self.state == "result":
-            cv2.putText(frame, f"You: {self.player_choice.upper()}", (50, h - 100), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, self.colors['white'], 2)
-            cv2.putText(frame, f"AI: {self.ai_choice.upper()}", (w//2 + 50, h - 100), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, self.colors['white'], 2)
-            
-            # Result
-            if "WIN" in self.result:
-                result_color = self.colors['green']
-            elif "LOSE" in self.result:
-                result_color = self.colors['red']
-            else:
-                result_color = self.colors['yellow']
-            
-            result_size = cv2.getTextSize(self.result, cv2.FONT_HERSHEY_SIMPLEX, 2, 4)[0]
-            result_x = (w - result_size[0]) // 2
-            cv2.putText(frame, self.result, (result_x, 150), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 2, result_color, 4)
+            self.text.put(frame, f"You: {self.player_choice.upper()}", layout.point(0.039, 0.861, w, h), 
+                       s, self.colors['white'], layout.thickness(2, w, h))
+            self.text.put(frame, f"AI: {self.ai_choice.upper()}", layout.point(0.539, 0.861, w, h), 
+                       s, self.colors['white'], layout.thickness(2, w, h))
+            self.draw_result(frame)
     
-    def draw_ai_hand(self, frame, cx, cy):
+    def draw_versus(self, frame):
+        """Draw the two-player battle arena"""
+        h, w = frame.shape[:2]
+        layout = self.layout
+        s = layout.scale(w, h)
+        
+        # Split screen
+        cv2.line(frame, (w//2, 0), (w//2, h), self.colors['white'], layout.thickness(3, w, h))
+        
+        for player, x, color in zip(self.players, (0.039, 0.539),
+                                    (self.colors['green'], self.colors['blue'])):
+            self.text.put(frame, f"{player.name}: {player.wins}", layout.point(x, 0.069, w, h), 
+                       1.2 * s, color, layout.thickness(3, w, h))
+            shown = player.choice if self.state == "result" else player.gesture
+            self.text.put(frame, shown.upper(), layout.point(x, 0.861, w, h), 
+                       s, self.colors['white'], layout.thickness(2, w, h))
+        
+        if self.state == "result":
+            self.draw_result(frame)
+    
+    def draw_result(self, frame):
+        """Draw the round result in the middle of the screen"""
+        h, w = frame.shape[:2]
+        if "WIN" in self.result:
+            result_color = self.colors['green']
+        elif "LOSE" in self.result:
+            result_color = self.colors['red']
+        else:
+            result_color = self.colors['yellow']
+        
+        scale = 2 * self.layout.scale(w, h)
+        thickness = self.layout.thickness(4, w, h)
+        result_size = self.text.size(self.result, scale, thickness)
+        result_x = (w - result_size[0]) // 2
+        self.text.put(frame, self.result, (result_x, round(0.208 * h)), 
+                   scale, result_color, thickness)
+    
+    def draw_ai_hand(self, frame, cx, cy, scale=1.0):
         """Draw realistic AI hand"""
+        if self.ai_choice not in self.choices:
+            return
+        if self.sprites.enabled:
+            self.sprites.blit(frame, self.ai_choice, cx, cy, scale)
+        else:
+            self.draw_hand_shape(frame, cx, cy, self.ai_choice, scale)
+    
+    def draw_hand_shape(self, frame, cx, cy, choice, scale=1.0):
+        """Draw a rock, paper or scissors hand with draw calls"""
         skin = self.colors['skin']
         dark = self.colors['dark_skin']
         
-        if self.ai_choice == "rock":
+        def at(dx, dy):
+            return (cx + round(dx * scale), cy + round(dy * scale))
+        
+        def size(*values):
+            sized = tuple(round(v * scale) for v in values)
+            return sized if len(sized) > 1 else max(1, sized[0])
+        
+        if choice == "rock":
             # Fist
-            cv2.ellipse(frame, (cx, cy), (45, 35), 0, 0, 360, skin, -1)
-            cv2.ellipse(frame, (cx, cy), (45, 35), 0, 0, 360, dark, 3)
+            cv2.ellipse(frame, at(0, 0), size(45, 35), 0, 0, 360, skin, -1)
+            cv2.ellipse(frame, at(0, 0), size(45, 35), 0, 0, 360, dark, size(3))
             
             # Knuckles
-            knuckles = [(cx-25, cy-10), (cx-8, cy-15), (cx+8, cy-15), (cx+25, cy-10)]
+            knuckles = [(-25, -10), (-8, -15), (8, -15), (25, -10)]
             for kx, ky in knuckles:
-                cv2.circle(frame, (kx, ky), 8, skin, -1)
-                cv2.circle(frame, (kx, ky), 8, dark, 2)
+                cv2.circle(frame, at(kx, ky), size(8), skin, -1)
+                cv2.circle(frame, at(kx, ky), size(8), dark, size(2))
             
             # Thumb
-            cv2.ellipse(frame, (cx-35, cy+5), (12, 20), 45, 0, 360, skin, -1)
-            cv2.ellipse(frame, (cx-35, cy+5), (12, 20), 45, 0, 360, dark, 2)
+            cv2.ellipse(frame, at(-35, 5), size(12, 20), 45, 0, 360, skin, -1)
+            cv2.ellipse(frame, at(-35, 5), size(12, 20), 45, 0, 360, dark, size(2))
         
-        elif self.ai_choice == "paper":
+        elif choice == "paper":
             # Palm
-            cv2.ellipse(frame, (cx, cy+15), (35, 45), 0, 0, 360, skin, -1)
-            cv2.ellipse(frame, (cx, cy+15), (35, 45), 0, 0, 360, dark, 3)
+            cv2.ellipse(frame, at(0, 15), size(35, 45), 0, 0, 360, skin, -1)
+            cv2.ellipse(frame, at(0, 15), size(35, 45), 0, 0, 360, dark, size(3))
             
             # Fingers
             fingers = [
-                (cx-25, cy-30, 12, 40),  # Pinky
-                (cx-8, cy-40, 14, 50),   # Ring
-                (cx+8, cy-42, 14, 52),   # Middle
-                (cx+25, cy-35, 13, 45),  # Index
+                (-25, -30, 12, 40),  # Pinky
+                (-8, -40, 14, 50),   # Ring
+                (8, -42, 14, 52),    # Middle
+                (25, -35, 13, 45),   # Index
             ]
             
             for fx, fy, fw, fh in fingers:
-                cv2.ellipse(frame, (fx, fy), (fw//2, fh//2), 0, 0, 360, skin, -1)
-                cv2.ellipse(frame, (fx, fy), (fw//2, fh//2), 0, 0, 360, dark, 2)
+                cv2.ellipse(frame, at(fx, fy), size(fw//2, fh//2), 0, 0, 360, skin, -1)
+                cv2.ellipse(frame, at(fx, fy), size(fw//2, fh//2), 0, 0, 360, dark, size(2))
                 
                 # Joints
-                cv2.circle(frame, (fx, fy-fh//4), 3, dark, -1)
-                cv2.circle(frame, (fx, fy+fh//4), 3, dark, -1)
+                cv2.circle(frame, at(fx, fy-fh//4), size(3), dark, -1)
+                cv2.circle(frame, at(fx, fy+fh//4), size(3), dark, -1)
             
             # Thumb
-            cv2.ellipse(frame, (cx-45, cy-5), (15, 25), 30, 0, 360, skin, -1)
-            cv2.ellipse(frame, (cx-45, cy-5), (15, 25), 30, 0, 360, dark, 2)
+            cv2.ellipse(frame, at(-45, -5), size(15, 25), 30, 0, 360, skin, -1)
+            cv2.ellipse(frame, at(-45, -5), size(15, 25), 30, 0, 360, dark, size(2))
         
-        elif self.ai_choice == "scissors":
+        elif choice == "scissors":
             # Palm
-            cv2.ellipse(frame, (cx, cy+20), (30, 35), 0, 0, 360, skin, -1)
-            cv2.ellipse(frame, (cx, cy+20), (30, 35), 0, 0, 360, dark, 3)
+            cv2.ellipse(frame, at(0, 20), size(30, 35), 0, 0, 360, skin, -1)
+            cv2.ellipse(frame, at(0, 20), size(30, 35), 0, 0, 360, dark, size(3))
             
             # Index finger
-            cv2.ellipse(frame, (cx-15, cy-25), (8, 30), -15, 0, 360, skin, -1)
-            cv2.ellipse(frame, (cx-15, cy-25), (8, 30), -15, 0, 360, dark, 2)
-            cv2.circle(frame, (cx-12, cy-35), 3, dark, -1)
+            cv2.ellipse(frame, at(-15, -25), size(8, 30), -15, 0, 360, skin, -1)
+            cv2.ellipse(frame, at(-15, -25), size(8, 30), -15, 0, 360, dark, size(2))
+            cv2.circle(frame, at(-12, -35), size(3), dark, -1)
             
             # Middle finger
-            cv2.ellipse(frame, (cx+15, cy-25), (8, 30), 15, 0, 360, skin, -1)
-            cv2.ellipse(frame, (cx+15, cy-25), (8, 30), 15, 0, 360, dark, 2)
-            cv2.circle(frame, (cx+12, cy-35), 3, dark, -1)
+            cv2.ellipse(frame, at(15, -25), size(8, 30), 15, 0, 360, skin, -1)
+            cv2.ellipse(frame, at(15, -25), size(8, 30), 15, 0, 360, dark, size(2))
+            cv2.circle(frame, at(12, -35), size(3), dark, -1)
             
             # Folded fingers
-            cv2.ellipse(frame, (cx+25, cy+5), (6, 15), 45, 0, 360, skin, -1)
-            cv2.ellipse(frame, (cx+30, cy+15), (5, 12), 60, 0, 360, skin, -1)
+            cv2.ellipse(frame, at(25, 5), size(6, 15), 45, 0, 360, skin, -1)
+            cv2.ellipse(frame, at(30, 15), size(5, 12), 60, 0, 360, skin, -1)
             
             # Thumb
-            cv2.ellipse(frame, (cx-35, cy+10), (12, 20), 45, 0, 360, skin, -1)
-            cv2.ellipse(frame, (cx-35, cy+10), (12, 20), 45, 0, 360, dark, 2)
+            cv2.ellipse(frame, at(-35, 10), size(12, 20), 45, 0, 360, skin, -1)
+            cv2.ellipse(frame, at(-35, 10), size(12, 20), 45, 0, 360, dark, size(2))
     
     def draw_options(self, frame):
         """Draw options screen with back button"""
         h, w = frame.shape[:2]
+        key = ("options", w, h, self.menu_hover,
+               self.total_games, self.player_wins, self.ai_wins, self.ties)
+        self.draw_static_layer(frame, key, self.draw_options_static)
+    
+    def draw_options_static(self, frame):
+        """Draw the options screen, which only changes with hover and stats"""
+        h, w = frame.shape[:2]
+        layout = self.layout
+        s = layout.scale(w, h)
         
         # Semi-transparent overlay
         overlay = frame.copy()
@@ -476,8 +2046,9 @@ class RockPaperScissorsWorld:
         cv2.addWeighted(overlay, 0.6, frame, 0.4, 0, frame)
         
         # Title
-        cv2.putText(frame, "STATISTICS", (w//2 - 150, 100), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 2, self.colors['yellow'], 4)
+        title_size = self.text.size("STATISTICS", 2 * s, layout.thickness(4, w, h))
+        self.text.put(frame, "STATISTICS", ((w - title_size[0]) // 2, round(0.139 * h)), 
+                   2 * s, self.colors['yellow'], layout.thickness(4, w, h))
         
         # Stats
         stats = [
@@ -489,235 +2060,1847 @@ class RockPaperScissorsWorld:
         ]
         
         for i, stat in enumerate(stats):
-            cv2.putText(frame, stat, (100, 200 + i * 50), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, self.colors['white'], 2)
+            self.text.put(frame, stat, layout.point(0.078, 0.278 + i * 0.069, w, h), 
+                       s, self.colors['white'], layout.thickness(2, w, h))
         
         # Back button for finger navigation
+        back = layout.buttons["options"][0]
         back_color = self.colors['green'] if self.menu_hover == 0 else self.colors['blue']
-        cv2.rectangle(frame, (100, h - 120), (300, h - 70), back_color, -1)
-        cv2.rectangle(frame, (100, h - 120), (300, h - 70), self.colors['white'], 2)
+        top_left, bottom_right = layout.rect(back.box, w, h)
+        cv2.rectangle(frame, top_left, bottom_right, back_color, -1)
+        cv2.rectangle(frame, top_left, bottom_right, self.colors['white'], layout.thickness(2, w, h))
         
-        cv2.putText(frame, "← BACK", (150, h - 85), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, self.colors['white'], 2)
+        self.text.put(frame, back.label, layout.point(0.117, 0.882, w, h), 
+                   0.8 * s, self.colors['white'], layout.thickness(2, w, h))
         
         # Instructions
-        cv2.putText(frame, "👎 Thumbs DOWN to go back", (400, h - 50), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, self.colors['yellow'], 2)
-        cv2.putText(frame, "👉 Point at BACK button", (400, h - 20), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, self.colors['yellow'], 2)
+        self.text.put(frame, "👎 Thumbs DOWN to go back", layout.point(0.312, 0.931, w, h), 
+                   0.8 * s, self.colors['yellow'], layout.thickness(2, w, h))
+        self.text.put(frame, "👉 Point at BACK button", layout.point(0.312, 0.972, w, h), 
+                   0.8 * s, self.colors['yellow'], layout.thickness(2, w, h))
     
-    def update_game(self):
-        """Update game logic"""
-        current_time = time.time()
-        
-        # Stable gesture detection
-        if self.current_gesture == self.last_gesture and self.current_gesture != "none":
-            if self.stable_start == 0:
-                self.stable_start = current_time
-        else:
-            self.stable_start = 0
-        
-        # Gesture smoothing and filtering
-        self.gesture_history = getattr(self, 'gesture_history', [])
-        self.gesture_history.append(self.current_gesture)
-        
-        # Keep only last 5 gestures for smoothing
-        if len(self.gesture_history) > 5:
-            self.gesture_history.pop(0)
-        
-        # Use most common gesture from recent history for stability
-        if len(self.gesture_history) >= 3:
-            gesture_counts = {}
-            for g in self.gesture_history[-3:]:  # Last 3 gestures
-                gesture_counts[g] = gesture_counts.get(g, 0) + 1
-            
-            # Get most frequent gesture
-            smoothed_gesture = max(gesture_counts, key=gesture_counts.get)
-            
-            # Only update if confidence is high enough or gesture is consistent
-            if gesture_counts[smoothed_gesture] >= 2:  # Appears at least twice
-                self.current_gesture = smoothed_gesture
+    def prepare_frame(self, frame):
+        """Mirror the camera frame and build the RGB copy for MediaPipe"""
+        mirrored = cv2.flip(frame, 1, dst=self.buffers.get('mirrored', frame.shape))
+        rgb_frame = cv2.cvtColor(mirrored, cv2.COLOR_BGR2RGB,
+                                 dst=self.buffers.get('rgb', frame.shape))
+        return mirrored, rgb_frame
+    
+    def infer_hands(self, rgb_frame):
+        """Run hand detection on an RGB frame"""
+        if self.inference is not None:
+            return self.inference.process(rgb_frame)
+        return self.hands.process(rgb_frame)
+    
+    def apply_hand_results(self, frame, results, capture_time=None):
+        """Draw detected hands and update the current gesture of a frame
+        captured at `capture_time` (perf_counter seconds)"""
+        # Landmarks are in frame widths and heights; the learned classifier
+        # needs their ratio to undo the hand's rotation
+        self.classifier.aspect = frame.shape[1] / frame.shape[0]
+        if self.players:
+            self.apply_player_hands(frame, results)
+            return
         
-        # Stable gesture detection with different thresholds for different states
-        if self.current_gesture == self.last_gesture and self.current_gesture != "none":
-            if self.stable_start == 0:
-                self.stable_start = current_time
+        points = handedness = None
+        if results.multi_hand_landmarks:
+            draw_time = gesture_time = 0.0
+            for i, hand_landmarks in enumerate(results.multi_hand_landmarks):
+                # Detect gesture
+                start = time.perf_counter()
+                points = self.classifier.to_array(hand_landmarks.landmark)
+                gesture, confidence = self.detect_gesture(points)
+                self.current_gesture = gesture
+                self.confidence = confidence
+                if results.multi_handedness:
+                    handedness = results.multi_handedness[i].classification[0].label
+                detected = time.perf_counter()
+                gesture_time += detected - start
+                
+                # Draw landmarks from the same array
+                self.skeleton.draw(frame, points, self.state)
+                draw_time += time.perf_counter() - detected
+            self.profiler['landmarks'].record(draw_time)
+            self.profiler['gesture'].record(gesture_time)
         else:
-            self.stable_start = 0
+            self.current_gesture = "none"
+            self.confidence = 0
+            self.pointing = False
         
-        stable_time = current_time - self.stable_start if self.stable_start > 0 else 0
+        if self.recorder is not None:
+            # Replays restore the age so throws resolve on the same timeline
+            age = 0.0 if capture_time is None else time.perf_counter() - capture_time
+            self.recorder.write(self.clock.now(), points, handedness, age)
+    
+    def apply_player_hands(self, frame, results):
+        """Two-player mode: classify all hands in one batch and route them to players
+        
+        The most confident hand also drives the menu.
+        """
+        for player in self.players:
+            player.raw_gesture = "none"
+            player.confidence = 0.0
+        hands = results.multi_hand_landmarks
+        if not hands:
+            self.current_gesture = "none"
+            self.confidence = 0
+            self.pointing = False
+            return
         
-        # Different stability requirements for different gestures
+        start = time.perf_counter()
+        points = np.stack([self.classifier.to_array(hand.landmark) for hand in hands])
+        stacked = time.perf_counter()
+        self.skeleton.draw(frame, points, self.state)
+        drawn = time.perf_counter()
+        self.profiler['landmarks'].record(drawn - stacked)
+        
+        gestures, confidences = self.classifier.classify_batch(points)
+        labels = [None] * len(hands)
+        if results.multi_handedness:
+            labels = [handedness.classification[0].label
+                      for handedness in results.multi_handedness]
+        # Middle finger knuckle (landmark 9) as the palm's screen position
+        order = self.player_tracker.assign(points[:, 9, 0].tolist(), labels)
+        for hand, index in enumerate(order):
+            player = self.players[index]
+            player.raw_gesture = str(gestures[hand])
+            player.confidence = float(confidences[hand])
+        
+        primary = int(np.argmax(confidences))
+        self.current_gesture = str(gestures[primary])
+        self.confidence = float(confidences[primary])
+        self.track_pointer(points[primary], self.current_gesture)
+        self.profiler['gesture'].record(time.perf_counter() - drawn + stacked - start)
+    
+    def render(self, frame):
+        """Draw the current screen on top of the camera frame"""
         if self.state == "menu":
-            required_stability = {
-                "thumbs_up": 0.6,
-                "thumbs_down": 0.6, 
-                "pointing": 0.3  # Faster response for pointing
-            }
+            self.draw_menu(frame)
+        elif self.state == "countdown":
+            self.draw_countdown(frame)
+        elif self.state in ["battle", "result"]:
+            if self.players:
+                self.draw_versus(frame)
+            else:
+                self.draw_battle(frame)
         elif self.state == "options":
-            required_stability = {
-                "thumbs_down": 0.5,  # Faster thumbs down in options
-                "pointing": 0.3
-            }
-        else:
-            required_stability = {
-                "rock": 0.4,
-                "paper": 0.4,
-                "scissors": 0.5  # Slightly longer for scissors accuracy
-            }
-        
-        min_stable_time = required_stability.get(self.current_gesture, 0.8)
+            self.draw_options(frame)
+        
+        # Show finger pointer in menu and options
+        if self.pointing and self.state in ["menu", "options"]:
+            h, w = frame.shape[:2]
+            pointer = self.layout.point(*self.finger_pos, w, h)
+            radius = self.layout.thickness(15, w, h)
+            cv2.circle(frame, pointer, radius, self.colors['yellow'], -1)
+            cv2.circle(frame, pointer, radius, self.colors['white'], self.layout.thickness(3, w, h))
+        
+        if self.hands_loading():
+            self.draw_banner(frame, "Starting hand tracking...")
+        elif self.idle():
+            self.draw_banner(frame, "Show a hand to play")
+    
+    def hands_loading(self):
+        return isinstance(self.hands, BackgroundHands) and not self.hands.ready.is_set()
+    
+    def idle(self):
+        return self.power_save is not None and self.power_save.idle
+    
+    def skip_idle_frame(self, source, read_at=0.0):
+        """Whether to grab the next camera frame without processing it
+        
+        While the idle gate waits for its next motion check, live frames
+        are not decoded, mirrored or converted. Grabbing them rather than
+        sleeping keeps the camera's buffer drained, so the next check
+        sees a fresh frame. `read_at` is when the loop last read a frame
+        that may not have reached the gate yet.
+        """
+        if not (source.live and self.idle()):
+            return False
+        power_save = self.power_save
+        return not power_save.due() or time.perf_counter() - read_at < 1 / power_save.idle_fps
+    
+    def frame_cap(self):
+        """Frame rate the loop is held to right now, None for unpaced"""
+        if self.hands_loading():
+            return self.loading_fps
+        if self.idle():
+            return self.power_save.idle_fps
+        return None
+    
+    def draw_banner(self, frame, text):
+        """Status banner below the menu, e.g. while the hand model loads"""
+        h, w = frame.shape[:2]
+        scale = 0.8 * self.layout.scale(w, h)
+        thickness = self.layout.thickness(2, w, h)
+        text_w, text_h = self.text.size(text, scale, thickness)
+        x, y = (w - text_w) // 2, round(0.75 * h)
+        pad = self.layout.thickness(12, w, h)
+        cv2.rectangle(frame, (x - pad, y - text_h - pad), (x + text_w + pad, y + pad),
+                      self.colors['black'], -1)
+        self.text.put(frame, text, (x, y), scale, self.colors['yellow'], thickness)
+    
+    def splash(self, width, height):
+        """Menu on a plain background, shown before the camera has opened"""
+        frame = np.full((height, width, 3), 40, dtype=np.uint8)
+        self.render(frame)
+        return frame
+    
+    def present(self, frame, capture_time, queue_depth=None):
+        """Game update, rendering and display for one processed frame"""
+        profiler = self.profiler
+        start = time.perf_counter()
+        self.fps = profiler.tick()
+        
+        # Update game; frame_age places this frame's gesture on the timeline
+        self.frame_age = start - capture_time
+        if not self.update_game():
+            return False
+        updated = time.perf_counter()
+        profiler['update'].record(updated - start)
+        
+        self.render(frame)
+        if self.debug_overlay:
+            profiler.draw_overlay(frame, self.text)
+        drawn = time.perf_counter()
+        profiler['draw'].record(drawn - updated)
+        if self.video is not None:
+            # Only a copy into a queued buffer; encoding runs on the recorder's thread
+            self.video.follow(self.state)
+            self.video.write(frame)
+            recorded = time.perf_counter()
+            profiler['record'].record(recorded - drawn)
+            drawn = recorded
+        
+        # Display, exit on 'q' and toggle the profiling overlay on 'd'
+        key = self.sink.show(frame) & 0xFF
+        if key == ord('d'):
+            self.debug_overlay = not self.debug_overlay
+        
+        now = time.perf_counter()
+        if self.first_frame is None:
+            self.first_frame = now
+        profiler['display'].record(now - drawn)
+        profiler['render'].record(now - start, queue_depth)
+        profiler['latency'].record(now - capture_time)
+        
+        cap = self.frame_cap()
+        if cap:
+            # Unpaced sources would otherwise starve the model loading
+            # thread, and an idle game only needs a few frames a second
+            pause = 1 / cap - (now - self.shown_at)
+            if pause > 0:
+                time.sleep(pause)
+                now = time.perf_counter()
+        self.shown_at = now
+        return key != ord('q')
+    
+    def export_profile(self, *_):
+        """Write the stage profile to profile_out (also the SIGUSR1 handler)"""
+        self.profiler.export(self.profile_out)
+        print(f"📈 Stage profile written to {self.profile_out}")
+    
+    def run(self, source=None, sink=None, pipelined=False, max_frames=None,
+            alloc_report=False, verbose=True):
+        """Main game loop
+        
+        source defaults to the webcam and sink to an OpenCV window; pass a
+        HeadlessSink to run without a display. max_frames stops the loop
+        after that many frames, which keeps benchmarks bounded.
+        alloc_report traces per-frame allocations (sequential loop only).
+        verbose=False skips the welcome text and the stage report.
+        """
+        source = source if source is not None else WebcamSource(0)
+        self.sink = sink if sink is not None else WindowSink()
+        if max_frames is not None:
+            source = FrameLimit(source, max_frames)
+        
+        if verbose:
+            print("🎮 Welcome to Rock Paper Scissors World! 🎮")
+            print("👍 Thumbs UP = Start | 👎 Thumbs DOWN = Exit | 👉 Point = Select")
+        
+        self.profiler = StageProfiler(self.profile_stages)
+        queue_size = 2
+        # Frames in flight: one per stage plus whatever sits in the queues
+        self.buffers = FrameBufferPool(slots=queue_size + 3 if pipelined else 1)
+        monitor = AllocationMonitor() if alloc_report and not pipelined else None
+        
+        # kill -USR1 <pid> dumps the profile without stopping the game
+        previous_handler = None
+        if self.profile_out and hasattr(signal, "SIGUSR1"):
+            try:
+                previous_handler = signal.signal(signal.SIGUSR1, self.export_profile)
+            except ValueError:
+                pass  # not on the main thread
+        start = time.perf_counter()
         
-        # Menu logic with improved responsiveness
-        if self.state == "menu":
-            self.check_menu_hover()
-            
-            if self.current_gesture == "thumbs_up" and stable_time > min_stable_time:
-                self.start_game()
-                self.stable_start = 0
-            elif self.current_gesture == "thumbs_down" and stable_time > min_stable_time:
-                return False
-            elif self.current_gesture == "pointing" and self.menu_hover >= 0 and stable_time > min_stable_time:
-                if self.menu_hover == 0:
-                    self.start_game()
-                elif self.menu_hover == 1:
-                    self.state = "options"
-                elif self.menu_hover == 2:
-                    return False
-                self.stable_start = 0
+        try:
+            if pipelined:
+                self.run_pipelined(source, queue_size)
+            else:
+                self.run_sequential(source, monitor)
+        finally:
+            elapsed = time.perf_counter() - start
+            source.release()
+            self.sink.close()
+            if self.recorder is not None:
+                self.recorder.close()
+            if self.video is not None:
+                self.video.close()
+            if self.game_log is not None:
+                self.game_log.close()
+            self.save_strategy()
+            if previous_handler is not None:
+                signal.signal(signal.SIGUSR1, previous_handler)
+            if verbose:
+                self.print_stage_report(elapsed)
+            if self.profile_out:
+                self.export_profile()
+            if monitor is not None:
+                monitor.report()
+    
+    def run_sequential(self, source, monitor=None):
+        """Capture, inference and rendering one after another on one thread"""
+        profiler = self.profiler
+        frame_shape = None
+        if monitor is not None:
+            monitor.start()
         
-        # Options logic with improved back navigation
-        elif self.state == "options":
-            self.check_menu_hover()  # Check for back button hover
-            
-            if self.current_gesture == "thumbs_down" and stable_time > min_stable_time:
-                self.state = "menu"
-                self.stable_start = 0
-            elif self.current_gesture == "pointing" and self.menu_hover == 0 and stable_time > min_stable_time:
-                # Back button clicked with finger
-                self.state = "menu"
-                self.stable_start = 0
+        try:
+            while True:
+                if self.skip_idle_frame(source):
+                    if not source.grab():
+                        break
+                    continue
+                if monitor is not None:
+                    monitor.begin_frame()
+                
+                start = time.perf_counter()
+                out = self.buffers.get('capture', frame_shape) if frame_shape else None
+                ret, frame = source.read(out)
+                if not ret:
+                    break
+                frame_shape = frame.shape
+                capture_time = time.perf_counter()
+                profiler['capture'].record(capture_time - start)
+                
+                frame, rgb_frame = self.prepare_frame(frame)
+                prepared = time.perf_counter()
+                profiler['preprocess'].record(prepared - capture_time)
+                results = self.infer_hands(rgb_frame)
+                profiler['inference'].record(time.perf_counter() - prepared)
+                
+                self.apply_hand_results(frame, results, capture_time)
+                keep_running = self.present(frame, capture_time)
+                
+                if monitor is not None:
+                    monitor.end_frame(frame)
+                if not keep_running:
+                    break
+        finally:
+            if monitor is not None:
+                monitor.stop()
+    
+    def run_pipelined(self, source, queue_size=2):
+        """Capture, inference and rendering as separate stages
+        
+        Stages are connected by bounded queues. For live sources a full
+        queue drops the oldest frame, so the screen always shows the
+        freshest camera frame; recorded sources block instead so every
+        frame is processed. Rendering stays on the main thread because
+        cv2.imshow/waitKey are not thread safe.
+        """
+        profiler = self.profiler
+        capture_queue = queue.Queue(maxsize=queue_size)
+        result_queue = queue.Queue(maxsize=queue_size)
+        stop = threading.Event()
+        
+        def enqueue(q, item, stage_stats=None):
+            if source.live:
+                put_latest(q, item, stage_stats)
+                return
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+        
+        def capture_stage():
+            frame_shape = None
+            capture_time = 0.0
+            while not stop.is_set():
+                # The last frame may still be on its way to the idle gate
+                if self.skip_idle_frame(source, capture_time):
+                    if not source.grab():
+                        break
+                    continue
+                start = time.perf_counter()
+                out = self.buffers.get('capture', frame_shape) if frame_shape else None
+                ret, frame = source.read(out)
+                if not ret:
+                    break
+                frame_shape = frame.shape
+                capture_time = time.perf_counter()
+                profiler['capture'].record(capture_time - start, capture_queue.qsize())
+                enqueue(capture_queue, (capture_time, frame), profiler['capture'])
+            enqueue(capture_queue, None)
+        
+        def inference_stage():
+            while not stop.is_set():
+                try:
+                    item = capture_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    break
+                capture_time, frame = item
+                start = time.perf_counter()
+                frame, rgb_frame = self.prepare_frame(frame)
+                prepared = time.perf_counter()
+                profiler['preprocess'].record(prepared - start)
+                results = self.infer_hands(rgb_frame)
+                profiler['inference'].record(time.perf_counter() - prepared,
+                                             result_queue.qsize())
+                enqueue(result_queue, (capture_time, frame, results), profiler['inference'])
+            enqueue(result_queue, None)
+        
+        workers = [threading.Thread(target=capture_stage, name="capture", daemon=True),
+                   threading.Thread(target=inference_stage, name="inference", daemon=True)]
+        for worker in workers:
+            worker.start()
         
-        # Countdown logic
-        elif self.state == "countdown":
-            elapsed = current_time - self.countdown_start
-            
-            if elapsed >= 1.0:
-                self.countdown_phase += 1
-                self.countdown_start = current_time
+        try:
+            while True:
+                try:
+                    item = result_queue.get(timeout=0.1)
+                except queue.Empty:
+                    if not workers[1].is_alive():
+                        break
+                    continue
+                if item is None:
+                    break
+                capture_time, frame, results = item
                 
-                if self.countdown_phase >= 4:
-                    self.execute_battle()
+                self.apply_hand_results(frame, results, capture_time)
+                if not self.present(frame, capture_time, result_queue.qsize()):
+                    break
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join(timeout=1.0)
+    
+    def print_stage_report(self, elapsed):
+        """Print per-stage latency, queue depth and overall throughput"""
+        displayed = self.profiler['latency'].frames
+        print(f"\n📊 {displayed} frames in {elapsed:.1f}s "
+              f"({displayed / max(elapsed, 1e-9):.1f} FPS)")
+        for stage in self.profiler.stages.values():
+            print("   " + stage.summary())
+        if hasattr(self.inference, 'summary'):
+            print("   " + self.inference.summary())
+        if self.video is not None:
+            print("   " + self.video.summary())
+        print("   text cache: " + self.text.summary())
+
+
+def run_kiosk(index, frame_spec, landmark_spec, core, reports, display=False, seed=None,
+              idle_after=None, idle_fps=5):
+    """Process entry point for one kiosk of a KioskSupervisor"""
+    if core is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {core})
+    
+    game = RockPaperScissorsWorld(persist=False, seed=seed)
+    # Each kiosk keeps its own statistics next to the others
+    game.game_log = GameLog(f"rps_stats.kiosk{index}.json", f"rps_rounds.kiosk{index}")
+    game.strategy_path = f"rps_ai.kiosk{index}.json"
+    game.load_data()
+    game.recorder = SharedLandmarkRing.attach(landmark_spec)
+    if idle_after:
+        game.inference = game.power_save = IdleHandInference(game.hands, idle_after, idle_fps)
+    
+    source = SharedMemorySource(SharedFrameRing.attach(frame_spec))
+    sink = WindowSink(f"Rock Paper Scissors World - Kiosk {index}") if display else HeadlessSink()
+    start = time.perf_counter()
+    try:
+        game.run(source, sink, verbose=False)
+    finally:
+        elapsed = time.perf_counter() - start
+        game.recorder.release()
+        reports.put((index, elapsed, game.profiler.rows()))
+
+
+class KioskSupervisor:
+    """Runs one game per frame source, each in its own pinned process
+    
+    The supervisor captures every source on a thread, decoding straight
+    into that kiosk's SharedFrameRing; the kiosk process runs its own
+    Hands and streams landmarks back through a SharedLandmarkRing. The
+    supervisor prints live per-kiosk throughput from those landmark
+    streams and a combined stage report when all kiosks have finished.
+    Video files stand in for cameras when testing.
+    """
+    def __init__(self, sources, cores=None, slots=4, display=False, seed=None, idle_after=None,
+                 idle_fps=5):
+        self.sources = sources
+        available = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+        if cores is None and available:
+            cores = [available[i % len(available)] for i in range(len(sources))]
+        self.cores = cores or [None] * len(sources)
+        self.slots = slots
+        self.display = display
+        self.seed = seed
+        self.idle_after = idle_after
+        self.idle_fps = idle_fps
+        self.stop = threading.Event()
+    
+    def capture(self, source, ring, first_frame, stats):
+        """Feed a source into its ring until it ends or the kiosk exits"""
+        frame = ring.reserve()
+        np.copyto(frame, first_frame)
+        ring.commit()
+        scratch = None
+        try:
+            while not self.stop.is_set():
+                start = time.perf_counter()
+                # Cameras keep running, so a slow kiosk loses frames rather than lagging
+                slot = ring.reserve(timeout=0 if source.live else 0.1)
+                if slot is None:
+                    if not source.live:
+                        continue
+                    if scratch is None:
+                        scratch = first_frame.copy()
+                    ret, _ = source.read(scratch)
+                    stats.dropped += 1
+                else:
+                    ret, frame = source.read(slot)
+                    if ret and frame is not slot:
+                        np.copyto(slot, frame)
+                    if ret:
+                        ring.commit()
+                    else:
+                        ring.free.release()
+                if not ret:
+                    break
+                stats.record(time.perf_counter() - start)
+        finally:
+            ring.close_stream()
+            source.release()
+    
+    def run(self, max_frames=None, status_every=2.0):
+        """Run every kiosk to completion and print the combined report"""
+        reports = multiprocessing.Queue()
+        kiosks = []
+        try:
+            for index, source in enumerate(self.sources):
+                if max_frames is not None:
+                    source = FrameLimit(source, max_frames)
+                ret, first_frame = source.read()
+                if not ret:
+                    print(f"⚠️ Kiosk {index}: source produced no frames")
+                    continue
+                ring = SharedFrameRing(first_frame.shape, self.slots)
+                landmarks = SharedLandmarkRing()
+                stats = StageStats(f"kiosk {index}")
+                process = multiprocessing.Process(
+                    target=run_kiosk, name=f"kiosk-{index}", daemon=True,
+                    args=(index, ring.spec(), landmarks.spec(), self.cores[index], reports,
+                          self.display, None if self.seed is None else self.seed + index,
+                          self.idle_after, self.idle_fps))
+                process.start()
+                thread = threading.Thread(target=self.capture, name=f"capture-{index}",
+                                          args=(source, ring, first_frame.copy(), stats),
+                                          daemon=True)
+                thread.start()
+                kiosks.append((index, process, thread, ring, landmarks, stats))
+                print(f"🕹️ Kiosk {index}: {first_frame.shape[1]}x{first_frame.shape[0]} "
+                      f"on core {self.cores[index]}")
+            
+            self.monitor(kiosks, status_every)
+        finally:
+            self.stop.set()
+            for index, process, thread, ring, landmarks, stats in kiosks:
+                thread.join(timeout=2.0)
+                process.join(timeout=5.0)
+                if process.is_alive():
+                    process.terminate()
+        
+        results = {}
+        while len(results) < len(kiosks):
+            try:
+                index, elapsed, rows = reports.get(timeout=1.0)
+            except queue.Empty:
+                break
+            results[index] = (elapsed, rows)
+        self.print_report(kiosks, results)
         
-        # Result logic
-        elif self.state == "result":
-            if current_time - self.countdown_start >= 3.0:
-                self.state = "menu"
+        for index, process, thread, ring, landmarks, stats in kiosks:
+            ring.release(unlink=True)
+            landmarks.release(unlink=True)
+    
+    def monitor(self, kiosks, status_every):
+        """Print per-kiosk frame rate and hand detection rate until all kiosks exit"""
+        counts = {index: [0, 0] for index, *_ in kiosks}
+        last = time.perf_counter()
+        while any(process.is_alive() for _, process, *_ in kiosks):
+            time.sleep(0.1)
+            for index, process, thread, ring, landmarks, stats in kiosks:
+                records = landmarks.drain()
+                counts[index][0] += len(records)
+                counts[index][1] += int(np.count_nonzero(records['hand'] >= 0))
+            now = time.perf_counter()
+            if now - last >= status_every:
+                line = "  ".join(f"kiosk {index}: {frames / (now - last):5.1f} FPS "
+                                 f"({hands} hands)" for index, (frames, hands) in counts.items())
+                print(f"📡 {line}")
+                counts = {index: [0, 0] for index in counts}
+                last = now
+    
+    def print_report(self, kiosks, results):
+        """Per-kiosk throughput and stage percentiles, then totals"""
+        print(f"\n📊 {len(kiosks)} kiosks")
+        total_frames = 0
+        for index, process, thread, ring, landmarks, stats in kiosks:
+            if index not in results:
+                print(f"   kiosk {index}: no report (exit code {process.exitcode})")
+                continue
+            elapsed, rows = results[index]
+            stages = {row['stage']: row for row in rows}
+            frames = stages['latency']['frames']
+            total_frames += frames
+            print(f"   kiosk {index}: {frames} frames in {elapsed:.1f}s "
+                  f"({frames / max(elapsed, 1e-9):.1f} FPS), capture dropped {stats.dropped}, "
+                  f"inference p50/p95 {stages['inference']['p50_ms']:.1f}/"
+                  f"{stages['inference']['p95_ms']:.1f}ms, "
+                  f"latency p95 {stages['latency']['p95_ms']:.1f}ms, "
+                  f"landmarks dropped {landmarks.dropped}")
+        longest = max((elapsed for elapsed, _ in results.values()), default=0)
+        print(f"   total: {total_frames} frames, {total_frames / max(longest, 1e-9):.1f} FPS combined")
+
+
+# Client frames are a one byte tag plus a fixed-size body: b"L" and a
+# LANDMARK_RECORD, or b"G" and an already classified gesture
+GESTURE_FRAME = struct.Struct("<dBff")  # time, gesture index, confidence, age
+# Every frame is answered with the frame time (for latency), game state,
+# filtered gesture, last result and rounds played
+SESSION_REPLY = struct.Struct("<dBBBI")
+SESSION_STATES = ("menu", "countdown", "battle", "result", "options")
+SESSION_RESULTS = ("", "YOU WIN!", "YOU LOSE!", "TIE!")
+
+
+class GameServer:
+    """asyncio server running one headless game session per connection
+    
+    Sessions are GameSession instances without saved statistics, so they
+    follow exactly the same menu, countdown and battle rules as the game
+    but skip its hand model, render caches and profiler. The game clock
+    follows the client's frame timestamps, as in a landmark replay, and
+    each frame's age places its gesture on the throw timeline. A session
+    ends when the client disconnects, its game exits or it sends a
+    malformed frame: an unknown tag (also what the surplus bytes of an
+    oversized frame read as), an unknown gesture index, a negative age or
+    a time, confidence or landmark that is not a finite number.
+    """
+    def __init__(self, host="127.0.0.1", port=8765, seed=None):
+        self.host = host
+        self.port = port
+        self.seed = seed
+        self.gestures = [str(name) for name in GestureClassifier.gestures]
+        self.stats = StageStats("session")
+        self.active = 0
+        self.opened = 0
+        self.rejected = 0  # sessions ended by a malformed frame
+    
+    async def handle(self, reader, writer):
+        self.opened += 1
+        self.active += 1
+        seed = None if self.seed is None else self.seed + self.opened
+        clock = VirtualClock()
+        game = GameSession(persist=False, seed=seed, clock=clock)
+        record = np.zeros(1, dtype=LANDMARK_RECORD)
         
-        self.last_gesture = self.current_gesture
-        return True
+        try:
+            while True:
+                tag = await reader.readexactly(1)
+                if tag == b"L":
+                    body = await reader.readexactly(LANDMARK_RECORD.itemsize)
+                    start = time.perf_counter()
+                    record.view(np.uint8)[:] = np.frombuffer(body, dtype=np.uint8)
+                    timestamp, hand = float(record['time'][0]), int(record['hand'][0])
+                    age, points = float(record['age'][0]), record['landmarks'][0]
+                    if not (np.isfinite(timestamp) and -1 <= hand <= 1 and 0 <= age < np.inf and
+                            (hand < 0 or np.isfinite(points).all())):
+                        self.rejected += 1
+                        break
+                    clock.set(timestamp)
+                    game.frame_age = age
+                    game.set_hand(points if hand >= 0 else None)
+                elif tag == b"G":
+                    body = await reader.readexactly(GESTURE_FRAME.size)
+                    start = time.perf_counter()
+                    timestamp, gesture, confidence, age = GESTURE_FRAME.unpack(body)
+                    if not (np.isfinite(timestamp) and 0 <= gesture < len(self.gestures) and
+                            0 <= confidence <= 1 and 0 <= age < np.inf):
+                        self.rejected += 1
+                        break
+                    clock.set(timestamp)
+                    game.frame_age = age
+                    game.current_gesture = self.gestures[gesture]
+                    game.confidence = confidence
+                else:
+                    self.rejected += 1  # not a client of ours, or out of step
+                    break
+                
+                keep_running = game.update_game()
+                writer.write(SESSION_REPLY.pack(
+                    clock.time, SESSION_STATES.index(game.state),
+                    self.gestures.index(game.current_gesture),
+                    SESSION_RESULTS.index(game.result), game.total_games))
+                self.stats.record(time.perf_counter() - start)
+                await writer.drain()
+                if not keep_running:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.active -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
     
-    def start_game(self):
-        """Start new game"""
-        self.state = "countdown"
-        self.countdown_phase = 0
-        self.countdown_start = time.time()
-        self.ai_choice = random.choice(self.choices)
+    async def serve(self, ready=None):
+        server = await asyncio.start_server(self.handle, self.host, self.port)
+        print(f"🛰️ Game server listening on {self.host}:{self.port}")
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
     
-    def execute_battle(self):
-        """Execute battle and determine winner"""
-        if self.current_gesture in self.choices:
-            self.player_choice = self.current_gesture
+    def run(self, ready=None):
+        """Serve until interrupted, then print the per-frame session cost"""
+        try:
+            asyncio.run(self.serve(ready))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            print(f"\n📊 {self.opened} sessions, {self.rejected} ended by malformed frames")
+            print("   " + self.stats.summary())
+
+
+class LoadGenerator:
+    """Replays a landmark recording as many concurrent GameServer clients
+    
+    Every session streams the recording in real time from its own random
+    starting point, looping it with shifted timestamps, and times each
+    reply. With gestures=True frames are classified up front and sent as
+    gestures instead of landmarks.
+    """
+    def __init__(self, path, host="127.0.0.1", port=8765, gestures=False, seed=0):
+        self.records, _ = load_landmarks(path)
+        self.host = host
+        self.port = port
+        self.gestures = gestures
+        self.rng = random.Random(seed)
+        times = self.records['time']
+        self.offsets = (times - times[0]).tolist()
+        self.ages = self.records['age'].tolist()
+        self.duration = self.offsets[-1] + float(np.median(np.diff(times))) if len(times) > 1 else 1.0
+        if gestures:
+            names, confidences = GestureClassifier().classify_batch(
+                np.ascontiguousarray(self.records['landmarks']))
+            index = {str(name): i for i, name in enumerate(GestureClassifier.gestures)}
+            has_hand = self.records['hand'] >= 0
+            self.gesture_index = [index[str(name)] if hand else 0
+                                  for name, hand in zip(names, has_hand)]
+            self.gesture_confidence = np.where(has_hand, confidences, 0.0).tolist()
+    
+    def frame(self, i, timestamp):
+        if self.gestures:
+            return b"G" + GESTURE_FRAME.pack(timestamp, self.gesture_index[i],
+                                             self.gesture_confidence[i], self.ages[i])
+        record = self.records[i:i + 1].copy()
+        record['time'] = timestamp
+        return b"L" + record.tobytes()
+    
+    async def session(self, until, latencies, counters):
+        """One client: stream frames on schedule until `until`, reconnecting if the game exits"""
+        position = self.rng.randrange(len(self.records))
+        loops = 0
+        start = time.perf_counter() - self.offsets[position]
+        while time.perf_counter() < until:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                while True:
+                    due = start + loops * self.duration + self.offsets[position]
+                    now = time.perf_counter()
+                    if due >= until:
+                        return
+                    if due > now:
+                        await asyncio.sleep(due - now)
+                    sent = time.perf_counter()
+                    writer.write(self.frame(position, loops * self.duration + self.offsets[position]))
+                    await reader.readexactly(SESSION_REPLY.size)
+                    latencies.append(time.perf_counter() - sent)
+                    counters['frames'] += 1
+                    counters['late'] += sent - due > 0.010
+                    position += 1
+                    if position == len(self.records):
+                        position = 0
+                        loops += 1
+            except (asyncio.IncompleteReadError, ConnectionError):
+                counters['restarts'] += 1  # the game exited; start a new session
+                position = (position + 1) % len(self.records)
+            finally:
+                writer.close()
+    
+    async def run_level(self, sessions, seconds):
+        latencies = []
+        counters = {'frames': 0, 'late': 0, 'restarts': 0}
+        until = time.perf_counter() + seconds
+        await asyncio.gather(*(self.session(until, latencies, counters) for _ in range(sessions)))
+        return latencies, counters
+    
+    def run(self, levels=(1, 10, 50, 100), seconds=5.0):
+        """Print throughput and latency for each number of concurrent sessions"""
+        target_fps = len(self.records) / self.duration
+        print(f"{'gestures' if self.gestures else 'landmarks'} over {self.host}:{self.port}, "
+              f"{target_fps:.0f} frames/s per session")
+        print(" sessions  frames/s  of target  p50 ms  p95 ms  p99 ms  late  restarts")
+        for sessions in levels:
+            latencies, counters = asyncio.run(self.run_level(sessions, seconds))
+            rate = counters['frames'] / seconds
+            p50, p95, p99 = (np.percentile(latencies, (50, 95, 99)) * 1000
+                             if latencies else (0, 0, 0))
+            print(f" {sessions:8d}  {rate:8.0f}  {rate / (sessions * target_fps) * 100:8.1f}%"
+                  f"  {p50:6.2f}  {p95:6.2f}  {p99:6.2f}  {counters['late']:4d}  "
+                  f"{counters['restarts']:8d}")
+
+
+def parse_address(address, default_port=8765):
+    """HOST:PORT, :PORT or PORT to (host, port)"""
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port or default_port)
+
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a micro-benchmark runnable with --bench NAME"""
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def time_per_call(func, repeat):
+    """Mean wall time of func() in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+@benchmark("ui")
+def benchmark_ui_layers(args, repeat=300):
+    """Menu and options rendering with and without the static layer cache"""
+    game = RockPaperScissorsWorld(enable_hands=False, persist=False)
+    camera = SyntheticSource(frames=1).background
+    frame = camera.copy()
+    
+    def draw(screen):
+        np.copyto(frame, camera)
+        screen(frame)
+    
+    print("Render time per frame (ms), camera frame copy included:")
+    for name, screen in (("menu", game.draw_menu), ("options", game.draw_options)):
+        results = []
+        for enabled in (False, True):
+            game.ui_layers.enabled = enabled
+            draw(screen)  # warm up the cache
+            results.append(time_per_call(lambda: draw(screen), repeat))
+        print(f"   {name:<8} direct={results[0]:6.2f}  cached={results[1]:6.2f}  "
+              f"speedup={results[0] / results[1]:4.1f}x")
+    print(f"   layer cache: {game.ui_layers.hits} hits, {game.ui_layers.misses} misses")
+
+
+@benchmark("resolution")
+def benchmark_resolutions(args, repeat=200):
+    """Per-frame preprocessing and drawing cost at smaller capture sizes,
+    checking that pointing at each drawn button still selects it"""
+    print("Per frame (ms): mirror + RGB copy, then each screen drawn over the camera frame")
+    print(f"   {'size':<10} {'prepare':>8} {'menu':>8} {'options':>8} {'result':>8}   pointer hits")
+    for w, h in ((1280, 720), (960, 540), (640, 480)):
+        game = RockPaperScissorsWorld(enable_hands=False, persist=False, seed=0)
+        game.ai_choice, game.player_choice, game.result = "paper", "rock", "YOU LOSE!"
+        game.buffers = FrameBufferPool()
+        camera = SyntheticSource(frames=1, width=w, height=h).background
+        frame = camera.copy()
+        
+        def draw():
+            np.copyto(frame, camera)
+            game.render(frame)
+        
+        times = [time_per_call(lambda: game.prepare_frame(camera), repeat)]
+        for state in ("menu", "options", "result"):
+            game.state = state
+            draw()  # warm up the layer cache
+            times.append(time_per_call(draw, repeat))
+        
+        # Point at the pixel centre of every button as it is drawn at this size
+        hits = targets = 0
+        game.pointing = True
+        for state, buttons in game.layout.buttons.items():
+            game.state = state
+            for i, button in enumerate(buttons):
+                (x1, y1), (x2, y2) = game.layout.rect(button.box, w, h)
+                game.finger_pos = ((x1 + x2) / 2 / w, (y1 + y2) / 2 / h)
+                game.check_menu_hover()
+                hits += game.menu_hover == i
+                targets += 1
+        print(f"   {w}x{h:<5} " + " ".join(f"{t:8.2f}" for t in times) + f"   {hits}/{targets}")
+
+
+@benchmark("throw")
+def benchmark_throw(args, rounds=1000):
+    """How often the player's intended throw is recognized, reading the frame
+    at the battle versus resolving over the timeline around SHOOT
+    
+    Simulated players pump a fist through the countdown, show their throw
+    0.05-0.3s after SHOOT for 0.3-0.9s, then drop the hand; 10% of frames
+    are misread. Frames reach the game `latency` seconds after capture.
+    """
+    step = 1 / 30
+    
+    def simulate(latency, compensate):
+        rng = random.Random(0)
+        game = RockPaperScissorsWorld(enable_hands=False, persist=False, seed=0,
+                                      clock=VirtualClock())
+        clock = game.clock
+        legacy = resolved = 0
+        for _ in range(rounds):
+            intended = rng.choice(game.choices)
+            reaction = rng.uniform(0.05, 0.3)
+            hold = rng.uniform(0.3, 0.9)
+            game.start_game()
+            shoot = game.countdown_start + 3.0  # SHOOT follows three 1s phases
+            while game.state == "countdown":
+                since_shoot = clock.now() - latency - shoot
+                if since_shoot < reaction:
+                    raw = "rock"
+                elif since_shoot < reaction + hold:
+                    raw = intended
+                else:
+                    raw = "none"
+                confidence = 0.9
+                if rng.random() < 0.1:
+                    raw, confidence = rng.choice(game.gesture_filter.names), 0.6
+                game.current_gesture, game.confidence = raw, confidence
+                game.frame_age = latency if compensate else 0.0
+                game.update_game()
+                clock.advance(step)
+            legacy += (raw if raw in game.choices else "rock") == intended
+            resolved += game.player_choice == intended
+            game.state = "menu"
+        return 100 * legacy / rounds, 100 * resolved / rounds
+    
+    print(f"Throws recognized over {rounds} simulated rounds (%):")
+    print(f"   {'latency':>8} {'battle frame':>13} {'timeline':>9} {'+ latency fix':>14}")
+    for latency in (0.0, 0.1, 0.2, 0.3):
+        legacy, uncompensated = simulate(latency, False)
+        _, compensated = simulate(latency, True)
+        print(f"   {latency * 1000:6.0f}ms {legacy:13.1f} {uncompensated:9.1f} {compensated:14.1f}")
+
+
+@benchmark("text")
+def benchmark_text_cache(args, cycles=3):
+    """Rendering through whole game cycles with and without the text cache,
+    and the hit rate under different memory caps"""
+    camera = SyntheticSource(frames=1).background
+    frame = camera.copy()
+    
+    def run(enabled, max_bytes=16 << 20):
+        game = RockPaperScissorsWorld(enable_hands=False, persist=False, seed=0,
+                                      clock=VirtualClock())
+        game.text = TextCache(max_bytes)
+        game.text.enabled = enabled
+        play_cycles(game, 1, frame=frame)  # warm up
+        start = time.perf_counter()
+        updates = play_cycles(game, cycles, frame=frame)
+        return (time.perf_counter() - start) / updates * 1000, game.text
+    
+    print(f"Render time per frame over {cycles} game cycles after a warm-up cycle (ms):")
+    direct, _ = run(False)
+    cached, text = run(True)
+    print(f"   direct={direct:6.2f}  cached={cached:6.2f}  speedup={direct / cached:4.1f}x")
+    print("Text cache by memory cap:")
+    for megabytes in (1, 4, 16):
+        per_frame, text = run(True, megabytes << 20)
+        print(f"   {megabytes:3d} MB  {per_frame:6.2f} ms/frame   {text.summary()}")
+
+
+def measure_startup(background, source_spec, width, height, started, results):
+    """Spawned by --bench startup: start the game like main() does and
+    report wall-clock milestones relative to `started`"""
+    milestones = {"imports done": time.time()}
+    
+    class StopAfterInference(HeadlessSink):
+        def show(self, frame):
+            return ord('q') if game.hands.first_inference is not None else -1
+    
+    game = RockPaperScissorsWorld(persist=False, seed=0, background=background)
+    milestones["game built"] = time.time()
+    sink = StopAfterInference()
+    if background:
+        sink.show(game.splash(width, height))
+        milestones["splash shown"] = time.time()
+    source = open_source(source_spec, width, height)
+    milestones["camera open"] = time.time()
+    
+    # Convert the loop's perf_counter marks to wall-clock time
+    offset = time.time() - time.perf_counter()
+    game.run(source, sink, verbose=False)
+    milestones["first camera frame"] = game.first_frame + offset
+    milestones["first inference"] = game.hands.first_inference + offset
+    results.put({name: t - started for name, t in milestones.items()})
+
+
+@benchmark("startup")
+def benchmark_startup(args, runs=3):
+    """Time to first frame and first inference in fresh processes, with the
+    hand model loaded up front versus in the background"""
+    context = multiprocessing.get_context("spawn")
+    print(f"Startup over --source {args.source}, median of {runs} fresh processes (ms):")
+    for name, background in (("blocking", False), ("background", True)):
+        runs_ms = []
+        for _ in range(runs):
+            results = context.Queue()
+            started = time.time()
+            process = context.Process(target=measure_startup,
+                                      args=(background, args.source, args.width, args.height,
+                                            started, results))
+            process.start()
+            runs_ms.append(results.get())
+            process.join()
+        print(f"   {name}:")
+        for milestone in runs_ms[0]:
+            median = np.median([run[milestone] for run in runs_ms]) * 1000
+            print(f"      {milestone:<20} {median:8.0f}")
+
+
+@benchmark("idle")
+def benchmark_idle(args, cycles=4, idle_after=1.0, empty=3.0, motion=0.5, fps=30, buffered=4):
+    """Process CPU use always on versus with the idle gate, and the wake
+    latency from motion to hand results
+    
+    A 30 FPS camera watches a noisy empty scene for `empty` seconds, then
+    something moves through it for `motion` seconds, `cycles` times. Like
+    a V4L2 camera it queues up to `buffered` frames, drops new ones while
+    the queue is full and hands out the oldest, so a game that stops
+    reading for a while gets stale frames.
+    """
+    background = SyntheticSource(frames=1).background
+    rng = np.random.default_rng(0)
+    noisy = [cv2.add(background, rng.integers(0, 6, background.shape, dtype=np.uint8))
+             for _ in range(4)]
+    period = empty + motion
+    
+    class Camera(FrameSource):
+        live = True
+        
+        def __init__(self, gate=None):
+            self.gate = gate
+            self.start = time.perf_counter()
+            self.queued = deque()
+            self.captured = 0  # frames the camera has produced
+            self.wakes = 0
+            self.wake_latency = []
+        
+        def grab(self):
+            """Index of the oldest queued frame, waiting for one if none is"""
+            now = time.perf_counter() - self.start
+            if not self.queued and self.captured >= int(now * fps):
+                time.sleep(max(0.0, (self.captured + 1) / fps - now))
+                now = time.perf_counter() - self.start
+            while self.captured < int(now * fps):
+                self.captured += 1
+                if len(self.queued) < buffered:
+                    self.queued.append(self.captured)
+            index = self.queued.popleft()
+            return index if index / fps < cycles * period else False
+        
+        def read(self, out=None):
+            index = self.grab()
+            if index is False:
+                return False, None
+            t = index / fps
+            gate = self.gate
+            if gate is not None and gate.wakes > self.wakes:
+                self.wakes = gate.wakes
+                onset = (gate.woke_at - self.start) // period * period + empty
+                self.wake_latency.append(gate.woke_at - self.start - onset)
+            frame = noisy[index % len(noisy)].copy()
+            if t % period >= empty:
+                x = int((t % period - empty) / motion * background.shape[1])
+                cv2.circle(frame, (x, background.shape[0] // 2), background.shape[0] // 6,
+                           (60, 120, 200), -1)
+            return True, frame
+    
+    def run(gated, pipelined=False):
+        game = RockPaperScissorsWorld(persist=False, seed=0, background=False)
+        camera = Camera()
+        if gated:
+            camera.gate = game.inference = game.power_save = IdleHandInference(
+                game.hands, idle_after)
+        start, cpu = time.perf_counter(), time.process_time()
+        game.run(camera, HeadlessSink(), pipelined=pipelined, verbose=False)
+        share = (time.process_time() - cpu) / (time.perf_counter() - start)
+        return share, camera, game.power_save
+    
+    print(f"{cycles} cycles of {empty:g}s empty scene and {motion:g}s motion at {fps} FPS, "
+          f"{buffered} camera buffers, idle after {idle_after:g}s:")
+    always_on, _, _ = run(False)
+    print(f"   always on   CPU {always_on:6.1%}")
+    for name, pipelined in (("idle gate", False), ("pipelined", True)):
+        gated, camera, gate = run(True, pipelined)
+        idle_wall, idle_share, awake_wall, awake_share = gate.cpu_use()
+        print(f"   {name:<11} CPU {gated:6.1%}  (idle {idle_wall:.1f}s at {idle_share:.1%}, "
+              f"awake {awake_wall:.1f}s at {awake_share:.1%})")
+        print(f"      wakes={gate.wakes} motion checks={gate.checks}/{gate.idle_frames} frames")
+        if camera.wake_latency:
+            latency = np.array(camera.wake_latency) * 1000
+            print(f"      motion to hand results: mean={latency.mean():.0f}ms max={latency.max():.0f}ms"
+                  f" (model on the waking frame {gate.wake_latency.mean_ms():.0f}ms)")
+
+
+@benchmark("sprites")
+def benchmark_ai_hand_sprites(args, repeat=2000):
+    """AI hand sprites versus the ellipse/circle draw calls"""
+    game = RockPaperScissorsWorld(enable_hands=False, persist=False)
+    frame = SyntheticSource(frames=1).background.copy()
+    h, w = frame.shape[:2]
+    
+    print("AI hand render time (us):")
+    for choice in game.choices:
+        game.ai_choice = choice
+        results = []
+        for enabled in (False, True):
+            game.sprites.enabled = enabled
+            results.append(time_per_call(
+                lambda: game.draw_ai_hand(frame, 3*w//4, h//2), repeat) * 1000)
+        print(f"   {choice:<9} draw calls={results[0]:7.1f}  sprite={results[1]:7.1f}  "
+              f"speedup={results[0] / results[1]:4.1f}x")
+
+
+@benchmark("skip")
+def benchmark_inference_skipping(args):
+    """Gesture agreement of skipped-frame prediction with every-frame inference
+    
+    Uses a landmark recording (--bench-input) as the every-frame ground
+    truth and simulates running inference only every k frames.
+    """
+    if not args.bench_input:
+        print("The skip benchmark needs a landmark recording: --bench-input PATH")
+        return
+    records, _ = load_landmarks(args.bench_input)
+    truth = np.ascontiguousarray(records['landmarks'])
+    has_hand = records['hand'] >= 0
+    classifier = GestureClassifier()
+    true_gestures = np.where(has_hand, classifier.classify_batch(truth)[0], "none")
+    
+    print(f"{len(records)} frames, {has_hand.sum()} with a hand")
+    print(" k  predictor  agreement  pointer error (px)  us/predicted frame")
+    for every in (1, 2, 3, 4):
+        for name in sorted(LandmarkPredictor.presets) if every > 1 else ["velocity"]:
+            predictor = LandmarkPredictor.preset(name)
+            estimate = np.zeros_like(truth)
+            tracked = np.zeros(len(truth), dtype=bool)
+            predict_time = 0.0
+            for i in range(len(truth)):
+                if i % every == 0:
+                    if has_hand[i]:
+                        predictor.update(truth[i], i)
+                    else:
+                        predictor.reset()
+                    estimate[i] = truth[i]
+                    tracked[i] = has_hand[i]
+                elif predictor.position is not None:
+                    start = time.perf_counter()
+                    estimate[i] = predictor.predict(i)
+                    predict_time += time.perf_counter() - start
+                    tracked[i] = True
+            
+            gestures = np.where(tracked, classifier.classify_batch(estimate)[0], "none")
+            agreement = np.mean(gestures == true_gestures) * 100
+            both = tracked & has_hand
+            pointer = np.hypot((estimate[both, 8, 0] - truth[both, 8, 0]) * 1280,
+                               (estimate[both, 8, 1] - truth[both, 8, 1]) * 720)
+            predicted = max(1, len(truth) - (len(truth) + every - 1) // every)
+            print(f" {every}  {name:<9}  {agreement:8.2f}%  "
+                  f"{pointer.mean() if len(pointer) else 0:18.2f}  "
+                  f"{predict_time / predicted * 1e6:18.2f}")
+
+
+@benchmark("profiler")
+def benchmark_profiler(args, repeat=200000):
+    """Cost of the stage timers that run on every frame"""
+    profiler = StageProfiler(RockPaperScissorsWorld.profile_stages)
+    stage = profiler['draw']
+    frame = SyntheticSource(frames=1).background.copy()
+    text = TextCache()
+    
+    def timed():
+        start = time.perf_counter()
+        profiler['draw'].record(time.perf_counter() - start)
+    
+    print("Stage profiler overhead:")
+    print(f"   record()            {time_per_call(lambda: stage.record(0.001), repeat) * 1e6:8.3f} ns")
+    print(f"   timer + record()    {time_per_call(timed, repeat) * 1e6:8.3f} ns")
+    print(f"   tick()              {time_per_call(profiler.tick, repeat) * 1e6:8.3f} ns")
+    print(f"   p50/p95/p99         {time_per_call(stage.percentiles_ms, 2000) * 1000:8.3f} us")
+    print(f"   overlay (refresh)   {time_per_call(lambda: profiler.draw_overlay(frame, text, 0), 500) * 1000:8.3f} us")
+    print(f"   overlay (cached)    {time_per_call(lambda: profiler.draw_overlay(frame, text), 500) * 1000:8.3f} us")
+
+
+@benchmark("gamelog")
+def benchmark_game_log(args, rounds=2000):
+    """Per-round cost on the game thread and load time of the game log"""
+    event = {'time': 0.0, 'player': "rock", 'ai': "paper", 'result': "lose", 'confidence': 0.9}
+    with tempfile.TemporaryDirectory() as folder:
+        stats_path = os.path.join(folder, "rps_stats.json")
+        
+        def rewrite():
+            # What every round used to cost: a synchronous JSON rewrite
+            with open(stats_path, 'w') as f:
+                json.dump({'player_wins': 0, 'ai_wins': 1, 'ties': 0, 'total_games': 1}, f)
+        
+        print("Cost on the game thread per round (us):")
+        print(f"   rewrite stats file  {time_per_call(rewrite, rounds) * 1000:8.2f}")
+        os.remove(stats_path)
+        
+        log = GameLog(stats_path, os.path.join(folder, "rps_rounds"), compact_every=500)
+        print(f"   append to game log  {time_per_call(lambda: log.append(event), rounds) * 1000:8.2f}")
+        start = time.perf_counter()
+        log.close()
+        print(f"   writer drained {rounds} rounds in {(time.perf_counter() - start) * 1000:.1f}ms")
+        
+        print("Load time (ms):")
+        written = 0
+        for tail in (0, 100, 400):
+            # Rounds logged after the last snapshot are replayed on load
+            with open(log.log_path(log.generation), 'a') as f:
+                f.write((json.dumps(event) + "\n") * (tail - written))
+            written = tail
+            start = time.perf_counter()
+            stats = GameLog(stats_path, os.path.join(folder, "rps_rounds")).load()
+            print(f"   snapshot + {tail:3d} round tail  {(time.perf_counter() - start) * 1000:6.2f}"
+                  f"   ({stats['total_games']} games)")
+
+
+class LegacyGestureSmoothing:
+    """The history-and-dict smoothing update_game used before
+    TemporalGestureFilter, kept as the baseline for --bench gesture-filter"""
+    def __init__(self):
+        self.history = []
+        self.last_gesture = "none"
+        self.stable_start = 0
+    
+    def update(self, gesture, timestamp):
+        """Return (smoothed gesture, stable time)"""
+        if gesture == self.last_gesture and gesture != "none":
+            if self.stable_start == 0:
+                self.stable_start = timestamp
         else:
-            self.player_choice = "rock"
+            self.stable_start = 0
         
-        # Determine winner
-        if self.player_choice == self.ai_choice:
-            self.result = "TIE!"
-            self.ties += 1
-        elif ((self.player_choice == "rock" and self.ai_choice == "scissors") or
-              (self.player_choice == "paper" and self.ai_choice == "rock") or
-              (self.player_choice == "scissors" and self.ai_choice == "paper")):
-            self.result = "YOU WIN!"
-            self.player_wins += 1
+        self.history.append(gesture)
+        if len(self.history) > 5:
+            self.history.pop(0)
+        if len(self.history) >= 3:
+            counts = {}
+            for g in self.history[-3:]:
+                counts[g] = counts.get(g, 0) + 1
+            smoothed = max(counts, key=counts.get)
+            if counts[smoothed] >= 2:
+                gesture = smoothed
+        
+        if gesture == self.last_gesture and gesture != "none":
+            if self.stable_start == 0:
+                self.stable_start = timestamp
         else:
-            self.result = "YOU LOSE!"
-            self.ai_wins += 1
-        
-        self.total_games += 1
-        self.save_data()
-        
-        self.state = "result"
-        self.countdown_start = time.time()
+            self.stable_start = 0
+        self.last_gesture = gesture
+        return gesture, timestamp - self.stable_start if self.stable_start > 0 else 0
+
+
+@benchmark("gesture-filter")
+def benchmark_gesture_filter(args):
+    """Per-frame cost and decision latency of the temporal gesture filter
     
-    def run(self):
-        """Main game loop"""
-        cap = cv2.VideoCapture(0)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        
-        print("🎮 Welcome to Rock Paper Scissors World! 🎮")
-        print("👍 Thumbs UP = Start | 👎 Thumbs DOWN = Exit | 👉 Point = Select")
-        
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Flip frame
-            frame = cv2.flip(frame, 1)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Hand detection
-            results = self.hands.process(rgb_frame)
-            
-            if results.multi_hand_landmarks:
-                for hand_landmarks in results.multi_hand_landmarks:
-                    # Draw landmarks
-                    self.mp_draw.draw_landmarks(frame, hand_landmarks, 
-                                               self.mp_hands.HAND_CONNECTIONS)
-                    
-                    # Detect gesture
-                    gesture, confidence = self.detect_gesture(hand_landmarks.landmark)
-                    self.current_gesture = gesture
-                    self.confidence = confidence
-            else:
-                self.current_gesture = "none"
-                self.confidence = 0
-                self.pointing = False
-            
-            # Update FPS
-            self.update_fps()
-            
-            # Update game
-            if not self.update_game():
-                break
-            
-            # Draw screens
-            if self.state == "menu":
-                self.draw_menu(frame)
-            elif self.state == "countdown":
-                self.draw_countdown(frame)
-            elif self.state in ["battle", "result"]:
-                self.draw_battle(frame)
-            elif self.state == "options":
-                self.draw_options(frame)
-            
-            # Show finger pointer in menu and options
-            if self.pointing and self.state in ["menu", "options"]:
-                cv2.circle(frame, self.finger_pos, 15, self.colors['yellow'], -1)
-                cv2.circle(frame, self.finger_pos, 15, self.colors['white'], 3)
-            
-            # Display
-            cv2.imshow('Rock Paper Scissors World', frame)
-            
-            # Exit on 'q'
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
-        
-        cap.release()
-        cv2.destroyAllWindows()
+    Runs TemporalGestureFilter and the legacy smoothing over the gestures
+    of a landmark recording (--bench-input) or a synthetic noisy sequence,
+    timing how long each takes to report a held gesture as stable.
+    """
+    if args.bench_input:
+        records, _ = load_landmarks(args.bench_input)
+        gestures, confidences = GestureClassifier().classify_batch(
+            np.ascontiguousarray(records['landmarks']))
+        has_hand = records['hand'] >= 0
+        gestures = np.where(has_hand, gestures, "none")
+        confidences = np.where(has_hand, confidences, 0.0)
+        times, truth = records['time'] - records['time'][0], gestures
+    else:
+        times, gestures, confidences, truth = gesture_sequence()
+    times, gestures, truth = times.tolist(), gestures.tolist(), truth.tolist()
+    confidences = confidences.tolist()
+    required = TemporalGestureFilter().required["play"]
+    index = {name: i for i, name in enumerate(GestureClassifier.gestures.tolist())}
+    
+    # Start frame of every held gesture in the ground truth
+    segments = [i for i in range(len(truth)) if truth[i] != "none" and
+                (i == 0 or truth[i - 1] != truth[i])]
+    
+    def evaluate(name, step):
+        start = time.perf_counter()
+        outputs = [step(i) for i in range(len(times))]
+        per_frame = (time.perf_counter() - start) / len(times) * 1e6
+        
+        latencies = []
+        for first in segments:
+            held = truth[first]
+            i = first
+            while i < len(truth) and truth[i] == held:
+                gesture, stable = outputs[i]
+                if gesture == held and stable > required[index[held]]:
+                    latencies.append(times[i] - times[first])
+                    break
+                i += 1
+        switches = sum(outputs[i][0] != outputs[i - 1][0] for i in range(1, len(outputs)))
+        print(f"   {name:<9} {per_frame:8.2f}  {np.mean(latencies) * 1000 if latencies else 0:12.1f}"
+              f"  {len(latencies):5d}/{len(segments):<5d} {switches:8d}")
+    
+    print(f"{len(times)} frames, {len(segments)} held gestures")
+    print("   filter    us/frame  latency (ms)  triggered  switches")
+    legacy = LegacyGestureSmoothing()
+    evaluate("legacy", lambda i: legacy.update(gestures[i], times[i]))
+    temporal = TemporalGestureFilter()
+    evaluate("temporal", lambda i: (temporal.update(gestures[i], confidences[i], times[i]),
+                                    temporal.stable_time(times[i])))
+
+
+@benchmark("players")
+def benchmark_two_players(args, frames=2000):
+    """Hand handling cost per frame with one hand and with two players
+    
+    Covers landmark drawing, classification, player assignment and the
+    game update; the one MediaPipe call per frame is left out. Hands come
+    from a landmark recording (--bench-input), the second hand mirrored.
+    """
+    if args.bench_input:
+        records, _ = load_landmarks(args.bench_input)
+        points = np.ascontiguousarray(records['landmarks'][records['hand'] >= 0][:frames])
+    else:
+        points = np.random.default_rng(0).random((frames, 21, 3), dtype=np.float32)
+    mirrored = points.copy()
+    mirrored[:, :, 0] = 1 - mirrored[:, :, 0]
+    
+    load_mediapipe()
+    from mediapipe.framework.formats import classification_pb2
+    
+    def handedness(label):
+        classification = classification_pb2.ClassificationList()
+        classification.classification.add(label=label, score=0.9)
+        return classification
+    
+    one_hand = [HandResults([landmark_list(p)], [handedness("Right")]) for p in points]
+    two_hands = [HandResults([landmark_list(p), landmark_list(q)],
+                             [handedness("Right"), handedness("Left")])
+                 for p, q in zip(points, mirrored)]
+    frame = SyntheticSource(frames=1).background.copy()
+    
+    print(f"Hand handling per frame over {len(points)} frames (us):")
+    for name, players, results in (("1 player", 1, one_hand), ("2 players", 2, two_hands)):
+        game = RockPaperScissorsWorld(enable_hands=False, persist=False, players=players)
+        game.state = "countdown"
+        game.countdown_start = float("inf")
+        
+        def step(result):
+            game.apply_hand_results(frame, result)
+            game.update_game()
+        
+        iterator = iter(results * 2)
+        per_frame = time_per_call(lambda: step(next(iterator)), len(results)) * 1000
+        print(f"   {name:<10} {per_frame:8.1f}   landmarks {game.profiler['landmarks'].mean_ms() * 1000:6.1f}"
+              f"   gestures {game.profiler['gesture'].mean_ms() * 1000:6.1f}")
+    
+    classifier = GestureClassifier()
+    pairs = np.stack([points, mirrored], axis=1)
+    single = time_per_call(lambda: [classifier.classify(p) for p in pairs[0]], 2000) * 1000
+    batched = time_per_call(lambda: classifier.classify_batch(pairs[0]), 2000) * 1000
+    print(f"   classify 2 hands: one by one {single:6.1f}  batched {batched:6.1f}")
+
+
+@benchmark("skeleton")
+def benchmark_skeleton(args, frames=500):
+    """Hand skeleton drawing with MediaPipe's drawing_utils versus the
+    vectorized SkeletonRenderer, for one and two hands
+    
+    Hands come from a landmark recording (--bench-input) or are scattered
+    around the frame center, the second hand mirrored. MediaPipe's drawer
+    gets prebuilt landmark lists; the renderer converts from arrays.
+    """
+    if args.bench_input:
+        records, _ = load_landmarks(args.bench_input)
+        points = np.ascontiguousarray(records['landmarks'][records['hand'] >= 0][:frames])
+    else:
+        points = 0.35 + 0.3 * np.random.default_rng(0).random((frames, 21, 3), dtype=np.float32)
+    mirrored = points.copy()
+    mirrored[:, :, 0] = 1 - mirrored[:, :, 0]
+    pairs = np.stack([points, mirrored], axis=1)
+    
+    solutions = load_mediapipe().solutions
+    draw_landmarks = solutions.drawing_utils.draw_landmarks
+    connections = solutions.hands.HAND_CONNECTIONS
+    lists = [[landmark_list(p), landmark_list(q)] for p, q in zip(points, mirrored)]
+    background = SyntheticSource(frames=1).background
+    frame = background.copy()
+    
+    def mediapipe(hands):
+        def draw(index):
+            for hand in lists[index][:hands]:
+                draw_landmarks(frame, hand, connections)
+        return draw
+    
+    def vectorized(hands, detail):
+        renderer = SkeletonRenderer(detail)
+        return lambda index: renderer.draw(frame, pairs[index, :hands])
+    
+    print(f"Skeleton drawing per frame over {len(points)} frames (us):")
+    for hands in (1, 2):
+        costs = []
+        for draw in (mediapipe(hands), vectorized(hands, "full"), vectorized(hands, "bones")):
+            iterator = iter(range(len(points)))
+            costs.append(time_per_call(lambda: draw(next(iterator)), len(points)) * 1000)
+        print(f"   {hands} hand{'s' if hands > 1 else ' '}  mediapipe={costs[0]:7.1f}  "
+              f"vectorized={costs[1]:6.1f}  bones only={costs[2]:6.1f}  "
+              f"speedup={costs[0] / costs[1]:4.1f}x")
+    
+    # Same picture: share of pixels that differ on one hand
+    expected, actual = background.copy(), background.copy()
+    draw_landmarks(expected, lists[0][0], connections)
+    SkeletonRenderer().draw(actual, points[0])
+    drawn = np.any(expected != background, axis=2)
+    differ = np.any(expected != actual, axis=2)
+    print(f"   pixels differing from mediapipe: {differ.sum()} of {drawn.sum()} drawn")
+
+
+@benchmark("server")
+def benchmark_game_server(args):
+    """Concurrent sessions one server core sustains, landmarks and gestures
+    
+    Starts a GameServer in its own process, pinned to one core where
+    possible, and drives it with LoadGenerator replays of --bench-input.
+    """
+    if not args.bench_input:
+        print("The server benchmark needs a landmark recording: --bench-input PATH")
+        return
+    host, port = "127.0.0.1", 8765
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(target=serve_pinned, args=(host, port, ready), daemon=True)
+    server.start()
+    try:
+        if not ready.wait(timeout=30):
+            print("Server did not start")
+            return
+        run_load(args, host, port)
+    finally:
+        server.terminate()
+        server.join()
+
+
+def run_load(args, host, port):
+    """Load test a game server with landmark clients, then gesture clients"""
+    for gestures in (False, True):
+        LoadGenerator(args.bench_input, host, port, gestures).run(
+            args.bench_sessions, args.bench_seconds)
+
+
+def serve_pinned(host, port, ready=None):
+    """Run a GameServer on the first allowed core"""
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+    GameServer(host, port).run(ready)
+
+
+def compare_classifiers(classifiers, points, labels, repeat=200):
+    """Print accuracy and per-frame cost of each classifier on labelled landmarks"""
+    print(f"{len(points)} labelled frames")
+    print("   classifier  accuracy  us/frame  us/frame (batched)")
+    for name, classifier in classifiers.items():
+        gestures, _ = classifier.classify_batch(points)
+        accuracy = np.mean(gestures == labels) * 100
+        sample = points[:repeat]
+        single = time_per_call(lambda: [classifier.classify(p) for p in sample], 5) * 1000
+        batched = time_per_call(lambda: classifier.classify_batch(points), 5) * 1000
+        print(f"   {name:<10}  {accuracy:7.2f}%  {single / len(sample):8.1f}  "
+              f"{batched / len(points):18.2f}")
+
+
+def train_classifier(folder, model_path, aspect=16 / 9, holdout=0.2, seed=0):
+    """Train a LearnedGestureClassifier on folder/<gesture>/*.rpsl, recorded
+    from frames of the given width / height, and save it"""
+    points, labels = load_labelled_landmarks(folder)
+    rng = np.random.default_rng(seed)
+    test = rng.random(len(points)) < holdout
+    print(f"Training on {np.count_nonzero(~test)} frames: " +
+          ", ".join(f"{gesture} {count}" for gesture, count in
+                    zip(*np.unique(labels[~test], return_counts=True))))
+    start = time.perf_counter()
+    model = LearnedGestureClassifier.train(points[~test], labels[~test], aspect, seed=seed)
+    print(f"Trained in {time.perf_counter() - start:.1f}s, held out {np.count_nonzero(test)} frames")
+    compare_classifiers({"rules": GestureClassifier(), "learned": model},
+                        points[test], labels[test])
+    model.save(model_path)
+    print(f"💾 Model saved to {model_path}")
+
+
+@benchmark("classifier")
+def benchmark_classifier(args):
+    """Rule based versus learned classifier on labelled recordings
+    
+    --bench-input is a folder of <gesture>/*.rpsl recordings and
+    --classifier a model from --train-classifier.
+    """
+    if not args.bench_input or not args.classifier:
+        print("The classifier benchmark needs --bench-input FOLDER and --classifier MODEL")
+        return
+    points, labels = load_labelled_landmarks(args.bench_input)
+    compare_classifiers({"rules": GestureClassifier(),
+                         "learned": LearnedGestureClassifier.load(args.classifier)},
+                        points, labels)
+
+
+# Scripted players for --bench strategy: (rng, own last throw, AI's last throw) -> throw
+SCRIPTED_PLAYERS = {
+    "random": lambda rng, mine, theirs: rng.randrange(3),
+    "favourite": lambda rng, mine, theirs: 0 if rng.random() < 0.5 else rng.randrange(3),
+    "sticky": lambda rng, mine, theirs: mine if rng.random() < 0.8 else rng.randrange(3),
+    "cycle": lambda rng, mine, theirs: (mine + 1) % 3,
+    "copy-ai": lambda rng, mine, theirs: theirs,
+    "beat-ai": lambda rng, mine, theirs: (theirs + 1) % 3,
+    "win-stay": lambda rng, mine, theirs: mine if (mine - theirs) % 3 == 1 else (mine + 1) % 3,
+}
+
+
+def simulate_strategy(strategy, player, rounds, seed=0):
+    """Play `rounds` rounds against a scripted player; returns AI (wins, ties, losses)"""
+    rng = random.Random(seed)
+    outcomes = [0, 0, 0]
+    mine = theirs = 0
+    for _ in range(rounds):
+        ai = strategy.choose_index(rng)
+        mine = player(rng, mine, theirs)
+        strategy.observe_index(mine, ai)
+        outcomes[(ai - mine) % 3] += 1
+        theirs = ai
+    ties, wins, losses = outcomes
+    return wins, ties, losses
+
+
+@benchmark("strategy")
+def benchmark_strategy(args):
+    """Win rate of the AI strategies against scripted players and cost per decision"""
+    rounds = args.bench_rounds
+    print(f"AI win / tie / loss % over {rounds} rounds per scripted player:")
+    print(f"   {'player':<10} {'random AI':>20} {'pattern AI':>20}")
+    start = time.perf_counter()
+    for name, player in SCRIPTED_PLAYERS.items():
+        cells = []
+        for strategy in (RandomStrategy(), PatternStrategy()):
+            wins, ties, losses = simulate_strategy(strategy, player, rounds)
+            cells.append(f"{100 * wins / rounds:5.1f} {100 * ties / rounds:5.1f} "
+                         f"{100 * losses / rounds:5.1f}")
+        print(f"   {name:<10} {cells[0]:>20} {cells[1]:>20}")
+    elapsed = time.perf_counter() - start
+    print(f"Simulated {2 * rounds * len(SCRIPTED_PLAYERS)} rounds in {elapsed:.1f}s")
+    
+    rng = random.Random(0)
+    print("Cost per round (us):")
+    for strategy in (RandomStrategy(), PatternStrategy()):
+        simulate_strategy(strategy, SCRIPTED_PLAYERS["random"], 1000)
+        decide = time_per_call(lambda: strategy.choose_index(rng), 100000)
+        learn = time_per_call(lambda: strategy.observe_index(rng.randrange(3), 1), 100000)
+        print(f"   {type(strategy).__name__:<16} choose {decide * 1000:6.2f}   "
+              f"observe {learn * 1000:6.2f}")
+
+
+def play_cycles(game, cycles, step=1 / 30, frame=None, on_frame=None):
+    """Drive `cycles` menu -> countdown -> battle -> result cycles on a
+    VirtualClock, rendering into `frame` if given and passing it to
+    on_frame after each render; returns the update count"""
+    clock = game.clock
+    updates = 0
+    for _ in range(cycles):
+        games = game.total_games
+        while game.total_games == games or game.state != "menu":
+            game.current_gesture = "thumbs_up" if game.state == "menu" else "rock"
+            game.confidence = 0.95
+            game.update_game()
+            if frame is not None:
+                game.render(frame)
+                if on_frame is not None:
+                    on_frame(frame)
+            clock.advance(step)
+            updates += 1
+    return updates
+
+
+@benchmark("cycle")
+def benchmark_game_cycle(args, cycles=1000):
+    """Complete game cycles per second on a virtual clock"""
+    frame = SyntheticSource(frames=1).background.copy()
+    print("Menu -> countdown -> battle -> result cycles on a VirtualClock:")
+    for name, step, render in (("logic, 30 fps steps", 1 / 30, False),
+                               ("logic, 10 fps steps", 0.1, False),
+                               ("logic + render, 30 fps", 1 / 30, True)):
+        game = RockPaperScissorsWorld(enable_hands=False, persist=False, seed=0,
+                                      clock=VirtualClock())
+        count = cycles // 20 if render else cycles
+        start = time.perf_counter()
+        updates = play_cycles(game, count, step, frame if render else None)
+        elapsed = time.perf_counter() - start
+        print(f"   {name:<24} {count / elapsed:9.0f} cycles/s   "
+              f"{game.clock.time / elapsed:9.0f}x real time   "
+              f"{elapsed / updates * 1e6:6.1f} us/update")
+
+
+@benchmark("video")
+def benchmark_video(args, cycles=2):
+    """Game-thread cost of recording rounds with inline encoding versus
+    the background VideoRecorder, at camera pace and flat out"""
+    frame = SyntheticSource(frames=1).background.copy()
+    step = 1 / 30
+    
+    def run(background, paced):
+        game = RockPaperScissorsWorld(enable_hands=False, persist=False, seed=0,
+                                      clock=VirtualClock())
+        cost = StageStats("record")
+        due = time.perf_counter()
+        
+        def record(frame):
+            nonlocal due
+            start = time.perf_counter()
+            video.follow(game.state)
+            video.write(frame)
+            cost.record(time.perf_counter() - start)
+            if paced:
+                due += step
+                time.sleep(max(0.0, due - time.perf_counter()))
+        
+        with tempfile.TemporaryDirectory() as folder:
+            video = VideoRecorder(folder, background=background)
+            play_cycles(game, cycles, step, frame, record)
+            video.close()
+        return cost, video
+    
+    print(f"Recording {cycles} rendered game cycles at "
+          f"{frame.shape[1]}x{frame.shape[0]} (game thread ms per frame):")
+    for name, background, paced in (("inline", False, False),
+                                    ("background, 30 FPS", True, True),
+                                    ("background, flat out", True, False)):
+        cost, video = run(background, paced)
+        p50, p95, _ = cost.percentiles_ms()
+        print(f"   {name:<21} mean={cost.mean_ms():6.2f} p95={p95:6.2f}   "
+              f"encode={video.stats.mean_ms():5.2f}ms  segments={video.segments} "
+              f"written={video.written} dropped={video.stats.dropped} "
+              f"max queue={video.stats.max_queue_depth}")
+
+
+def replay_landmarks(path, seed=None):
+    """Replay a landmark recording and print the rounds and replay speed"""
+    replayer = LandmarkReplayer(path)
+    game = replayer.new_game(seed)
+    
+    start = time.perf_counter()
+    rounds = replayer.replay(game)
+    elapsed = time.perf_counter() - start
+    
+    for timestamp, player, ai, result in rounds:
+        print(f"{timestamp:14.3f}  You: {player:<8} AI: {ai:<8} {result}")
+    
+    frames = len(replayer)
+    duration = float(replayer.records['time'][-1] - replayer.records['time'][0]) if frames else 0.0
+    print(f"\n📼 {frames} frames ({duration:.1f}s of play) replayed in {elapsed:.3f}s "
+          f"({frames / max(elapsed, 1e-9):.0f} frames/s), {len(rounds)} rounds")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rock Paper Scissors World")
+    parser.add_argument("--source", default="0",
+                        help="camera index, video file, image directory or synthetic[:frames]")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--loop", action="store_true",
+                        help="restart video files and image directories when they end")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="run capture, inference and rendering on separate threads")
+    parser.add_argument("--headless", action="store_true",
+                        help="run the full loop without opening a window")
+    parser.add_argument("--max-frames", type=int, default=None,
+                        help="stop after this many frames")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="headless run over --source as fast as possible")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record per-frame hand landmarks to PATH")
+    parser.add_argument("--record-video", metavar="DIR",
+                        help="save every round as a video file in DIR, encoded in the background")
+    parser.add_argument("--record-fps", type=float, default=30,
+                        help="frame rate written to the round videos")
+    parser.add_argument("--record-queue", type=int, default=8, metavar="FRAMES",
+                        help="frames waiting for the encoder before new ones are dropped")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="replay a landmark recording without camera or MediaPipe")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed for the AI's choices")
+    parser.add_argument("--serve", metavar="[HOST:]PORT",
+                        help="run the headless game server for landmark/gesture clients")
+    parser.add_argument("--load", metavar="[HOST:]PORT",
+                        help="replay --bench-input as concurrent clients of a game server")
+    parser.add_argument("--kiosks", nargs="+", metavar="SOURCE",
+                        help="run one game process per source (camera index or video file)")
+    parser.add_argument("--cores", nargs="+", type=int, metavar="CORE",
+                        help="CPU core for each kiosk process")
+    parser.add_argument("--classifier", metavar="MODEL",
+                        help="use a learned gesture classifier (.npz from --train-classifier)")
+    parser.add_argument("--stability-scale", type=float, default=1.0,
+                        help="scale how long gestures must hold, e.g. 0.6 with --classifier")
+    parser.add_argument("--train-classifier", metavar="FOLDER",
+                        help="train --classifier from FOLDER/<gesture>/*.rpsl recordings "
+                             "made at --width x --height")
+    parser.add_argument("--players", type=int, choices=(1, 2), default=1,
+                        help="2 plays two hands against each other instead of the AI")
+    parser.add_argument("--ai", choices=("pattern", "random"), default="pattern",
+                        help="AI opponent: learns the player's patterns, or throws at random")
+    parser.add_argument("--profile", metavar="NAME",
+                        help="keep the learned AI model in rps_ai.NAME.json instead of rps_ai.json")
+    parser.add_argument("--throw-window", nargs=2, type=float, default=[0.0, 0.6],
+                        metavar=("BEFORE", "AFTER"),
+                        help="seconds around SHOOT whose frames decide the player's throw")
+    parser.add_argument("--roi-inference", action="store_true",
+                        help="track the hand in a cropped, adaptively scaled region")
+    parser.add_argument("--target-fps", type=float, default=30,
+                        help="frame rate the adaptive inference scale aims for")
+    parser.add_argument("--infer-every", type=int, default=1, metavar="K",
+                        help="run hand inference every K frames, predicting in between")
+    parser.add_argument("--predictor", choices=sorted(LandmarkPredictor.presets),
+                        default="velocity", help="landmark predictor for skipped frames")
+    parser.add_argument("--idle-after", type=float, default=None, metavar="SECONDS",
+                        help="go idle after this long without a hand, checking only for motion")
+    parser.add_argument("--idle-fps", type=float, default=5,
+                        help="frame rate while idle")
+    parser.add_argument("--alloc-report", action="store_true",
+                        help="trace frame-sized allocations in the sequential loop")
+    parser.add_argument("--text-cache-mb", type=int, default=16,
+                        help="memory cap of the rendered text cache")
+    parser.add_argument("--skeleton", choices=SkeletonRenderer.levels, default="full",
+                        help="hand skeleton detail: bones and joints, bones only, or off")
+    parser.add_argument("--countdown-skeleton", choices=SkeletonRenderer.levels,
+                        help="hand skeleton detail during the countdown (default: --skeleton)")
+    parser.add_argument("--debug-overlay", action="store_true",
+                        help="show per-stage p50/p95/p99 timings on screen ('d' toggles)")
+    parser.add_argument("--profile-out", metavar="PATH",
+                        help="write stage timings to PATH (.json or .csv) at exit and on SIGUSR1")
+    parser.add_argument("--bench", choices=sorted(BENCHMARKS),
+                        help="run a micro-benchmark and exit")
+    parser.add_argument("--bench-input", metavar="PATH",
+                        help="landmark recording used by the skip, server and load benchmarks")
+    parser.add_argument("--bench-sessions", nargs="+", type=int, default=[1, 10, 50, 100],
+                        metavar="N", help="concurrent sessions for --load and --bench server")
+    parser.add_argument("--bench-seconds", type=float, default=5.0,
+                        help="seconds per session count for --load and --bench server")
+    parser.add_argument("--bench-rounds", type=int, default=1000000,
+                        help="rounds per scripted player for --bench strategy")
+    args = parser.parse_args()
+    
+    if args.bench:
+        BENCHMARKS[args.bench](args)
+        return
+    
+    if args.train_classifier:
+        if not args.classifier:
+            parser.error("--train-classifier needs --classifier PATH to save the model to")
+        train_classifier(args.train_classifier, args.classifier, args.width / args.height)
+        return
+    
+    if args.replay:
+        replay_landmarks(args.replay, args.seed)
+        return
+    if args.serve:
+        GameServer(*parse_address(args.serve), seed=args.seed).run()
+        return
+    if args.load:
+        if not args.bench_input:
+            parser.error("--load needs a landmark recording: --bench-input PATH")
+        run_load(args, *parse_address(args.load))
+        return
+    if args.kiosks:
+        if args.cores and len(args.cores) != len(args.kiosks):
+            parser.error("--cores needs one core per kiosk")
+        sources = [open_source(spec, args.width, args.height, args.loop) for spec in args.kiosks]
+        KioskSupervisor(sources, args.cores, display=not (args.headless or args.benchmark),
+                        seed=args.seed, idle_after=args.idle_after,
+                        idle_fps=args.idle_fps).run(args.max_frames)
+        return
+    if args.players == 2 and (args.roi_inference or args.infer_every > 1 or args.record):
+        parser.error("--players 2 tracks both hands on every full frame and cannot be "
+                     "combined with --roi-inference, --infer-every or --record")
+    
+    sink = HeadlessSink() if args.headless or args.benchmark else WindowSink()
+    
+    seed = args.seed
+    if args.record and seed is None:
+        seed = random.getrandbits(32)
+    # The hand model loads in the background while the camera opens;
+    # benchmarks wait for it so every measured frame runs inference
+    game = RockPaperScissorsWorld(seed=seed, players=args.players, background=not args.benchmark,
+                                  tracking=not args.roi_inference)
+    sink.show(game.splash(args.width, args.height))
+    source = open_source(args.source, args.width, args.height, args.loop)
+    if args.profile:
+        game.strategy_path = f"rps_ai.{args.profile}.json"
+        game.load_strategy()
+    if args.record:
+        # Replays start from a fresh model, so recorded sessions must too
+        game.strategy, game.strategy_path = PatternStrategy(), None
+    # Recordings keep the settings, so their replays play by the same rules;
+    # as for --train-classifier, they are taken to be made at --width x --height
+    settings = {'ai': args.ai, 'classifier': args.classifier,
+                'stability_scale': args.stability_scale, 'throw_window': args.throw_window,
+                'aspect': args.width / args.height}
+    game.apply_settings(settings)
+    if args.record:
+        game.recorder = LandmarkRecorder(args.record, seed, settings=settings)
+    if args.record_video:
+        game.video = VideoRecorder(args.record_video, args.record_fps,
+                                   queue_size=args.record_queue)
+    if args.roi_inference:
+        game.inference = AdaptiveHandInference(game.hands, ResolutionController(args.target_fps))
+    if args.infer_every > 1:
+        game.inference = SkippingHandInference(game.inference or game.hands, args.infer_every,
+                                               LandmarkPredictor.preset(args.predictor))
+    if args.idle_after:
+        game.power_save = IdleHandInference(game.inference or game.hands, args.idle_after,
+                                            args.idle_fps)
+        game.inference = game.power_save
+    game.text.capacity = args.text_cache_mb << 20
+    countdown = {"countdown": args.countdown_skeleton} if args.countdown_skeleton else None
+    game.skeleton = SkeletonRenderer(args.skeleton, countdown)
+    game.debug_overlay = args.debug_overlay
+    game.profile_out = args.profile_out
+    game.run(source, sink, pipelined=args.pipelined, max_frames=args.max_frames,
+             alloc_report=args.alloc_report)
+
 
 if __name__ == "__main__":
-    game = RockPaperScissorsWorld()
-    game.run()
\ No newline at end of file
+    main()
@@ -0,0 +1,1188 @@
+"""Game-independent parts of Rock Paper Scissors World
+
+Classes that need neither the game loop, a camera nor MediaPipe. Keeping
+them in a plain module lets tests and tools import them without loading
+the game script.
+"""
+import glob
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+
+class StageStats:
+    """Per-frame latency and queue depth counters for one loop stage
+    
+    The last `window` timings are kept in a ring buffer, so p50/p95/p99
+    follow recent behaviour instead of the whole run.
+    """
+    quantiles = (50, 95, 99)
+    
+    def __init__(self, name, window=512):
+        self.name = name
+        self.window = window
+        self.samples = [0.0] * window
+        self.frames = 0
+        self.dropped = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.last_time = 0.0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+    
+    def record(self, elapsed, queue_depth=None):
+        """Record one processed frame"""
+        self.samples[self.frames % self.window] = elapsed
+        self.frames += 1
+        self.total_time += elapsed
+        self.last_time = elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+        if queue_depth is not None:
+            self.queue_depth = queue_depth
+            self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+    
+    def mean_ms(self):
+        return self.total_time / max(1, self.frames) * 1000
+    
+    def percentiles_ms(self):
+        """p50, p95 and p99 over the rolling window"""
+        recent = self.samples[:min(self.frames, self.window)]
+        if not recent:
+            return np.zeros(len(self.quantiles))
+        return np.percentile(recent, self.quantiles) * 1000
+    
+    def as_dict(self):
+        """Counters as a flat dict for JSON/CSV export"""
+        p50, p95, p99 = self.percentiles_ms()
+        return {"stage": self.name, "frames": self.frames, "dropped": self.dropped,
+                "mean_ms": round(self.mean_ms(), 3), "p50_ms": round(float(p50), 3),
+                "p95_ms": round(float(p95), 3), "p99_ms": round(float(p99), 3),
+                "max_ms": round(self.max_time * 1000, 3),
+                "queue_depth": self.queue_depth, "max_queue_depth": self.max_queue_depth}
+    
+    def summary(self):
+        """One-line human readable report"""
+        p50, p95, p99 = self.percentiles_ms()
+        return (f"{self.name:<10} frames={self.frames:<6} dropped={self.dropped:<5} "
+                f"mean={self.mean_ms():7.2f}ms p50={p50:7.2f}ms p95={p95:7.2f}ms "
+                f"p99={p99:7.2f}ms max={self.max_time * 1000:7.2f}ms "
+                f"queue={self.queue_depth} (max {self.max_queue_depth})")
+
+
+class LRUCache:
+    """Least recently used eviction under a capacity, for the render caches
+    
+    Each value weighs 1, so the capacity is a number of entries, unless a
+    subclass weighs values some other way, e.g. in bytes.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = {}
+        self.total = 0  # summed weight of the entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def weigh(self, value):
+        return 1
+    
+    def lookup(self, key, make):
+        """The value cached for key, made by make() on a miss"""
+        value = self.entries.pop(key, None)
+        if value is None:
+            self.misses += 1
+            value = make()
+            self.total += self.weigh(value)
+            while self.entries and self.total > self.capacity:
+                # Dicts keep insertion order, so the first key is the oldest
+                self.total -= self.weigh(self.entries.pop(next(iter(self.entries))))
+                self.evictions += 1
+        else:
+            self.hits += 1
+        self.entries[key] = value
+        return value
+
+
+class GestureClassifier:
+    """Rule based gesture classifier over NumPy landmark arrays
+    
+    classify_batch scores an (N, 21, 3) array of MediaPipe hand landmarks
+    in one call and gives the same gestures and confidences as running the
+    original per-landmark rules frame by frame. Every rule threshold is one
+    coordinate comparison, so a frame reduces to a bit pattern of
+    comparison results and the rule chain becomes a lookup table built
+    once up front.
+    """
+    gestures = np.array(["none", "rock", "paper", "scissors",
+                         "thumbs_up", "thumbs_down", "pointing"])
+    
+    # Rules in priority order: (gesture index, confidence)
+    rule_outputs = [
+        (4, 0.95),  # thumbs up
+        (5, 0.95),  # thumbs down
+        (6, 0.95),  # pointing
+        (3, 0.92),  # scissors
+        (1, 0.9),   # rock
+        (2, 0.9),   # paper
+        (3, 0.7),   # two fingers, index and middle: partial scissors
+        (1, 0.6),   # two other fingers: probably transitioning to rock
+        (2, 0.6),   # three fingers: probably transitioning to paper
+        (0, 0.3),   # nothing matched
+    ]
+    rule_gesture = np.array([g for g, _ in rule_outputs])
+    rule_confidence = np.array([c for _, c in rule_outputs])
+    
+    # (landmark, axis) > or < (landmark, axis) + offset; axis 0 is x, 1 is y
+    comparisons = [
+        ((4, 0), (0, 0), 0.0, True),     # thumb tip right of wrist: right hand
+        ((4, 0), (3, 0), 0.03, True),    # thumb open, right hand
+        ((4, 0), (3, 0), -0.03, False),  # thumb open, left hand
+        ((8, 1), (6, 1), -0.03, False),  # index open
+        ((12, 1), (10, 1), -0.03, False),  # middle open
+        ((16, 1), (14, 1), -0.03, False),  # ring open
+        ((20, 1), (18, 1), -0.03, False),  # pinky open
+        ((4, 1), (3, 1), -0.06, False),  # thumb up
+        ((4, 1), (2, 1), -0.08, False),
+        ((4, 1), (3, 1), 0.04, True),    # thumb down
+        ((4, 1), (2, 1), 0.06, True),
+        ((4, 1), (0, 1), 0.05, True),    # thumb clearly below wrist
+        ((8, 1), (5, 1), -0.05, False),  # index high for scissors
+        ((12, 1), (9, 1), -0.05, False),  # middle high for scissors
+    ]
+    # Plus one last bit: index and middle tips well separated
+    tip_separation = 0.08
+    # Frame width / height; the rules were tuned on 16:9 and ignore it
+    aspect = 16 / 9
+    # Only depends on the rules above, so it is built once and shared
+    rule_table = None
+    
+    def __init__(self):
+        lhs, rhs, offset, greater = zip(*self.comparisons)
+        self.lhs = np.array([landmark * 3 + axis for landmark, axis in lhs])
+        self.rhs = np.array([landmark * 3 + axis for landmark, axis in rhs])
+        self.offset = np.array(offset)
+        self.sign = np.where(greater, 1.0, -1.0)
+        self.bit_count = len(self.comparisons) + 1
+        self.bit_weights = 1 << np.arange(self.bit_count)
+        if type(self).rule_table is None:
+            type(self).rule_table = self.build_rule_table()
+    
+    def build_rule_table(self):
+        """Evaluate the rule chain for every possible comparison bit pattern"""
+        codes = np.arange(1 << self.bit_count)
+        bits = ((codes[:, None] >> np.arange(self.bit_count)) & 1).astype(bool)
+        (right_hand, thumb_out_right, thumb_out_left,
+         index_open, middle_open, ring_open, pinky_open,
+         thumb_up_ip, thumb_up_mcp, thumb_down_ip, thumb_down_mcp, thumb_below_wrist,
+         index_high, middle_high, tips_apart) = bits.T
+        
+        thumb_open = np.where(right_hand, thumb_out_right, thumb_out_left)
+        fingers = np.column_stack([thumb_open, index_open, middle_open, ring_open, pinky_open])
+        finger_count = fingers.sum(axis=1)
+        
+        # Index, middle and ring closed
+        other_fingers_closed = ~(index_open | middle_open | ring_open)
+        
+        thumbs_up = thumb_up_ip & thumb_up_mcp & other_fingers_closed
+        thumbs_down = (thumb_down_ip & thumb_down_mcp & thumb_below_wrist &
+                       other_fingers_closed)
+        pointing = index_open & ~thumb_open & ~middle_open & ~ring_open & ~pinky_open
+        
+        # Scissors: exactly index and middle up, well separated and high
+        index_middle_up = index_open & middle_open
+        scissors = (index_middle_up & ~thumb_open & ~ring_open & ~pinky_open &
+                    tips_apart & index_high & middle_high)
+        
+        rock = (finger_count == 0) | ((finger_count == 1) & thumb_open)
+        paper = finger_count >= 4
+        two = finger_count == 2
+        
+        matched = np.column_stack([
+            thumbs_up, thumbs_down, pointing, scissors, rock, paper,
+            two & index_middle_up, two & ~index_middle_up,
+            finger_count == 3, np.ones(len(codes), dtype=bool)])
+        return matched.argmax(axis=1).astype(np.uint8)
+    
+    @staticmethod
+    def to_array(landmarks):
+        """Convert hand_landmarks.landmark to a (21, 3) float32 array"""
+        if isinstance(landmarks, np.ndarray):
+            return landmarks
+        return np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype=np.float32)
+    
+    def rule_indices(self, points):
+        """Index into rule_outputs of the first matching rule per frame"""
+        # Compare in double precision, exactly like the scalar rules did
+        # with Python floats
+        flat = np.asarray(points, dtype=np.float64).reshape(-1, 63)
+        bits = np.empty((len(flat), self.bit_count), dtype=bool)
+        bits[:, :-1] = (self.sign * flat[:, self.lhs] >
+                        self.sign * (flat[:, self.rhs] + self.offset))
+        bits[:, -1] = np.abs(flat[:, 8 * 3] - flat[:, 12 * 3]) > self.tip_separation
+        return self.rule_table[bits.dot(self.bit_weights)]
+    
+    def classify_batch(self, points):
+        """Classify (N, 21, 3) landmarks, returning (gestures, confidences)"""
+        rules = self.rule_indices(points)
+        return self.gestures[self.rule_gesture[rules]], self.rule_confidence[rules]
+    
+    def classify(self, points):
+        """Classify a single (21, 3) landmark array"""
+        rule = self.rule_indices(points)[0]
+        return str(self.gestures[self.rule_gesture[rule]]), float(self.rule_confidence[rule])
+
+
+class LearnedGestureClassifier:
+    """Small NumPy MLP over scale- and rotation-normalized landmarks
+    
+    A drop-in for GestureClassifier, trained from labelled landmark
+    recordings. Landmarks are centred on the wrist, scaled by the palm
+    length and rotated so the palm points up, so hand size, distance
+    and tilt stop mattering. The removed rotation and the hand's
+    chirality come back as features, which keeps thumbs up and thumbs
+    down apart. Confidence is the winning softmax probability, and frames
+    below `min_confidence` are classified as "none".
+    
+    Normalized landmarks are in frame widths (x) and heights (y), so
+    `aspect`, the width / height of the frames being classified, turns
+    them into square units before rotating. It starts as the aspect of
+    the training recordings; the game sets it from its camera frames.
+    """
+    tips = [4, 8, 12, 16, 20]
+    to_array = staticmethod(GestureClassifier.to_array)
+    
+    def __init__(self, gestures, mean, std, layers, aspect=16 / 9, min_confidence=0.5):
+        self.gestures = np.asarray(gestures)
+        self.aspect = aspect
+        self.min_confidence = min_confidence
+        self.mean = mean
+        self.std = std
+        self.layers = layers  # [(weights, bias), ...], ReLU between layers
+        # Fold the feature standardization into the first layer
+        weights, bias = layers[0]
+        self.first_layer = (weights / std[:, None], bias - (mean / std) @ weights)
+    
+    @classmethod
+    def features(cls, points, aspect=16 / 9):
+        """(N, 21, 3) landmarks from frames of the given width / height
+        to (N, 71) normalized features"""
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 21, 3)
+        relative = (points - points[:, :1]) * np.float32([aspect, 1, aspect])
+        
+        # Wrist to middle finger knuckle sets the scale and the "up" direction;
+        # one matrix per hand rotates that to straight up and scales it to 1
+        palm = relative[:, 9, :2]
+        length = np.maximum(np.hypot(palm[:, 0], palm[:, 1]), 1e-6)
+        sin = palm[:, 0] / length
+        cos = -palm[:, 1] / length
+        transform = np.zeros((len(points), 3, 3), dtype=np.float32)
+        transform[:, 0, 0] = transform[:, 1, 1] = cos / length
+        transform[:, 1, 0] = sin / length
+        transform[:, 0, 1] = -sin / length
+        transform[:, 2, 2] = 1 / length
+        normalized = relative @ transform
+        
+        # Mirror left hands onto right hands; the side is kept as a feature
+        x, y = normalized[:, :, 0], normalized[:, :, 1]
+        chirality = np.copysign(np.float32(1), x[:, 5] * y[:, 17] - y[:, 5] * x[:, 17])
+        x *= chirality[:, None]
+        
+        # Written in place: x, y and z of all landmarks, fingertip
+        # distances from the wrist, then the orientation
+        features = np.empty((len(points), 71), dtype=np.float32)
+        np.copyto(features[:, :63].reshape(-1, 3, 21), normalized.transpose(0, 2, 1))
+        np.hypot(x[:, cls.tips], y[:, cls.tips], out=features[:, 63:68])
+        features[:, 68] = sin
+        features[:, 69] = cos
+        features[:, 70] = chirality
+        return features
+    
+    def probabilities(self, points):
+        weights, bias = self.first_layer
+        hidden = np.maximum(self.features(points, self.aspect) @ weights + bias, 0)
+        for weights, bias in self.layers[1:-1]:
+            hidden = np.maximum(hidden @ weights + bias, 0)
+        weights, bias = self.layers[-1]
+        logits = hidden @ weights + bias
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+    
+    def classify_batch(self, points):
+        """Classify (N, 21, 3) landmarks, returning (gestures, confidences)"""
+        probabilities = self.probabilities(points)
+        best = probabilities.argmax(axis=1)
+        confidences = probabilities[np.arange(len(best)), best]
+        # An unsure frame is no gesture, not the likeliest throw
+        return np.where(confidences < self.min_confidence, "none", self.gestures[best]), confidences
+    
+    def classify(self, points):
+        """Classify a single (21, 3) landmark array"""
+        gestures, confidences = self.classify_batch(points)
+        return str(gestures[0]), float(confidences[0])
+    
+    @classmethod
+    def train(cls, points, labels, aspect=16 / 9, hidden=32, epochs=400, learning_rate=0.01,
+              weight_decay=1e-4, seed=0):
+        """Fit on (N, 21, 3) landmarks and their gesture names with full-batch Adam
+        
+        aspect is the width / height of the frames the landmarks came from.
+        """
+        gestures = [str(name) for name in GestureClassifier.gestures if name in set(labels)]
+        index = {name: i for i, name in enumerate(gestures)}
+        targets = np.array([index[label] for label in labels])
+        features = cls.features(points, aspect)
+        mean = features.mean(axis=0)
+        std = features.std(axis=0) + 1e-6
+        inputs = (features - mean) / std
+        
+        rng = np.random.default_rng(seed)
+        sizes = [inputs.shape[1], hidden, len(gestures)]
+        params = []
+        for fan_in, fan_out in zip(sizes[:-1], sizes[1:]):
+            params += [rng.normal(0, np.sqrt(2 / fan_in), (fan_in, fan_out)).astype(np.float32),
+                       np.zeros(fan_out, dtype=np.float32)]
+        moments = [np.zeros_like(p) for p in params] + [np.zeros_like(p) for p in params]
+        one_hot = np.eye(len(gestures), dtype=np.float32)[targets]
+        
+        for step in range(1, epochs + 1):
+            w1, b1, w2, b2 = params
+            hidden_in = inputs @ w1 + b1
+            hidden_out = np.maximum(hidden_in, 0)
+            logits = hidden_out @ w2 + b2
+            logits -= logits.max(axis=1, keepdims=True)
+            probabilities = np.exp(logits)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            
+            # Softmax cross-entropy gradients, backpropagated by hand
+            d_logits = (probabilities - one_hot) / len(inputs)
+            d_hidden = (d_logits @ w2.T) * (hidden_in > 0)
+            grads = [inputs.T @ d_hidden + weight_decay * w1, d_hidden.sum(axis=0),
+                     hidden_out.T @ d_logits + weight_decay * w2, d_logits.sum(axis=0)]
+            for i, (param, grad) in enumerate(zip(params, grads)):
+                first, second = moments[i], moments[len(params) + i]
+                first *= 0.9
+                first += 0.1 * grad
+                second *= 0.999
+                second += 0.001 * grad * grad
+                param -= (learning_rate * (first / (1 - 0.9 ** step)) /
+                          (np.sqrt(second / (1 - 0.999 ** step)) + 1e-8))
+        
+        return cls(gestures, mean, std, [(params[0], params[1]), (params[2], params[3])], aspect)
+    
+    def save(self, path):
+        arrays = {f"layer{i}_{part}": value for i, layer in enumerate(self.layers)
+                  for part, value in zip(("weights", "bias"), layer)}
+        np.savez(path, gestures=self.gestures, mean=self.mean, std=self.std,
+                 aspect=self.aspect, **arrays)
+    
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            layers = []
+            while f"layer{len(layers)}_weights" in data:
+                i = len(layers)
+                layers.append((data[f"layer{i}_weights"], data[f"layer{i}_bias"]))
+            # Models saved before the aspect was stored were trained on 16:9
+            aspect = float(data['aspect']) if 'aspect' in data else 16 / 9
+            return cls(data['gestures'], data['mean'], data['std'], layers, aspect)
+
+
+def load_labelled_landmarks(folder):
+    """Hand frames from folder/<gesture>/*.rpsl recordings as (points, labels)
+    
+    folder/none holds hands that make no gesture, e.g. between throws.
+    """
+    points, labels = [], []
+    for gesture in GestureClassifier.gestures:
+        for path in sorted(glob.glob(os.path.join(folder, str(gesture), "*.rpsl"))):
+            records, _ = load_landmarks(path)
+            hands = records['landmarks'][records['hand'] >= 0]
+            points.append(hands)
+            labels += [str(gesture)] * len(hands)
+    if not points:
+        raise IOError(f"No labelled recordings found in: {folder}")
+    return np.concatenate(points), np.array(labels)
+
+
+class TemporalGestureFilter:
+    """Smooths per-frame gestures and times how long the result has held
+    
+    The last `window` frames sit in a ring buffer with running
+    confidence-weighted vote totals, so an update costs the same whatever
+    the window. Another gesture takes over once it leads the vote with at
+    least `enter` of the total weight; the current one is only dropped
+    early when its share falls below `exit`, so a single noisy frame
+    neither switches the gesture nor restarts its stability timer.
+    """
+    # Seconds a gesture must hold before it acts, per game state
+    stability = {
+        "menu": {"thumbs_up": 0.6, "thumbs_down": 0.6,
+                 "pointing": 0.3},  # Faster response for pointing
+        "options": {"thumbs_down": 0.5,  # Faster thumbs down in options
+                    "pointing": 0.3},
+        "play": {"rock": 0.4, "paper": 0.4,
+                 "scissors": 0.5},  # Slightly longer for scissors accuracy
+    }
+    default_stability = 0.8
+    
+    def __init__(self, gestures=GestureClassifier.gestures, window=4, enter=0.5, exit=0.25,
+                 min_weight=0.5, stability_scale=1.0):
+        self.names = [str(name) for name in gestures]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.window = window
+        self.enter = enter
+        self.exit = exit
+        self.min_weight = min_weight
+        # A more reliable classifier can act on shorter holds
+        self.required = {state: [table.get(name, self.default_stability) * stability_scale
+                                 for name in self.names]
+                         for state, table in self.stability.items()}
+        self.reset()
+    
+    def reset(self):
+        self.ring_gesture = [0] * self.window
+        self.ring_weight = [0.0] * self.window
+        self.votes = [0.0] * len(self.names)
+        self.total = 0.0
+        self.count = 0
+        self.position = 0
+        self.current = 0
+        self.since = None
+    
+    @property
+    def gesture(self):
+        return self.names[self.current]
+    
+    def update(self, gesture, confidence, timestamp):
+        """Add one frame's raw gesture and return the filtered gesture"""
+        new = self.index[gesture]
+        weight = max(confidence, self.min_weight)
+        position = self.position
+        if self.count == self.window:
+            old = self.ring_gesture[position]
+            self.votes[old] -= self.ring_weight[position]
+            self.total -= self.ring_weight[position]
+        else:
+            self.count += 1
+        self.ring_gesture[position] = new
+        self.ring_weight[position] = weight
+        self.votes[new] += weight
+        self.total += weight
+        self.position = (position + 1) % self.window
+        
+        votes = self.votes
+        current = self.current
+        leader = max(range(len(votes)), key=votes.__getitem__)
+        if leader != current and (
+                (votes[leader] > votes[current] and votes[leader] >= self.enter * self.total)
+                or votes[current] < self.exit * self.total):
+            self.current = current = leader
+            self.since = None
+        
+        if current == 0:
+            self.since = None
+        elif self.since is None:
+            self.since = timestamp
+        return self.names[current]
+    
+    def stable_time(self, timestamp):
+        """Seconds the filtered gesture has held (0 for "none")"""
+        return timestamp - self.since if self.since is not None else 0
+    
+    def required_time(self, state):
+        """Stability the filtered gesture needs in a game state"""
+        table = self.required.get(state, self.required["play"])
+        return table[self.current]
+    
+    def is_stable(self, state, timestamp):
+        return self.since is not None and self.stable_time(timestamp) > self.required_time(state)
+    
+    def restart(self):
+        """Restart the stability timer, e.g. after the gesture triggered an action"""
+        self.since = None
+    
+    def recent(self, count=3):
+        """The last raw gestures, oldest first"""
+        count = min(count, self.count)
+        return [self.names[self.ring_gesture[(self.position - count + i) % self.window]]
+                for i in range(count)]
+
+
+class GestureTimeline:
+    """Ring buffer of per-frame raw gestures stamped with capture time
+    
+    Lets a decision look back at what the camera saw around a moment,
+    rather than at whichever frame happens to be current. It holds the
+    last `seconds` of frames: room for `fps` to start with, doubled
+    whenever frames arrive faster (unpaced sources, server clients), up
+    to `max_fps` so a client stamping every frame alike stays bounded.
+    """
+    def __init__(self, seconds, fps=120, gestures=GestureClassifier.gestures, max_fps=2000):
+        self.names = [str(name) for name in gestures]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.seconds = seconds
+        self.max_capacity = int(np.ceil(seconds * max_fps)) + 1
+        capacity = min(int(np.ceil(seconds * fps)) + 1, self.max_capacity)
+        self.times = np.full(capacity, -np.inf)
+        self.gestures = np.zeros(capacity, dtype=np.int8)
+        self.confidences = np.zeros(capacity, dtype=np.float32)
+        self.position = 0
+    
+    def grow(self):
+        """Double the capacity, keeping the frames oldest first"""
+        capacity = min(2 * len(self.times), self.max_capacity)
+        order = np.roll(np.arange(len(self.times)), -self.position)
+        for name, empty in (('times', -np.inf), ('gestures', 0), ('confidences', 0)):
+            old = getattr(self, name)
+            new = np.full(capacity, empty, dtype=old.dtype)
+            new[:len(old)] = old[order]
+            setattr(self, name, new)
+        self.position = len(order)
+    
+    def add(self, timestamp, gesture, confidence):
+        position = self.position
+        # Overwriting a frame still inside the window means frames come faster than planned
+        if (timestamp - self.seconds <= self.times[position] <= timestamp and
+                len(self.times) < self.max_capacity):
+            self.grow()
+            position = self.position
+        self.times[position] = timestamp
+        self.gestures[position] = self.index[gesture]
+        self.confidences[position] = confidence
+        self.position = (position + 1) % len(self.times)
+    
+    def resolve(self, start, end, choices):
+        """Confidence-weighted vote among `choices` over frames captured in
+        [start, end]; returns (gesture, share of the vote, frames) or None"""
+        frames = (self.times >= start) & (self.times <= end)
+        if not frames.any():
+            return None
+        votes = np.bincount(self.gestures[frames], weights=self.confidences[frames],
+                            minlength=len(self.names))
+        candidates = [self.index[name] for name in choices]
+        best = max(candidates, key=votes.__getitem__)
+        if votes[best] <= 0:
+            return None
+        return self.names[best], float(votes[best] / votes[candidates].sum()), int(frames.sum())
+
+
+# One fixed-size record per processed frame. hand is -1 when no hand was
+# detected, otherwise 0 for a "Left" and 1 for a "Right" MediaPipe label.
+# age is how long before `time` the frame was captured; it took over part
+# of the padding, so older recordings read back with an age of 0.
+LANDMARK_RECORD = np.dtype([
+    ('time', '<f8'),
+    ('landmarks', '<f4', (21, 3)),
+    ('hand', 'i1'),
+    ('pad', 'V3'),
+    ('age', '<f4'),
+])
+LANDMARK_MAGIC = b'RPSLMK02'
+LANDMARK_MAGIC_V1 = b'RPSLMK01'  # no settings after the magic and seed
+LANDMARK_HEADER = np.dtype([('magic', 'S8'), ('seed', '<u8'), ('settings', '<u8')])
+
+
+def fill_landmark_record(record, timestamp, points, handedness, age):
+    """Write one frame into a LANDMARK_RECORD entry; points is a (21, 3)
+    array or None for no hand"""
+    record['time'] = timestamp
+    record['age'] = age
+    if points is None:
+        record['landmarks'] = 0
+        record['hand'] = -1
+    else:
+        record['landmarks'] = points
+        record['hand'] = 1 if handedness == "Right" else 0
+
+
+class LandmarkRecorder:
+    """Append per-frame hand landmarks to a memory-mappable recording
+    
+    The file is a 24 byte header (magic, the game's random seed and the
+    size of the settings), the game settings as JSON, then LANDMARK_RECORD
+    entries, written in chunks so recording costs no more than a memcpy
+    per frame.
+    """
+    def __init__(self, path, seed=0, chunk_size=64, settings=None):
+        self.path = path
+        # Recordings are often sorted into folders, e.g. data/rock/take1.rpsl
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.file = open(path, 'wb')
+        # Padded with spaces so the records stay 8 byte aligned
+        blob = json.dumps(settings or {}, sort_keys=True).encode()
+        blob += b' ' * (-len(blob) % 8)
+        header = np.array([(LANDMARK_MAGIC, seed, len(blob))], dtype=LANDMARK_HEADER)
+        self.file.write(header.tobytes() + blob)
+        self.chunk = np.zeros(chunk_size, dtype=LANDMARK_RECORD)
+        self.pending = 0
+        self.count = 0
+    
+    def write(self, timestamp, points=None, handedness=None, age=0.0):
+        """Record one frame captured `age` seconds before `timestamp`;
+        points is a (21, 3) array or None for no hand"""
+        fill_landmark_record(self.chunk[self.pending], timestamp, points, handedness, age)
+        self.pending += 1
+        self.count += 1
+        if self.pending == len(self.chunk):
+            self.flush()
+    
+    def flush(self):
+        self.file.write(self.chunk[:self.pending].tobytes())
+        self.file.flush()
+        self.pending = 0
+    
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+
+
+class SharedLandmarkRing:
+    """LANDMARK_RECORD entries in shared memory, one writer and one reader
+    
+    Has the LandmarkRecorder write/close interface, so a game can stream
+    its landmarks to another process without pickling. The writer never
+    waits; a reader that falls more than `capacity` records behind loses
+    the oldest ones and counts them as dropped.
+    """
+    def __init__(self, capacity=1024, name=None):
+        create = name is None
+        size = 16 + capacity * LANDMARK_RECORD.itemsize
+        self.memory = shared_memory.SharedMemory(name=name, create=create,
+                                                 size=size if create else 0)
+        self.capacity = capacity
+        # [records written, writer closed]
+        self.counters = np.ndarray(2, dtype=np.int64, buffer=self.memory.buf)
+        self.records = np.ndarray(capacity, dtype=LANDMARK_RECORD, buffer=self.memory.buf,
+                                  offset=16)
+        if create:
+            self.counters[:] = 0
+        self.read_count = 0
+        self.dropped = 0
+    
+    def spec(self):
+        return self.capacity, self.memory.name
+    
+    @classmethod
+    def attach(cls, spec):
+        capacity, name = spec
+        return cls(capacity, name)
+    
+    def write(self, timestamp, points=None, handedness=None, age=0.0):
+        """Publish one frame; points is a (21, 3) array or None for no hand"""
+        written = int(self.counters[0])
+        fill_landmark_record(self.records[written % self.capacity], timestamp, points,
+                             handedness, age)
+        self.counters[0] = written + 1
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.counters[1] = 1
+    
+    @property
+    def closed(self):
+        return bool(self.counters[1])
+    
+    def drain(self):
+        """Copy out every record written since the last drain"""
+        written = int(self.counters[0])
+        first = max(self.read_count, written - self.capacity)
+        indices = np.arange(first, written) % self.capacity
+        records = self.records[indices]
+        # Records the writer may have overwritten while we copied are dropped
+        safe = max(first, int(self.counters[0]) - self.capacity)
+        self.dropped += safe - self.read_count
+        self.read_count = written
+        return records[safe - first:]
+    
+    def release(self, unlink=False):
+        del self.counters, self.records
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+
+def read_landmark_header(path):
+    """(seed, settings, offset of the first record) of a landmark recording"""
+    with open(path, 'rb') as f:
+        head = f.read(LANDMARK_HEADER.itemsize)
+        if head[:8] == LANDMARK_MAGIC_V1 and len(head) >= 16:
+            return int.from_bytes(head[8:16], 'little'), {}, 16
+        if head[:8] != LANDMARK_MAGIC or len(head) < LANDMARK_HEADER.itemsize:
+            raise ValueError(f"Not a landmark recording: {path}")
+        header = np.frombuffer(head, dtype=LANDMARK_HEADER)[0]
+        size = int(header['settings'])
+        settings = json.loads(f.read(size))
+    return int(header['seed']), settings, LANDMARK_HEADER.itemsize + size
+
+
+def load_landmarks(path):
+    """Memory-map a landmark recording, returning (records, seed)"""
+    seed, _, offset = read_landmark_header(path)
+    
+    # Ignore a partially written trailing record, e.g. after a crash
+    count = (os.path.getsize(path) - offset) // LANDMARK_RECORD.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=LANDMARK_RECORD), seed
+    records = np.memmap(path, dtype=LANDMARK_RECORD, mode='r', offset=offset, shape=(count,))
+    return records, seed
+
+
+class SharedFrameRing:
+    """Frame slots in shared memory between one producer and one consumer
+    
+    The producer decodes straight into a free slot and the consumer reads
+    it in place, so frames cross the process boundary without pickling.
+    `free` and `filled` semaphores count empty and written slots, so
+    neither side polls.
+    """
+    def __init__(self, shape, slots=4, name=None, free=None, filled=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        create = name is None
+        size = 24 + slots * int(np.prod(self.shape))
+        self.memory = shared_memory.SharedMemory(name=name, create=create,
+                                                 size=size if create else 0)
+        # [frames written, frames read, stream closed]
+        self.counters = np.ndarray(3, dtype=np.int64, buffer=self.memory.buf)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8,
+                                 buffer=self.memory.buf, offset=24)
+        if create:
+            self.counters[:] = 0
+        self.free = free if free is not None else multiprocessing.Semaphore(slots)
+        self.filled = filled if filled is not None else multiprocessing.Semaphore(0)
+    
+    def spec(self):
+        """Arguments to re-attach in a child process"""
+        return self.shape, self.slots, self.memory.name, self.free, self.filled
+    
+    @classmethod
+    def attach(cls, spec):
+        return cls(*spec)
+    
+    def reserve(self, timeout=None):
+        """Next free slot to write into, or None if none frees up in time"""
+        if not self.free.acquire(timeout=timeout):
+            return None
+        return self.frames[self.counters[0] % self.slots]
+    
+    def commit(self):
+        """Publish the reserved slot"""
+        self.counters[0] += 1
+        self.filled.release()
+    
+    def close_stream(self):
+        self.counters[2] = 1
+        self.filled.release()
+    
+    def acquire(self, timeout=None):
+        """Oldest unread frame, None at the end of the stream, False on timeout"""
+        if not self.filled.acquire(timeout=timeout):
+            return False
+        if self.counters[1] == self.counters[0]:
+            return None  # woken by close_stream
+        return self.frames[self.counters[1] % self.slots]
+    
+    def release_slot(self):
+        """Hand the acquired slot back to the producer"""
+        self.counters[1] += 1
+        self.free.release()
+    
+    def release(self, unlink=False):
+        del self.counters, self.frames
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+
+class VideoRecorder:
+    """Record rendered rounds to video files off the game thread
+    
+    write() copies the frame into one of queue_size preallocated buffers
+    and a worker thread encodes it (OpenCV releases the GIL while
+    encoding). When every buffer is still waiting for the encoder the new
+    frame is dropped and counted, so a slow encoder or disk costs frames
+    in the recording, never game FPS. follow(state) rotates segments with
+    the game: a file per round, opened when the countdown starts and
+    closed once the result screen is left. background=False encodes
+    inline on the calling thread, for comparison.
+    """
+    round_states = ("countdown", "battle", "result")
+    
+    def __init__(self, directory, fps=30, codec="MJPG", queue_size=8, background=True):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fps = fps
+        self.fourcc = cv2.VideoWriter_fourcc(*codec)
+        self.queue_size = queue_size
+        self.pending = queue.Queue()
+        self.free = queue.Queue()
+        self.shape = None
+        self.state = None
+        self.recording = False
+        self.segments = 0
+        self.written = 0
+        self.stats = StageStats("encode")
+        # Worker side: the open segment
+        self.path = None
+        self.writer = None
+        self.worker = None
+        if background:
+            self.worker = threading.Thread(target=self.encode, name="video", daemon=True)
+            self.worker.start()
+    
+    def follow(self, state):
+        """Rotate segments on the game's state transitions"""
+        previous, self.state = self.state, state
+        if state == previous:
+            return
+        if state == "countdown":
+            if self.recording:
+                self.send("close")
+            self.segments += 1
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            self.send("open", os.path.join(self.directory,
+                                           f"round-{stamp}-{self.segments:03d}.avi"))
+            self.recording = True
+        elif self.recording and state not in self.round_states:
+            self.send("close")
+            self.recording = False
+    
+    def write(self, frame):
+        """Queue a rendered frame of the current segment, if one is open"""
+        if not self.recording:
+            return
+        if self.worker is None:
+            self.handle("frame", frame)
+            return
+        if self.shape is None:
+            self.shape = frame.shape
+            for _ in range(self.queue_size):
+                self.free.put(np.empty(frame.shape, dtype=np.uint8))
+        if frame.shape != self.shape:
+            self.stats.dropped += 1
+            return
+        try:
+            buffer = self.free.get_nowait()
+        except queue.Empty:
+            self.stats.dropped += 1
+            return
+        np.copyto(buffer, frame)
+        self.pending.put(("frame", buffer))
+    
+    def send(self, kind, item=None):
+        if self.worker is None:
+            self.handle(kind, item)
+        else:
+            self.pending.put((kind, item))
+    
+    def handle(self, kind, item):
+        """Apply one open/frame/close message on the encoding side"""
+        if kind == "open":
+            self.path = item
+        elif kind == "frame":
+            if self.writer is None and self.path is not None:
+                h, w = item.shape[:2]
+                self.writer = cv2.VideoWriter(self.path, self.fourcc, self.fps, (w, h))
+                if not self.writer.isOpened():
+                    print(f"⚠️ Cannot record video to {self.path}")
+                    self.writer, self.path = None, None
+            if self.writer is not None:
+                start = time.perf_counter()
+                self.writer.write(item)
+                self.stats.record(time.perf_counter() - start, self.pending.qsize())
+                self.written += 1
+        elif self.writer is not None:
+            self.writer.release()
+            self.writer, self.path = None, None
+    
+    def encode(self):
+        while True:
+            kind, item = self.pending.get()
+            if kind == "stop":
+                break
+            self.handle(kind, item)
+            if kind == "frame":
+                self.free.put(item)
+    
+    def close(self):
+        """Finish the open segment and wait for queued frames to be encoded"""
+        if self.recording:
+            self.send("close")
+            self.recording = False
+        if self.worker is not None:
+            self.pending.put(("stop", None))
+            self.worker.join()
+            self.worker = None
+        self.handle("close", None)
+    
+    def summary(self):
+        return (f"video      segments={self.segments} written={self.written} "
+                f"dropped={self.stats.dropped} in {self.directory}\n   " + self.stats.summary())
+
+
+ROUND_RESULTS = {"YOU WIN!": "win", "YOU LOSE!": "lose", "TIE!": "tie"}
+ROUND_COUNTERS = {"win": "player_wins", "lose": "ai_wins", "tie": "ties"}
+
+
+class GameLog:
+    """Append-only per-round log with periodically compacted statistics
+    
+    Rounds are written as JSON lines by a background thread that batches
+    them and fsyncs each batch, so append() never touches the disk. Every
+    `compact_every` rounds the counters are written to `path` through a
+    temporary file and os.replace, together with the log generation and
+    byte offset they cover; loading reads that snapshot plus only the tail
+    of the log after it. Once a log grows past `max_log_bytes` the next
+    snapshot moves on to a new generation, keeping `keep_logs` old ones.
+    """
+    counters = ("player_wins", "ai_wins", "ties", "total_games")
+    
+    def __init__(self, path='rps_stats.json', log_prefix='rps_rounds', batch_delay=0.25,
+                 compact_every=50, max_log_bytes=1 << 20, keep_logs=2):
+        self.path = path
+        self.log_prefix = log_prefix
+        self.batch_delay = batch_delay
+        self.compact_every = compact_every
+        self.max_log_bytes = max_log_bytes
+        self.keep_logs = keep_logs
+        self.stats = dict.fromkeys(self.counters, 0)
+        self.generation = 0
+        self.offset = 0
+        self.uncompacted = 0
+        self.events = queue.Queue()
+        self.writer = None
+        self.file = None
+        self.errors = 0
+        self.skipped = 0  # unreadable log lines
+    
+    def log_path(self, generation):
+        return f"{self.log_prefix}.{generation}.jsonl"
+    
+    def load(self):
+        """Rebuild the counters from the snapshot and the log tail after it
+        
+        Without a readable snapshot, every log generation still on disk is
+        replayed from its start; a corrupt snapshot is moved aside first.
+        """
+        data = self.read_snapshot()
+        if data is None:
+            generations = self.generations()
+            for generation in generations[:-1]:
+                self.replay(generation)
+            self.generation = generations[-1] if generations else 0
+            self.offset = 0
+        else:
+            for name in self.counters:
+                self.stats[name] = data.get(name, 0)
+            self.generation = data.get('log_generation', 0)
+            self.offset = data.get('log_offset', 0)
+        
+        self.uncompacted, self.offset = self.replay(self.generation, self.offset)
+        if data is None:
+            self.uncompacted = self.stats['total_games']
+        if self.skipped:
+            print(f"⚠️ Skipped {self.skipped} unreadable lines in the game log")
+        return dict(self.stats)
+    
+    def read_snapshot(self):
+        """The snapshot as a dict, or None if there is no readable one"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("not a JSON object")
+            return data
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Unreadable statistics snapshot {self.path} ({e}), "
+                  f"rebuilding from the game log")
+            try:
+                os.replace(self.path, self.path + ".corrupt")
+            except OSError:
+                pass
+            return None
+    
+    def generations(self):
+        """Log generations on disk, oldest first"""
+        found = []
+        for path in glob.glob(glob.escape(self.log_prefix) + ".*.jsonl"):
+            number = path[len(self.log_prefix) + 1:-len(".jsonl")]
+            if number.isdigit():
+                found.append(int(number))
+        return sorted(found)
+    
+    def replay(self, generation, offset=0):
+        """Count the rounds logged in one generation from a byte offset on
+        
+        Returns (rounds counted, log size). Lines that do not parse are
+        skipped and counted in `skipped`.
+        """
+        log_path = self.log_path(generation)
+        if not os.path.exists(log_path):
+            return 0, 0
+        with open(log_path, 'rb+') as f:
+            f.seek(offset)
+            tail = f.read()
+            # A crash mid-write can leave a partial last line; drop it so
+            # later appends start on a fresh line
+            complete = tail.rfind(b'\n') + 1
+            if complete < len(tail):
+                f.truncate(offset + complete)
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+        rounds = 0
+        for line in tail[:complete].splitlines():
+            try:
+                self.count(json.loads(line))
+                rounds += 1
+            except (ValueError, KeyError, TypeError):
+                self.skipped += 1
+        return rounds, size
+    
+    def count(self, event):
+        self.stats[ROUND_COUNTERS[event['result']]] += 1
+        self.stats['total_games'] += 1
+    
+    def append(self, event):
+        """Queue one round for the writer thread; never blocks"""
+        if self.writer is None:
+            self.writer = threading.Thread(target=self.write_loop, name="game-log", daemon=True)
+            self.writer.start()
+        self.events.put_nowait(event)
+    
+    def write_loop(self):
+        while True:
+            event = self.events.get()
+            batch = [event]
+            # Collect whatever else arrives shortly after, then write once
+            deadline = time.perf_counter() + self.batch_delay
+            while event is not None:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    event = self.events.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(event)
+            
+            done = batch[-1] is None
+            events = [event for event in batch if event is not None]
+            try:
+                if events:
+                    self.write_batch(events)
+                if done or self.uncompacted >= self.compact_every:
+                    self.compact()
+            except OSError as e:
+                self.errors += 1
+                print(f"⚠️ Could not write game log: {e}")
+            if done:
+                if self.file is not None:
+                    self.file.close()
+                    self.file = None
+                return
+    
+    def write_batch(self, events):
+        if self.file is None:
+            self.file = open(self.log_path(self.generation), 'ab')
+        data = b"".join(json.dumps(event).encode() + b"\n" for event in events)
+        start = self.file.tell()
+        try:
+            self.file.write(data)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        except OSError:
+            self.rollback(start)
+            raise
+        for event in events:
+            self.count(event)
+        self.offset = self.file.tell()
+        self.uncompacted += len(events)
+    
+    def rollback(self, offset):
+        """Cut a partly written batch off the log, so the snapshot offset
+        always matches what is in the file"""
+        try:
+            self.file.close()
+        except OSError:
+            pass  # the buffered rest of the batch cannot be written either
+        self.file = None
+        log_path = self.log_path(self.generation)
+        try:
+            os.truncate(log_path, offset)
+        except OSError:
+            pass
+        self.offset = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+    
+    def compact(self):
+        """Atomically replace the snapshot with the current counters"""
+        generation, offset = self.generation, self.offset
+        rotate = offset >= self.max_log_bytes
+        if rotate:
+            generation, offset = generation + 1, 0
+        
+        data = dict(self.stats, log_generation=generation, log_offset=offset)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self.uncompacted = 0
+        
+        if rotate:
+            # The snapshot already covers the old log, so it is only history now
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.generation, self.offset = generation, offset
+            stale = self.log_path(generation - 1 - self.keep_logs)
+            if os.path.exists(stale):
+                os.remove(stale)
+    
+    def close(self):
+        """Write outstanding rounds and a final snapshot"""
+        if self.writer is None:
+            return
+        self.events.put(None)
+        self.writer.join()
+        self.writer = None
+
+
+def gesture_sequence(frames=9000, fps=30, noise=0.1, seed=0):
+    """Synthetic (times, gestures, confidences, true gestures) for filter tests
+    
+    Held gestures of 0.5-2s with a `noise` share of single frames
+    misread as another gesture at lower confidence.
+    """
+    rng = np.random.default_rng(seed)
+    names = GestureClassifier.gestures
+    truth = []
+    while len(truth) < frames:
+        truth += [names[rng.integers(len(names))]] * int(rng.integers(fps // 2, 2 * fps))
+    truth = np.array(truth[:frames])
+    gestures = truth.copy()
+    confidences = np.full(frames, 0.92)
+    flicker = rng.random(frames) < noise
+    gestures[flicker] = names[rng.integers(len(names), size=flicker.sum())]
+    confidences[flicker] = 0.6
+    return np.arange(frames) / fps, gestures, confidences, truth
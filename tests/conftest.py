@@ -0,0 +1,27 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tests import rps_core from the repository root
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def rps():
+    """The game script, loaded from its path since the file name has spaces"""
+    spec = importlib.util.spec_from_file_location(
+        "rps_game", os.path.join(ROOT, "Rock paper scissor.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def game(rps):
+    """A game without hand tracking or saved data, on a VirtualClock"""
+    return rps.RockPaperScissorsWorld(enable_hands=False, persist=False, seed=0,
+                                      clock=rps.VirtualClock())
@@ -0,0 +1,11 @@
+def test_frame_limit_counts_grabbed_frames(rps):
+    source = rps.FrameLimit(rps.SyntheticSource(frames=None, width=64, height=36), 5)
+    assert source.read()[0]
+    assert source.grab()
+    assert source.grab()
+    assert source.read()[0]
+    assert source.grab()
+    # Five frames read or skipped, whichever way
+    assert not source.grab()
+    assert not source.read()[0]
+    assert source.source.index == 5
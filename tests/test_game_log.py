@@ -0,0 +1,139 @@
+import json
+import os
+
+import pytest
+
+from rps_core import GameLog
+
+RESULTS = ["win", "lose", "tie", "win", "win"]
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "stats.json"), str(tmp_path / "rounds")
+
+
+def open_log(paths, **options):
+    log = GameLog(*paths, batch_delay=0.0, **options)
+    log.load()
+    return log
+
+
+def rounds(count, start=0):
+    return [{"round": start + i, "result": RESULTS[(start + i) % len(RESULTS)]}
+            for i in range(count)]
+
+
+def expected(count):
+    results = [RESULTS[i % len(RESULTS)] for i in range(count)]
+    return {"player_wins": results.count("win"), "ai_wins": results.count("lose"),
+            "ties": results.count("tie"), "total_games": count}
+
+
+def play(log, count, start=0):
+    for event in rounds(count, start):
+        log.append(event)
+    log.close()
+
+
+def test_counts_survive_a_restart(paths):
+    play(open_log(paths, compact_every=7), 30)
+    assert open_log(paths).stats == expected(30)
+
+
+def test_crash_before_compaction_is_recovered_from_the_log(paths):
+    log = open_log(paths, compact_every=10)
+    play(log, 12)
+    # Rounds written without a later snapshot, as if the game had crashed
+    crashed = open_log(paths)
+    crashed.write_batch(rounds(5, start=12))
+    crashed.file.close()
+    
+    log = open_log(paths)
+    assert log.stats == expected(17)
+    assert log.offset == os.path.getsize(log.log_path(0))
+
+
+def test_truncated_last_line_is_dropped(paths):
+    play(open_log(paths), 8)
+    log_path = GameLog(*paths).log_path(0)
+    with open(log_path, 'ab') as f:
+        f.write(b'{"round": 8, "res')
+    
+    log = open_log(paths)
+    assert log.stats == expected(8)
+    with open(log_path, 'rb') as f:
+        assert f.read().endswith(b"}\n")
+    
+    play(log, 4, start=8)
+    assert open_log(paths).stats == expected(12)
+
+
+def test_corrupt_snapshot_is_rebuilt_from_every_generation(paths):
+    stats_path, _ = paths
+    play(open_log(paths, compact_every=5, max_log_bytes=200, keep_logs=10), 40)
+    log = GameLog(*paths)
+    assert len(log.generations()) > 1
+    with open(stats_path, 'w') as f:
+        f.write('{"player_wins": 3, "tot')
+    
+    log = open_log(paths)
+    assert log.stats == expected(40)
+    assert os.path.exists(stats_path + ".corrupt")
+    
+    # The next snapshot matches the log again, so later starts stay correct
+    play(log, 6, start=40)
+    with open(stats_path) as f:
+        snapshot = json.load(f)
+    assert snapshot['log_offset'] == os.path.getsize(log.log_path(snapshot['log_generation']))
+    assert open_log(paths).stats == expected(46)
+    assert open_log(paths).stats == expected(46)
+
+
+def test_bad_line_in_the_middle_is_skipped(paths):
+    play(open_log(paths, compact_every=1000), 5)
+    log_path = GameLog(*paths).log_path(0)
+    with open(log_path, 'ab') as f:
+        f.write(b'not json\n')
+    # Later rounds still go after the bad line
+    crashed = open_log(paths)
+    crashed.write_batch(rounds(3, start=5))
+    crashed.file.close()
+    os.remove(paths[0])
+    
+    log = open_log(paths)
+    assert log.stats == expected(8)
+    assert log.skipped == 1
+    assert log.offset == os.path.getsize(log_path)
+    
+    play(log, 2, start=8)
+    assert open_log(paths).stats == expected(10)
+
+
+class FailingFile:
+    """Log file that writes part of the data, then runs out of space"""
+    def __init__(self, file):
+        self.file = file
+    
+    def write(self, data):
+        self.file.write(data[:len(data) // 2])
+        self.file.flush()
+        raise OSError(28, "No space left on device")
+    
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+def test_partial_batch_is_rolled_back(paths):
+    log = open_log(paths)
+    log.write_batch(rounds(3))
+    log.file = FailingFile(log.file)
+    with pytest.raises(OSError):
+        log.write_batch(rounds(4, start=3))
+    
+    assert log.stats == expected(3)
+    assert log.offset == os.path.getsize(log.log_path(0))
+    log.write_batch(rounds(2, start=3))
+    log.compact()
+    log.file.close()
+    assert open_log(paths).stats == expected(5)
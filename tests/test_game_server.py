@@ -0,0 +1,108 @@
+import asyncio
+import math
+
+import numpy as np
+import pytest
+
+from rps_core import LANDMARK_RECORD
+
+
+def exchange(rps, frames):
+    """Send frames to a fresh GameServer session one at a time, like
+    LoadGenerator, and return the server and the replies received until
+    the session closed"""
+    server = rps.GameServer(seed=0)
+    replies = []
+    
+    async def session():
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            try:
+                for frame in frames:
+                    writer.write(frame)
+                    reply = await asyncio.wait_for(reader.readexactly(rps.SESSION_REPLY.size), 5)
+                    replies.append(rps.SESSION_REPLY.unpack(reply))
+                writer.write_eof()
+                assert await asyncio.wait_for(reader.read(), 5) == b""
+            except (asyncio.IncompleteReadError, ConnectionError):
+                pass  # the server ended the session
+            finally:
+                writer.close()
+            # Let the session's handler finish closing
+            while server.active:
+                await asyncio.sleep(0.01)
+    
+    asyncio.run(session())
+    return server, replies
+
+
+def gesture(rps, timestamp, name="none", confidence=0.0, age=0.0):
+    index = [str(g) for g in rps.GestureClassifier.gestures].index(name)
+    return b"G" + rps.GESTURE_FRAME.pack(timestamp, index, confidence, age)
+
+
+def landmarks(timestamp, points=None, age=0.0):
+    record = np.zeros(1, dtype=LANDMARK_RECORD)
+    record['time'] = timestamp
+    record['hand'] = -1 if points is None else 0
+    if points is not None:
+        record['landmarks'] = points
+    record['age'] = age
+    return b"L" + record.tobytes()
+
+
+def test_valid_frames_are_answered_in_order(rps):
+    frames = [gesture(rps, i / 30) for i in range(5)] + [landmarks(5 / 30)]
+    server, replies = exchange(rps, frames)
+    
+    assert [reply[0] for reply in replies] == pytest.approx([i / 30 for i in range(6)])
+    assert all(rps.SESSION_STATES[reply[1]] == "menu" for reply in replies)
+    assert server.rejected == 0
+    assert server.active == 0
+
+
+@pytest.mark.parametrize("bad", [
+    lambda rps: b"G" + rps.GESTURE_FRAME.pack(math.nan, 0, 0.5, 0.0),
+    lambda rps: b"G" + rps.GESTURE_FRAME.pack(1.0, 255, 0.5, 0.0),
+    lambda rps: b"G" + rps.GESTURE_FRAME.pack(1.0, 0, 1.5, 0.0),
+    lambda rps: b"G" + rps.GESTURE_FRAME.pack(1.0, 0, 0.5, -0.1),
+    lambda rps: landmarks(1.0, np.full((21, 3), math.inf, dtype=np.float32)),
+    lambda rps: landmarks(1.0, age=math.nan),
+    lambda rps: b"X" + bytes(rps.GESTURE_FRAME.size),
+], ids=["nan time", "gesture index", "confidence", "negative age", "landmarks",
+        "nan age", "unknown tag"])
+def test_malformed_frames_end_the_session(rps, bad):
+    server, replies = exchange(rps, [gesture(rps, 0.0), bad(rps), gesture(rps, 0.1)])
+    
+    assert len(replies) == 1  # nothing after the malformed frame is played
+    assert server.rejected == 1
+    assert server.active == 0
+
+
+def test_oversized_frames_end_the_session(rps):
+    # The surplus bytes are read as the next frame's tag
+    oversized = gesture(rps, 0.1) + b"\x00" * 16
+    server, replies = exchange(rps, [gesture(rps, 0.0), oversized, gesture(rps, 0.2)])
+    
+    assert len(replies) == 2
+    assert server.rejected == 1
+
+
+def test_truncated_frames_are_not_played(rps):
+    # The client hangs up halfway through its second frame
+    server, replies = exchange(rps, [gesture(rps, 0.0) + gesture(rps, 0.1)[:-3]])
+    
+    assert len(replies) == 1
+    assert server.rejected == 0
+
+
+def test_the_final_reply_arrives_before_the_game_exits(rps):
+    frames = [gesture(rps, i / 30, "thumbs_down", 0.95) for i in range(120)]
+    server, replies = exchange(rps, frames)
+    
+    # The session stops at the exit, and its last frame is still answered
+    assert len(replies) < len(frames)
+    assert replies[-1][2] == [str(g) for g in rps.GestureClassifier.gestures].index("thumbs_down")
+    assert server.rejected == 0
@@ -0,0 +1,66 @@
+import numpy as np
+
+from rps_core import GestureClassifier
+
+
+def legacy_detect_gesture(points):
+    """The original per-landmark detect_gesture rules, on a (21, 3) array"""
+    x, y = points[:, 0].tolist(), points[:, 1].tolist()
+    
+    if x[4] > x[0]:  # Right hand
+        thumb_open = x[4] > x[3] + 0.03
+    else:
+        thumb_open = x[4] < x[3] - 0.03
+    fingers = [thumb_open, y[8] < y[6] - 0.03, y[12] < y[10] - 0.03,
+               y[16] < y[14] - 0.03, y[20] < y[18] - 0.03]
+    finger_count = sum(fingers)
+    other_fingers_closed = not any(fingers[1:4])
+    
+    if y[4] < y[3] - 0.06 and y[4] < y[2] - 0.08 and other_fingers_closed:
+        return "thumbs_up", 0.95
+    if (y[4] > y[3] + 0.04 and y[4] > y[2] + 0.06 and y[4] > y[0] + 0.05
+            and other_fingers_closed):
+        return "thumbs_down", 0.95
+    if fingers[1] and not fingers[0] and not fingers[2] and not fingers[3] and not fingers[4]:
+        return "pointing", 0.95
+    
+    scissors_pattern = (fingers[1] and fingers[2] and
+                        not fingers[0] and not fingers[3] and not fingers[4])
+    separated = abs(x[8] - x[12]) > 0.08
+    both_high = y[8] < y[5] - 0.05 and y[12] < y[9] - 0.05
+    if scissors_pattern and separated and both_high:
+        return "scissors", 0.92
+    if finger_count == 0 or (finger_count == 1 and fingers[0]):
+        return "rock", 0.9
+    if finger_count >= 4:
+        return "paper", 0.9
+    if finger_count == 2:
+        if fingers[1] and fingers[2]:
+            return "scissors", 0.7
+        return "rock", 0.6
+    if finger_count == 3:
+        return "paper", 0.6
+    return "none", 0.3
+
+
+def random_hands(count, seed=0):
+    # Landmarks close together, so every rule threshold is crossed often
+    rng = np.random.default_rng(seed)
+    return (0.5 + rng.normal(0, 0.06, (count, 21, 3))).astype(np.float32)
+
+
+def test_batch_matches_legacy_rules():
+    points = random_hands(20000)
+    gestures, confidences = GestureClassifier().classify_batch(points)
+    expected = [legacy_detect_gesture(p) for p in points]
+    
+    assert gestures.tolist() == [gesture for gesture, _ in expected]
+    assert confidences.tolist() == [confidence for _, confidence in expected]
+    # Every gesture the rules can produce was exercised
+    assert set(gestures.tolist()) == set(GestureClassifier.gestures.tolist())
+
+
+def test_single_frame_matches_batch():
+    classifier = GestureClassifier()
+    for points in random_hands(200, seed=1):
+        assert classifier.classify(points) == legacy_detect_gesture(points)
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from rps_core import TemporalGestureFilter, gesture_sequence
+
+
+def feed(gesture_filter, gestures, start=0.0, fps=30, confidence=0.9):
+    """Update with one gesture per frame; returns the filtered gestures"""
+    return [gesture_filter.update(gesture, confidence, start + i / fps)
+            for i, gesture in enumerate(gestures)]
+
+
+def test_single_misread_frame_is_ignored():
+    gesture_filter = TemporalGestureFilter()
+    feed(gesture_filter, ["rock"] * 4)
+    since = gesture_filter.since
+    
+    assert gesture_filter.update("paper", 0.6, 4 / 30) == "rock"
+    assert gesture_filter.since == since
+
+
+def test_new_gesture_needs_a_majority_of_the_window():
+    gesture_filter = TemporalGestureFilter(window=4)
+    feed(gesture_filter, ["rock"] * 4)
+    
+    # Two of four frames is a tie, which the current gesture keeps
+    assert feed(gesture_filter, ["paper"] * 3, start=1.0) == ["rock", "rock", "paper"]
+
+
+def test_leader_without_enter_share_does_not_take_over():
+    gesture_filter = TemporalGestureFilter(window=10)
+    feed(gesture_filter, ["rock"] * 10)
+    
+    # Window: 3 rock, 4 paper, 3 scissors; paper leads with 40% < enter
+    outputs = feed(gesture_filter, ["paper"] * 4 + ["scissors"] * 3, start=1.0)
+    assert outputs[-1] == "rock"
+
+
+def test_current_gesture_drops_below_exit_share():
+    gesture_filter = TemporalGestureFilter(window=4)
+    feed(gesture_filter, ["rock"] * 4)
+    
+    # Rock's share falls to 0 although no gesture reaches the enter share
+    outputs = feed(gesture_filter, ["paper", "scissors", "pointing", "thumbs_up"], start=1.0)
+    assert outputs[:3] == ["rock", "rock", "rock"]
+    assert outputs[3] == "paper"
+
+
+def test_stability_timer():
+    gesture_filter = TemporalGestureFilter()
+    feed(gesture_filter, ["rock"] * 13)  # 0 to 0.4s
+    
+    # Rock needs 0.4s in play; the timer started with the first frame
+    assert not gesture_filter.is_stable("play", 0.4)
+    assert gesture_filter.is_stable("play", 0.45)
+    assert not gesture_filter.is_stable("menu", 0.45)  # 0.8s default there
+    
+    gesture_filter.restart()
+    assert gesture_filter.stable_time(0.45) == 0
+    gesture_filter.update("rock", 0.9, 0.5)
+    assert gesture_filter.stable_time(0.6) == pytest.approx(0.1)
+
+
+def test_none_is_never_stable():
+    gesture_filter = TemporalGestureFilter()
+    feed(gesture_filter, ["none"] * 60)
+    assert gesture_filter.gesture == "none"
+    assert gesture_filter.stable_time(2.0) == 0
+    assert not gesture_filter.is_stable("play", 2.0)
+
+
+def test_stability_scale():
+    gesture_filter = TemporalGestureFilter(stability_scale=0.5)
+    feed(gesture_filter, ["rock"])
+    assert gesture_filter.required_time("play") == 0.2
+
+
+def test_recent_raw_gestures():
+    gesture_filter = TemporalGestureFilter()
+    feed(gesture_filter, ["rock", "paper", "scissors", "rock", "paper"])
+    assert gesture_filter.recent(3) == ["scissors", "rock", "paper"]
+    assert gesture_filter.recent(10) == ["paper", "scissors", "rock", "paper"]
+
+
+def test_filter_follows_held_gestures_through_flicker():
+    times, gestures, confidences, truth = gesture_sequence(frames=3000, noise=0.1)
+    gesture_filter = TemporalGestureFilter()
+    outputs = np.array([gesture_filter.update(g, c, t)
+                        for t, g, c in zip(times.tolist(), gestures.tolist(),
+                                           confidences.tolist())])
+    
+    def switches(sequence):
+        return int((sequence[1:] != sequence[:-1]).sum())
+    
+    assert switches(outputs) < switches(gestures) / 2
+    assert (outputs == truth).mean() > 0.9
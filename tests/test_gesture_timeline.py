@@ -0,0 +1,45 @@
+import pytest
+
+from rps_core import GestureTimeline
+
+
+def test_capacity_covers_the_window_at_the_frame_rate():
+    timeline = GestureTimeline(1.5, fps=30)
+    for i in range(46):
+        timeline.add(i / 30, "rock", 1.0)
+    # Every frame of the last 1.5s is still there
+    assert timeline.resolve(0.0, 1.5, ["rock", "paper", "scissors"]) == ("rock", 1.0, 46)
+    
+    timeline.add(46 / 30, "rock", 1.0)
+    assert timeline.resolve(0.0, 0.0, ["rock", "paper", "scissors"]) is None
+
+
+def test_resolve_votes_by_confidence_within_the_window():
+    timeline = GestureTimeline(1.0, fps=30)
+    timeline.add(0.0, "paper", 0.9)  # before the window
+    timeline.add(0.1, "rock", 0.6)
+    timeline.add(0.2, "scissors", 0.9)
+    timeline.add(0.3, "rock", 0.6)
+    timeline.add(0.4, "none", 1.0)
+    gesture, share, frames = timeline.resolve(0.1, 0.4, ["rock", "paper", "scissors"])
+    assert gesture == "rock"
+    assert share == pytest.approx(1.2 / 2.1)
+    assert frames == 4
+
+
+def test_faster_frames_grow_the_timeline():
+    # Sized for 30 FPS, fed like an unpaced source at 400 FPS
+    timeline = GestureTimeline(1.0, fps=30)
+    for i in range(1200):
+        timeline.add(i / 400, "paper" if i < 800 else "rock", 1.0)
+    # The whole last second is kept, not just its last 31 frames
+    assert timeline.resolve(2.0, 3.0, ["rock", "paper", "scissors"]) == ("rock", 1.0, 400)
+    assert timeline.resolve(1.9, 1.99, ["rock", "paper", "scissors"])[0] == "paper"
+
+
+def test_growth_stops_at_the_frame_rate_ceiling():
+    timeline = GestureTimeline(1.0, fps=30, max_fps=100)
+    for _ in range(1000):
+        timeline.add(5.0, "rock", 1.0)
+    assert len(timeline.times) == 101
+    assert timeline.resolve(5.0, 5.0, ["rock", "paper", "scissors"]) == ("rock", 1.0, 101)
@@ -0,0 +1,69 @@
+import numpy as np
+
+from rps_core import (
+    LANDMARK_MAGIC_V1, LANDMARK_RECORD, LandmarkRecorder, load_landmarks, read_landmark_header)
+
+
+def test_recording_round_trip_creates_the_folder(tmp_path):
+    path = tmp_path / "data" / "rock" / "take1.rpsl"
+    recorder = LandmarkRecorder(str(path), seed=42, chunk_size=4)
+    points = np.full((21, 3), 0.5, dtype=np.float32)
+    for i in range(10):
+        recorder.write(i / 30, points if i % 2 else None, "Right")
+    recorder.close()
+    
+    records, seed = load_landmarks(str(path))
+    assert seed == 42
+    assert len(records) == 10
+    assert records['hand'].tolist() == [-1, 1] * 5
+    assert np.allclose(records['landmarks'][1], 0.5)
+
+
+def test_capture_age_round_trip(tmp_path):
+    path = tmp_path / "take.rpsl"
+    recorder = LandmarkRecorder(str(path))
+    recorder.write(1.0, age=0.125)
+    recorder.write(2.0)
+    recorder.close()
+    
+    records, _ = load_landmarks(str(path))
+    assert records['age'].tolist() == [0.125, 0.0]
+
+
+def test_partial_trailing_record_is_ignored(tmp_path):
+    path = tmp_path / "take.rpsl"
+    recorder = LandmarkRecorder(str(path))
+    recorder.write(0.0)
+    recorder.write(0.1)
+    recorder.close()
+    with open(path, 'ab') as f:
+        f.write(b"\0" * 20)
+    
+    records, _ = load_landmarks(str(path))
+    assert records['time'].tolist() == [0.0, 0.1]
+
+
+def test_settings_round_trip(tmp_path):
+    path = tmp_path / "take.rpsl"
+    settings = {'classifier': None, 'stability_scale': 0.6, 'throw_window': [0.1, 0.8]}
+    recorder = LandmarkRecorder(str(path), seed=7, settings=settings)
+    recorder.write(1.0)
+    recorder.close()
+    
+    seed, stored, offset = read_landmark_header(str(path))
+    assert (seed, stored) == (7, settings)
+    assert offset % 8 == 0
+    records, _ = load_landmarks(str(path))
+    assert records['time'].tolist() == [1.0]
+
+
+def test_version_1_recordings_still_load(tmp_path):
+    path = tmp_path / "old.rpsl"
+    record = np.zeros(1, dtype=LANDMARK_RECORD)
+    record['time'] = 2.5
+    path.write_bytes(LANDMARK_MAGIC_V1 + (42).to_bytes(8, 'little') + record.tobytes())
+    
+    assert read_landmark_header(str(path)) == (42, {}, 16)
+    records, seed = load_landmarks(str(path))
+    assert seed == 42
+    assert records['time'].tolist() == [2.5]
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from rps_core import LandmarkRecorder, LearnedGestureClassifier, load_labelled_landmarks
+
+
+def hand_in_frame(width, height, seed=0):
+    """One hand, the same size in pixels, as normalized landmarks of a frame"""
+    rng = np.random.default_rng(seed)
+    pixels = rng.uniform(-120, 120, (21, 2))
+    pixels[9] = (40, -150)  # middle finger knuckle, tilted away from straight up
+    pixels[0] = 0  # wrist
+    points = np.zeros((21, 3), dtype=np.float32)
+    points[:, 0] = (width / 2 + pixels[:, 0]) / width
+    points[:, 1] = (height / 2 + pixels[:, 1]) / height
+    return points
+
+
+def test_features_do_not_depend_on_the_frame_shape():
+    wide = LearnedGestureClassifier.features(hand_in_frame(1280, 720), 1280 / 720)
+    square = LearnedGestureClassifier.features(hand_in_frame(640, 480), 640 / 480)
+    assert np.allclose(wide, square, atol=1e-5)
+    
+    # Assuming 16:9 for a 4:3 frame skews the hand
+    skewed = LearnedGestureClassifier.features(hand_in_frame(640, 480), 16 / 9)
+    assert not np.allclose(wide, skewed, atol=1e-3)
+
+
+def clusters(count=300, seed=0):
+    """Noisy copies of three distinct hands, labelled rock, paper and none"""
+    rng = np.random.default_rng(seed)
+    names = ["rock", "paper", "none"]
+    centers = [hand_in_frame(1280, 720, seed=i) for i in range(len(names))]
+    labels = rng.integers(len(names), size=count)
+    points = np.stack([centers[label] for label in labels])
+    points += rng.normal(0, 0.003, points.shape).astype(np.float32)
+    return points, np.array(names)[labels]
+
+
+@pytest.fixture(scope="module")
+def model():
+    points, labels = clusters()
+    return LearnedGestureClassifier.train(points, labels, aspect=1280 / 720, epochs=150)
+
+
+def test_none_is_a_trained_class(model):
+    points, labels = clusters(seed=1)
+    gestures, _ = model.classify_batch(points)
+    assert "none" in model.gestures.tolist()
+    assert np.mean(gestures == labels) > 0.95
+
+
+def test_unsure_frames_are_none(model):
+    points, _ = clusters(count=20, seed=2)
+    model.min_confidence = 1.01
+    try:
+        gestures, confidences = model.classify_batch(points)
+    finally:
+        model.min_confidence = 0.5
+    assert set(gestures.tolist()) == {"none"}
+    assert (confidences <= 1).all()
+
+
+def test_save_and_load_keep_the_aspect(model, tmp_path):
+    path = str(tmp_path / "model.npz")
+    model.save(path)
+    loaded = LearnedGestureClassifier.load(path)
+    assert loaded.aspect == pytest.approx(1280 / 720)
+    points, _ = clusters(count=50, seed=3)
+    assert loaded.classify_batch(points)[0].tolist() == model.classify_batch(points)[0].tolist()
+
+
+def test_labelled_recordings_include_none(tmp_path):
+    for gesture in ("rock", "none"):
+        recorder = LandmarkRecorder(str(tmp_path / gesture / "take.rpsl"))
+        for _ in range(3):
+            recorder.write(0.0, hand_in_frame(1280, 720), "Right")
+        recorder.write(0.0)  # no hand: not a training frame
+        recorder.close()
+    
+    points, labels = load_labelled_landmarks(str(tmp_path))
+    assert len(points) == 6
+    assert sorted(set(labels.tolist())) == ["none", "rock"]
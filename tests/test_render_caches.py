@@ -0,0 +1,45 @@
+import numpy as np
+
+from rps_core import LRUCache
+
+
+def test_lru_cache_evicts_the_least_recently_used():
+    cache = LRUCache(2)
+    cache.lookup("a", lambda: 1)
+    cache.lookup("b", lambda: 2)
+    assert cache.lookup("a", lambda: 0) == 1  # hit, now the newest
+    cache.lookup("c", lambda: 3)
+    assert list(cache.entries) == ["a", "c"]
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 3, 1)
+
+
+def test_text_cache_evicts_oldest_texts_under_the_byte_cap(rps):
+    frame = np.zeros((200, 400, 3), dtype=np.uint8)
+    one = rps.TextCache()
+    one.put(frame, "0000", (10, 50), 1.0, (255, 255, 255))
+    size = one.total
+    
+    # Room for three texts of the same size
+    text = rps.TextCache(max_bytes=3 * size)
+    for value in range(5):
+        text.put(frame, f"{value:04d}", (10, 50), 1.0, (255, 255, 255))
+        assert text.total <= text.capacity
+    assert [key[0] for key in text.entries] == ["0002", "0003", "0004"]
+    assert text.total == 3 * size
+    assert text.evictions == 2
+    
+    # A hit refreshes an entry, so the next miss evicts the one after it
+    text.put(frame, "0002", (10, 50), 1.0, (255, 255, 255))
+    text.put(frame, "0005", (10, 50), 1.0, (255, 255, 255))
+    assert [key[0] for key in text.entries] == ["0004", "0002", "0005"]
+
+
+def test_cached_text_matches_direct_drawing(rps):
+    direct = np.zeros((100, 300, 3), dtype=np.uint8)
+    cached = direct.copy()
+    text = rps.TextCache()
+    text.enabled = False
+    text.put(direct, "12.5", (20, 60), 1.0, (0, 255, 0))
+    text.enabled = True
+    text.put(cached, "12.5", (20, 60), 1.0, (0, 255, 0))
+    assert np.array_equal(direct, cached)
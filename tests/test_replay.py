@@ -0,0 +1,78 @@
+import random
+
+import numpy as np
+
+from rps_core import GestureClassifier, LandmarkRecorder
+
+
+def hands_by_gesture(count=20000, seed=0):
+    """One random hand the rules read as each gesture"""
+    rng = np.random.default_rng(seed)
+    points = (0.5 + rng.normal(0, 0.06, (count, 21, 3))).astype(np.float32)
+    gestures, _ = GestureClassifier().classify_batch(points)
+    return {str(name): points[gestures == name][0] for name in GestureClassifier.gestures
+            if name != "none"}
+
+
+def record_session(rps, path, settings, rounds=6, seed=11):
+    """Play scripted rounds like the live loop and record them; returns the rounds"""
+    hands = hands_by_gesture()
+    rng = random.Random(0)
+    game = rps.RockPaperScissorsWorld(enable_hands=False, persist=False, seed=seed,
+                                      clock=rps.VirtualClock(100.0))
+    game.apply_settings(settings)
+    game.recorder = LandmarkRecorder(str(path), seed, settings=settings)
+    played = []
+    throw = reaction = None
+    while game.total_games < rounds:
+        now = game.clock.now()
+        if game.state == "menu":
+            shown = "thumbs_up" if rng.random() > 0.1 else "rock"
+            throw, reaction = rng.choice(game.choices), rng.uniform(0.0, 0.7)
+        elif game.state == "countdown" and game.shoot_time is not None:
+            shown = throw if now - game.shoot_time > reaction else "rock"
+        else:
+            shown = "rock"
+        points = hands[shown] if rng.random() > 0.05 else None
+        game.frame_age = rng.uniform(0.0, 0.1)
+        game.set_hand(points)
+        game.recorder.write(now, points, "Right", game.frame_age)
+        games = game.total_games
+        game.update_game()
+        if game.total_games != games:
+            played.append((now, game.player_choice, game.ai_choice, game.result))
+        game.clock.advance(1 / 30)
+    game.recorder.close()
+    return played
+
+
+def test_replay_reproduces_the_recorded_rounds(rps, tmp_path):
+    path = tmp_path / "session.rpsl"
+    settings = {'classifier': None, 'stability_scale': 0.6, 'throw_window': [0.1, 0.8]}
+    recorded = record_session(rps, path, settings)
+    
+    replayer = rps.LandmarkReplayer(str(path))
+    assert replayer.settings == settings
+    game = replayer.new_game()
+    assert game.throw_window == (0.1, 0.8)
+    assert replayer.replay(game) == recorded
+
+
+def test_replay_without_the_settings_plays_differently(rps, tmp_path):
+    path = tmp_path / "session.rpsl"
+    settings = {'classifier': None, 'stability_scale': 0.6, 'throw_window': [0.1, 0.8]}
+    recorded = record_session(rps, path, settings)
+    
+    replayer = rps.LandmarkReplayer(str(path))
+    default = rps.RockPaperScissorsWorld(enable_hands=False, persist=False, seed=replayer.seed)
+    assert replayer.replay(default) != recorded
+
+
+def test_replay_plays_against_the_recorded_ai(rps, tmp_path):
+    path = tmp_path / "session.rpsl"
+    recorded = record_session(rps, path, {'ai': "random"}, rounds=12)
+    
+    replayer = rps.LandmarkReplayer(str(path))
+    game = replayer.new_game()
+    assert isinstance(game.strategy, rps.RandomStrategy)
+    assert replayer.replay(game) == recorded
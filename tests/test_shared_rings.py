@@ -0,0 +1,109 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from rps_core import LandmarkRecorder, SharedFrameRing, SharedLandmarkRing, load_landmarks
+
+
+@pytest.fixture
+def landmark_ring():
+    ring = SharedLandmarkRing(capacity=8)
+    yield ring
+    ring.release(unlink=True)
+
+
+@pytest.fixture
+def frame_ring():
+    ring = SharedFrameRing((4, 6, 3), slots=2)
+    yield ring
+    ring.release(unlink=True)
+
+
+def hand(value):
+    return np.full((21, 3), value, dtype=np.float32)
+
+
+def test_landmark_ring_drains_in_order(landmark_ring):
+    reader = SharedLandmarkRing.attach(landmark_ring.spec())
+    landmark_ring.write(1.0, hand(0.1), "Right")
+    landmark_ring.write(2.0)
+    landmark_ring.write(3.0, hand(0.3), "Left")
+    
+    records = reader.drain()
+    assert records['time'].tolist() == [1.0, 2.0, 3.0]
+    assert records['hand'].tolist() == [1, -1, 0]
+    assert np.allclose(records['landmarks'][2], 0.3)
+    assert len(reader.drain()) == 0
+    
+    assert not reader.closed
+    landmark_ring.close()
+    assert reader.closed
+    reader.release()
+
+
+def test_landmark_ring_counts_overwritten_records(landmark_ring):
+    for i in range(20):
+        landmark_ring.write(float(i))
+    records = landmark_ring.drain()
+    assert records['time'].tolist() == [float(i) for i in range(12, 20)]
+    assert landmark_ring.dropped == 12
+
+
+
+def test_landmark_ring_records_match_a_recording(landmark_ring, tmp_path):
+    path = str(tmp_path / "session.rpsl")
+    recorder = LandmarkRecorder(path)
+    frames = [(1.0, hand(0.1), "Right", 0.02), (2.0, None, None, 0.03),
+              (3.0, hand(0.2), "Left", 0.01)]
+    for frame in frames:
+        recorder.write(*frame)
+        landmark_ring.write(*frame)
+    recorder.close()
+    
+    recorded, _ = load_landmarks(path)
+    assert landmark_ring.drain().tobytes() == recorded.tobytes()
+
+
+def test_frame_ring_hands_frames_over_in_order(frame_ring):
+    for value in (1, 2):
+        frame_ring.reserve()[:] = value
+        frame_ring.commit()
+    # Both slots are full until the consumer hands one back
+    assert frame_ring.reserve(timeout=0.01) is None
+    
+    assert frame_ring.acquire()[0, 0, 0] == 1
+    frame_ring.release_slot()
+    assert frame_ring.acquire()[0, 0, 0] == 2
+    frame_ring.release_slot()
+    assert frame_ring.acquire(timeout=0.01) is False
+    
+    frame_ring.close_stream()
+    assert frame_ring.acquire(timeout=1.0) is None
+
+
+def produce(spec, count):
+    ring = SharedFrameRing.attach(spec)
+    for value in range(count):
+        ring.reserve()[:] = value
+        ring.commit()
+    ring.close_stream()
+    ring.release()
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                    reason="needs fork to run the producer from a test module")
+def test_frame_ring_across_processes(frame_ring):
+    producer = multiprocessing.get_context("fork").Process(
+        target=produce, args=(frame_ring.spec(), 10))
+    producer.start()
+    received = []
+    while True:
+        frame = frame_ring.acquire(timeout=5.0)
+        assert frame is not False
+        if frame is None:
+            break
+        received.append(int(frame[0, 0, 0]))
+        frame_ring.release_slot()
+    producer.join()
+    assert received == list(range(10))
@@ -0,0 +1,103 @@
+from rps_core import gesture_sequence
+
+
+def play(game, gestures, fps=30, confidence=0.9):
+    """Feed one raw gesture per frame; returns the state after each update"""
+    states = []
+    for gesture in gestures:
+        game.current_gesture, game.confidence = gesture, confidence
+        states.append(game.state if game.update_game() else "exit")
+        game.clock.advance(1 / fps)
+    return states
+
+
+def start(game):
+    """Hold a thumbs up until the countdown starts; returns the frames it took"""
+    for frame in range(1, 61):
+        if play(game, ["thumbs_up"]) == ["countdown"]:
+            return frame
+    raise AssertionError("thumbs up did not start the countdown")
+
+
+def test_held_thumbs_up_starts_the_countdown(game):
+    held = start(game) / 30
+    required = game.gesture_filter.stability["menu"]["thumbs_up"]
+    assert required < held < required + 0.2
+    assert game.countdown_phase == 0
+
+
+def test_flickering_thumbs_up_stays_in_the_menu(game):
+    assert set(play(game, ["none", "none", "thumbs_up"] * 60)) == {"menu"}
+
+
+def test_held_thumbs_down_exits_from_the_menu(game):
+    states = play(game, ["thumbs_down"] * 60)
+    assert states[-1] == "exit"
+    assert "countdown" not in states
+
+
+def test_thumbs_down_leaves_the_options(game):
+    game.state = "options"
+    states = play(game, ["thumbs_down"] * 30)
+    assert states[-1] == "menu"
+
+
+def test_throw_shown_after_shoot_decides_the_round(game):
+    start(game)
+    shoot = game.countdown_start + 3.0
+    # Pump a fist through the countdown, then show paper after SHOOT
+    while game.state == "countdown":
+        late = game.clock.now() - shoot
+        play(game, ["paper" if late > 0.1 else "rock"])
+    
+    assert game.player_choice == "paper"
+    expected = {"rock": "YOU WIN!", "paper": "TIE!", "scissors": "YOU LOSE!"}[game.ai_choice]
+    assert game.result == expected
+    assert (game.player_wins, game.ai_wins, game.ties, game.total_games).count(1) == 2
+
+
+def test_misread_frames_around_shoot_are_outvoted(game):
+    start(game)
+    shoot = game.countdown_start + 3.0
+    frame = 0
+    while game.state == "countdown":
+        late = game.clock.now() - shoot
+        throw = "scissors" if late > 0 else "rock"
+        if frame % 4 == 0:
+            game.current_gesture, game.confidence = "rock", 0.6
+            game.update_game()
+            game.clock.advance(1 / 30)
+        else:
+            play(game, [throw])
+        frame += 1
+    assert game.player_choice == "scissors"
+
+
+def test_result_returns_to_the_menu_after_three_seconds(game):
+    start(game)
+    states = play(game, ["rock"] * 30 * 8)
+    result = states.index("result")
+    # 1/30s steps add up to 3s within a frame of rounding
+    assert states[result:].index("menu") in (90, 91)
+
+
+def test_replayed_gesture_sequence_only_acts_on_held_gestures(game):
+    times, gestures, confidences, truth = gesture_sequence(frames=6000, seed=3)
+    starts = exits = 0
+    previous = game.state
+    running = True
+    for i in range(len(times)):
+        game.clock.set(float(times[i]))
+        game.current_gesture, game.confidence = str(gestures[i]), float(confidences[i])
+        was_running, running = running, game.update_game()
+        if not running and was_running:
+            exits += 1
+            # The filter may still hold the gesture for a window after it ends
+            assert "thumbs_down" in truth[i - 4:i + 1]
+        if game.state == "countdown" and previous == "menu":
+            starts += 1
+            assert "thumbs_up" in truth[i - 4:i + 1]
+        previous = game.state
+    
+    assert starts > 0 and exits > 0
+    assert game.total_games == game.player_wins + game.ai_wins + game.ties
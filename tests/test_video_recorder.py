@@ -0,0 +1,72 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from rps_core import VideoRecorder
+
+ROUND = ["countdown"] * 3 + ["battle"] * 2 + ["result"] * 2
+
+
+def frame(value=0):
+    return np.full((48, 64, 3), value, dtype=np.uint8)
+
+
+def play(recorder, states):
+    for i, state in enumerate(states):
+        recorder.follow(state)
+        recorder.write(frame(i))
+
+
+def frame_counts(directory):
+    counts = []
+    for name in sorted(os.listdir(directory)):
+        capture = cv2.VideoCapture(os.path.join(directory, name))
+        counts.append(int(capture.get(cv2.CAP_PROP_FRAME_COUNT)))
+        capture.release()
+    return counts
+
+
+def test_one_segment_per_round(tmp_path):
+    # Room for every frame, so nothing is dropped however slow the encoder
+    recorder = VideoRecorder(str(tmp_path), queue_size=32)
+    play(recorder, ["menu"] * 4 + ROUND + ROUND + ["menu"] * 4)
+    recorder.close()
+    
+    assert recorder.segments == 2
+    assert recorder.written == 2 * len(ROUND)
+    assert recorder.stats.dropped == 0
+    assert frame_counts(tmp_path) == [len(ROUND), len(ROUND)]
+
+
+def test_inline_encoding_writes_the_same_segments(tmp_path):
+    recorder = VideoRecorder(str(tmp_path), background=False)
+    play(recorder, ROUND + ["menu"])
+    recorder.close()
+    assert frame_counts(tmp_path) == [len(ROUND)]
+
+
+class StalledRecorder(VideoRecorder):
+    """Encoder that waits until released, like a stalled disk"""
+    def __init__(self, *args, **kwargs):
+        self.stalled = threading.Event()
+        super().__init__(*args, **kwargs)
+    
+    def handle(self, kind, item):
+        if kind == "frame":
+            self.stalled.wait()
+        super().handle(kind, item)
+
+
+def test_frames_are_dropped_when_the_encoder_falls_behind(tmp_path):
+    recorder = StalledRecorder(str(tmp_path), queue_size=2)
+    recorder.follow("countdown")
+    for i in range(6):
+        recorder.write(frame(i))
+    
+    # Only the two queued buffers are kept; writing never waited
+    assert recorder.stats.dropped == 4
+    recorder.stalled.set()
+    recorder.close()
+    assert recorder.written == 2
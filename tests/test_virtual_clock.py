@@ -0,0 +1,72 @@
+import pytest
+
+
+def transitions(game, cycles, step):
+    """(time, state) whenever the state or countdown phase changes"""
+    seen = [(game.clock.now(), game.state, game.countdown_phase)]
+    for _ in range(cycles):
+        games = game.total_games
+        while game.total_games == games or game.state != "menu":
+            game.current_gesture = "thumbs_up" if game.state == "menu" else "rock"
+            game.confidence = 0.95
+            game.update_game()
+            game.clock.advance(step)
+            if (game.state, game.countdown_phase) != seen[-1][1:]:
+                seen.append((game.clock.now() - step, game.state, game.countdown_phase))
+    return seen
+
+
+def test_virtual_clock_only_moves_when_told(rps):
+    clock = rps.VirtualClock(5.0)
+    assert clock.now() == 5.0
+    clock.advance(0.25)
+    clock.set(clock.now() + 1.0)
+    assert clock.now() == 6.25
+
+
+def test_many_cycles_count_every_round(rps, game):
+    updates = rps.play_cycles(game, 500)
+    assert game.total_games == 500
+    assert game.player_wins + game.ai_wins + game.ties == 500
+    assert game.state == "menu"
+    # Every update moved the clock by exactly one step
+    assert game.clock.now() == pytest.approx(updates / 30)
+    # The capture-to-decision latency is recorded once per round
+    assert game.profiler['decision'].frames == 500
+
+
+@pytest.mark.parametrize("step", [1 / 30, 0.1])
+def test_cycles_follow_the_state_machine_and_its_timing(game, step):
+    seen = transitions(game, 50, step)
+    states = [state for _, state, _ in seen]
+    assert states[0] == "menu"
+    
+    for (start, state, phase), (end, after, next_phase) in zip(seen, seen[1:]):
+        held = end - start
+        if state == "menu":
+            assert (after, next_phase) == ("countdown", 0)
+        elif state == "countdown" and after == "countdown":
+            # ROCK, PAPER, SCISSORS and SHOOT! each show for a second
+            assert next_phase == phase + 1
+            assert held == pytest.approx(1.0, abs=step * 1.01)
+        elif state == "countdown":
+            assert (phase, after) == (3, "result")
+            assert held == pytest.approx(1.0, abs=step * 1.01)
+        else:
+            assert state == "result" and after == "menu"
+            assert held == pytest.approx(3.0, abs=step * 1.01)
+    assert states.count("result") == 50
+
+
+def test_same_seed_plays_the_same_rounds(rps):
+    results = []
+    for _ in range(2):
+        game = rps.RockPaperScissorsWorld(enable_hands=False, persist=False, seed=7,
+                                          clock=rps.VirtualClock())
+        rounds = []
+        for _ in range(100):
+            rps.play_cycles(game, 1)
+            rounds.append((game.ai_choice, game.result))
+        results.append(rounds)
+    assert results[0] == results[1]
+    assert len(set(results[0])) == 3